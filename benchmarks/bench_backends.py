@@ -0,0 +1,84 @@
+# Benchmark: selenium vs. http fetch backends (startup time, peak memory, pages/sec)
+#
+#   python benchmarks/bench_backends.py [--pages 20] [--workers 4]
+#
+# Each backend runs in its own child process against a local stand-in server, so
+# peak RSS (the child plus any browser processes it spawned) is measured in isolation.
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from fixtures import FixtureServer, build_pages, peak_rss_kb, project_root
+
+
+# Child process: start a backend, scrape every page, print JSON stats
+def run_one(backend, base_url, workers):
+    start = time.perf_counter()
+    from backends import session_factory
+    from extraction import parse_page
+    from pool import HostRateLimiter, SessionPool, scrape_pages
+
+    if backend == "selenium":
+        from scraper import init_chrome_driver, load_page
+        driver_factory, fetch = init_chrome_driver, load_page
+    else:
+        driver_factory, fetch = None, (lambda session, url: session.get(url))
+
+    factory = session_factory(backend, driver_factory, pool_size=workers)
+    with SessionPool(factory, size=workers) as pool:
+        with pool.session():
+            pass  # first session warm = ready to fetch
+        startup = time.perf_counter() - start
+
+        limiter = HostRateLimiter(1000.0, capacity=workers)
+        records, stats = scrape_pages(base_url, pool, limiter,
+                                      extract=lambda d, n: parse_page(d.page_source), fetch=fetch)
+        seconds, pages = stats["seconds"], stats["pages"]
+
+    peak_kb = peak_rss_kb() + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    print(json.dumps({"startup_s": startup, "pages": pages, "listings": len(records),
+                      "pages_per_s": pages / seconds, "peak_rss_mb": peak_kb / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--run-one", choices=["selenium", "http"], help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(args.run_one, args.url, args.workers)
+        return
+
+    import pandas as pd
+
+    raw = pd.read_csv(os.path.join(project_root, "data", "raw", "redfin_hollywood_hills_master.csv"), dtype=str)
+    sample = pd.concat([raw] * (args.pages * 40 // len(raw) + 1)).head(args.pages * 40)
+    pages = build_pages(sample, prefix="/hollywood-hills")
+
+    with FixtureServer(pages, delay=args.latency) as server:
+        for backend in ("selenium", "http"):
+            result = subprocess.run(
+                [sys.executable, __file__, "--run-one", backend, "--url", server.url + "/hollywood-hills",
+                 "--workers", str(args.workers)],
+                capture_output=True, text=True,
+            )
+            lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+            if result.returncode != 0 or not lines:
+                error = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+                print(f"{backend:10s}  unavailable: {error}")
+                continue
+            stats = json.loads(lines[-1])
+            print(f"{backend:10s}  startup={stats['startup_s']:.2f}s  peak_rss={stats['peak_rss_mb']:.0f} MB  "
+                  f"{stats['pages_per_s']:.1f} pages/s  ({stats['pages']} pages, {stats['listings']} listings)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Benchmark: listing change detection (changes.py) on large synthetic snapshots
+#
+#   python benchmarks/bench_changes.py [--listings 1000000] [--history-listings 100000] [--history 2 10 30]
+#
+# Snapshots are synthetic days of cleaned listings (synthetic.py, without URLs).
+#
+# 1. Two in-memory snapshots of --listings listings: the second drops 2%, adds 2%,
+#    changes the price of 5% and the square footage of 1%, in shuffled order.
+#    Times diff_snapshots() and checks it finds exactly those changes.
+# 2. On disk: cleaned masters of --history daily partitions of --history-listings
+#    each; times update_events() for the newest day, which should not grow with
+#    the number of days in the history.
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from fixtures import peak_rss_kb
+from synthetic import cleaned_rows
+from changes import diff_snapshots, events_path, load_events, update_events
+from storage import partition_dir, partition_path
+
+
+def synthetic_snapshot(n, rng, first_id=1_000_000):
+    return cleaned_rows(n, seed=int(rng.integers(1 << 31)), urls=False, first_id=first_id)
+
+
+# Next day's snapshot with known changes; returns (snapshot, expected counts)
+def next_snapshot(previous, rng):
+    n = len(previous)
+    current = previous.sample(frac=0.98, random_state=int(rng.integers(1 << 31)))
+    removed = n - len(current)
+
+    new = synthetic_snapshot(int(n * 0.02), rng, first_id=int(previous["Listing ID"].max()) + 1)
+
+    repriced = rng.choice(len(current), int(n * 0.05), replace=False)
+    current.iloc[repriced, current.columns.get_loc("Price")] *= 0.95
+    resized = rng.choice(len(current), int(n * 0.01), replace=False)
+    current.iloc[resized, current.columns.get_loc("SqFt")] += 10
+
+    current = pd.concat([current, new], ignore_index=True).sample(frac=1, random_state=0)
+    expected = {"new": len(new), "removed": removed, "price_changed": len(repriced), "attribute_changed": len(resized)}
+    return current, expected
+
+
+def write_master(master_file, days, listings, rng):
+    os.makedirs(partition_dir(master_file), exist_ok=True)
+    snapshot = synthetic_snapshot(listings, rng)
+    for date in pd.date_range("2025-01-01", periods=days).strftime("%Y-%m-%d"):
+        snapshot.assign(Date=date).to_csv(partition_path(master_file, date), index=False)
+        snapshot, _ = next_snapshot(snapshot, rng)
+    return date
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--history-listings", type=int, default=100_000)
+    parser.add_argument("--history", type=int, nargs="+", default=[2, 10, 30])
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    previous = synthetic_snapshot(args.listings, rng)
+    current, expected = next_snapshot(previous, rng)
+    start = time.perf_counter()
+    events = diff_snapshots(previous, current, "2025-01-02", "2025-01-01")
+    elapsed = time.perf_counter() - start
+    found = events["Event"].value_counts().to_dict()
+    assert found == expected, (found, expected)
+    print(f"diff of two {len(previous):,}-listing snapshots: {elapsed * 1000:,.0f} ms "
+          f"({len(previous) / elapsed / 1e6:.2f}M listings/s)")
+    print("  " + ", ".join(f"{count:,} {event}" for event, count in found.items()))
+    print(f"  peak RSS {peak_rss_kb() / 1024:,.0f} MB")
+    del previous, current, events
+
+    print(f"\nupdate_events() for the newest day, {args.history_listings:,} listings per day")
+    print(f"{'days':>6s} {'ms':>8s}")
+    for days in args.history:
+        with tempfile.TemporaryDirectory() as tmp:
+            master = os.path.join(tmp, "region_master_cleaned.csv")
+            last_date = write_master(master, days, args.history_listings, rng)
+            update_events(master, [])   # first call builds the whole event table
+            start = time.perf_counter()
+            update_events(master, [last_date])
+            elapsed = time.perf_counter() - start
+            assert load_events(events_path(master))["Date"].nunique() == days - 1
+            print(f"{days:6d} {elapsed * 1000:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
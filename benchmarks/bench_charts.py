@@ -0,0 +1,147 @@
+# Benchmark: dashboard chart reruns, seaborn/pyplot figures vs. charts.py (NumPy data + PNG cache)
+#
+#   python benchmarks/bench_charts.py [--rows 10000] [--interactions 1000] [--states 40]
+#                                     [--legacy-interactions 50]
+#
+# Simulates a user moving the price slider: each interaction picks one of
+# --states price ranges at random (revisits are common), filters a synthetic day
+# of listings (synthetic.py) and renders the charts of a rerun (price histogram + KDE,
+# beds/baths counts, two trend lines) as PNG bytes at st.pyplot's resolution.
+# Each mode runs in its own process; reports per-rerun latency and RSS growth.
+#
+#   legacy:   the original code (plt.subplots + seaborn, figures never closed)
+#   uncached: charts.py drawing on every rerun
+#   cached:   charts.py through ChartCache (what the dashboard does)
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from synthetic import cleaned_rows, daily_trend
+
+MODES = ["legacy", "uncached", "cached"]
+
+
+def current_rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+# --- One rerun per mode ---
+
+def legacy_rerun(filtered_df, trend):
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mtick
+    import seaborn as sns
+    from matplotlib.ticker import FuncFormatter
+
+    images = []
+    fig, ax = plt.subplots(figsize=(8, 4))
+    sns.histplot(filtered_df["Price"], bins=30, kde=True, ax=ax)
+    ax.xaxis.set_major_formatter(mtick.FuncFormatter(lambda x, _: f'${x/1_000_000:.0f}M'))
+    images.append(fig)
+
+    fig, ax = plt.subplots(1, 2, figsize=(12, 5))
+    sns.countplot(x="Beds", data=filtered_df, ax=ax[0], hue="Beds", palette="Blues", legend=False)
+    sns.countplot(x="Baths", data=filtered_df, ax=ax[1], hue="Baths", palette="Reds", legend=False)
+    images.append(fig)
+
+    for column, color in [("Price", None), ("Listings", "red")]:
+        fig, ax = plt.subplots(figsize=(10, 5))
+        trend[column].plot(ax=ax, marker="o", linestyle="-", color=color)
+        if column == "Price":
+            ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"${x/1e6:.1f}M"))
+        images.append(fig)
+
+    # st.pyplot saves each figure as a PNG (and leaves it open)
+    for fig in images:
+        fig.savefig(io.BytesIO(), format="png", dpi=200, bbox_inches="tight")
+
+
+def charts_rerun(filtered_df, trend, chart_cache=None):
+    from charts import draw_beds_baths, draw_price_histogram, draw_trend
+
+    def get(name, draw, *inputs, **options):
+        return chart_cache.get(name, draw, *inputs, **options) if chart_cache else draw(*inputs, **options)
+
+    get("price_histogram", draw_price_histogram, filtered_df["Price"])
+    get("beds_baths", draw_beds_baths, filtered_df["Beds"], filtered_df["Baths"])
+    get("price_trend", draw_trend, trend["Price"], title="Historical Trend: Average Price",
+        ylabel="Average Price ($M)", money=True)
+    get("listings_trend", draw_trend, trend["Listings"], title="Historical Trend: Number of Listings",
+        ylabel="Number of Listings", color="red")
+
+
+def run_mode(mode, rows, interactions, states):
+    import matplotlib
+    matplotlib.use("Agg")
+    from charts import ChartCache
+    from listing_index import ListingIndex
+
+    df = cleaned_rows(rows, urls=False)
+    index = ListingIndex(df)
+    trend = daily_trend()
+    rng = np.random.default_rng(2)
+    low, high = df["Price"].quantile([0.05, 0.95])
+    ranges = [tuple(sorted(rng.uniform(low, high, 2))) for _ in range(states)]
+    trend_windows = [(int(a), int(a) + 90) for a in rng.integers(0, len(trend) - 90, states)]
+    chart_cache = ChartCache() if mode == "cached" else None
+
+    rerun = legacy_rerun if mode == "legacy" else (lambda f, t: charts_rerun(f, t, chart_cache))
+    rerun(df, trend)   # warm up imports and fonts
+    start_rss = current_rss_mb()
+    latencies = []
+    for state in rng.integers(0, states, interactions):
+        filtered_df = index.query({"Price": ranges[state]})
+        window = trend.iloc[trend_windows[state][0]:trend_windows[state][1]]
+        start = time.perf_counter()
+        rerun(filtered_df, window)
+        latencies.append(time.perf_counter() - start)
+
+    latencies = np.array(latencies) * 1000
+    return {"mode": mode, "interactions": interactions, "mean_ms": latencies.mean(),
+            "p50_ms": np.percentile(latencies, 50), "p95_ms": np.percentile(latencies, 95),
+            "rss_growth_mb": current_rss_mb() - start_rss, "final_rss_mb": current_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--interactions", type=int, default=1000)
+    parser.add_argument("--legacy-interactions", type=int, default=50,
+                        help="The legacy mode keeps every figure open (~35 MB per rerun), so it runs fewer")
+    parser.add_argument("--states", type=int, default=40, help="Distinct slider positions")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        interactions = args.legacy_interactions if args.mode == "legacy" else args.interactions
+        print(json.dumps(run_mode(args.mode, args.rows, interactions, args.states)))
+        return
+
+    print(f"{args.rows:,} listings, {args.states} distinct filter states")
+    print(f"{'mode':9s} {'reruns':>7s} {'mean ms':>8s} {'p50 ms':>7s} {'p95 ms':>7s} {'RSS growth MB':>14s} "
+          f"{'per rerun KB':>13s}")
+    for mode in MODES:
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode, "--rows", str(args.rows),
+             "--interactions", str(args.interactions), "--legacy-interactions", str(args.legacy_interactions),
+             "--states", str(args.states)],
+            capture_output=True, text=True, check=True,
+        )
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{mode:9s} {stats['interactions']:7d} {stats['mean_ms']:8.1f} {stats['p50_ms']:7.1f} "
+              f"{stats['p95_ms']:7.1f} {stats['rss_growth_mb']:14.1f} "
+              f"{stats['rss_growth_mb'] * 1024 / stats['interactions']:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Benchmark: cleanser.clean_data() kernel vs. the original multi-pass cleaning
+#
+#   python benchmarks/bench_cleaning.py [--rows 5000000]
+#
+# Writes a synthetic raw file by resampling the committed raw rows (which already
+# mix in "—" placeholders, "— beds" and "2.5 baths"), then times both cleaners on
+# it. Also checks the kernel reproduces today's output on the committed CSVs.
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from fixtures import project_root
+from cleanser import clean_data
+
+
+# The original clean_data(), kept for comparison
+def legacy_clean_data(df):
+    df.replace({"—": np.nan, "N/A": np.nan, "": np.nan}, inplace=True)
+    df["Price"] = df["Price"].str.replace(r"[$,]", "", regex=True).astype(float)
+    df["SqFt"] = df["SqFt"].str.replace(r",", "", regex=True).astype(float)
+    df["Beds"] = df["Beds"].str.extract(r"(\d+)").astype(float)
+    df["Baths"] = df["Baths"].str.extract(r"(\d+)").astype(float)
+    df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce")
+    df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce")
+    df.dropna(subset=["Price", "Beds", "Baths", "SqFt", "Latitude", "Longitude"], inplace=True)
+    return df
+
+
+def check_committed_csvs():
+    for path in sorted(glob.glob(os.path.join(project_root, "data", "raw", "*.csv"))):
+        expected = legacy_clean_data(pd.read_csv(path))
+        compatible = clean_data(pd.read_csv(path), legacy_baths=True)
+        fixed = clean_data(pd.read_csv(path))
+        print(f"{os.path.basename(path)}: identical={expected.equals(compatible)}  "
+              f"half-baths recovered={int((fixed['Baths'] != expected['Baths']).sum())}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    check_committed_csvs()
+
+    sample = pd.read_csv(os.path.join(project_root, "data", "raw", "redfin_hollywood_hills_master.csv"), dtype=str)
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_file = os.path.join(tmp, "raw.csv")
+        sample.sample(n=args.rows, replace=True, random_state=0).to_csv(raw_file, index=False)
+        print(f"synthetic raw file: {args.rows:,} rows, {os.path.getsize(raw_file) / 2**20:.0f} MB")
+
+        timings = {}
+        outputs = {}
+        for name, cleaner in (("original", legacy_clean_data),
+                              ("kernel", lambda df: clean_data(df, legacy_baths=True))):
+            df = pd.read_csv(raw_file)
+            start = time.perf_counter()
+            outputs[name] = cleaner(df)
+            timings[name] = time.perf_counter() - start
+            print(f"{name:9s} {timings[name]:7.2f}s")
+
+        print(f"speedup: {timings['original'] / timings['kernel']:.1f}x  "
+              f"identical output: {outputs['original'].equals(outputs['kernel'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Benchmark: loading the cleaned history from CSV vs. the typed Parquet store
+#
+#   python benchmarks/bench_columnar.py [--scale 1000]
+#
+# Scales the committed cleaned master up (each copy shifted to new dates), writes it
+# both ways, then loads it in a fresh child process per mode and reports time and
+# peak RSS. CSV loads include the to_numeric / to_datetime passes the dashboard runs.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from fixtures import peak_rss_kb, project_root
+
+MODES = ["csv", "typed", "typed-projected", "typed-last-30-days"]
+
+
+def run_one(mode, master_file):
+    import pandas as pd
+    from storage import load_master, load_master_typed
+
+    start = time.perf_counter()
+    if mode == "csv":
+        df = load_master(master_file)
+        for col in ["Price", "Beds", "Baths", "SqFt", "Latitude", "Longitude"]:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce", format="ISO8601")
+    elif mode == "typed":
+        df = load_master_typed(master_file)
+    elif mode == "typed-projected":
+        df = load_master_typed(master_file, columns=["Price", "Address", "Date"])
+    else:
+        last = pd.Timestamp(load_master_typed(master_file, columns=["Date"])["Date"].max())
+        start = time.perf_counter()
+        df = load_master_typed(master_file, start_date=last - pd.Timedelta(days=29))
+    seconds = time.perf_counter() - start
+
+    print(json.dumps({"seconds": seconds, "rows": len(df), "frame_mb": df.memory_usage(deep=True).sum() / 2**20,
+                      "peak_rss_mb": peak_rss_kb() / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=1000)
+    parser.add_argument("--run-one", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--master", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(args.run_one, args.master)
+        return
+
+    import pandas as pd
+    from storage import CLEANED_SCHEMA, append_to_master
+
+    base = pd.read_csv(os.path.join(project_root, "data", "cleaned", "redfin_hollywood_hills_master_cleaned.csv"))
+    base["Date"] = pd.to_datetime(base["Date"], format="ISO8601")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        master_file = os.path.join(tmp, "master_cleaned.csv")
+        start = time.perf_counter()
+        step = base["Date"].nunique()
+        for k in range(args.scale):
+            copy = base.copy()
+            copy["Date"] = copy["Date"] + pd.Timedelta(days=k * step)
+            append_to_master(copy, master_file)
+        from storage import sync_typed_master
+        sync_typed_master(master_file, CLEANED_SCHEMA)
+        print(f"built {len(base) * args.scale:,} rows in {time.perf_counter() - start:.1f}s")
+
+        for mode in MODES:
+            result = subprocess.run([sys.executable, __file__, "--run-one", mode, "--master", master_file],
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{mode:20s} failed: {result.stderr.strip().splitlines()[-1]}")
+                continue
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{mode:20s} {stats['seconds']:7.2f}s  rows={stats['rows']:>9,}  "
+                  f"frame={stats['frame_mb']:7.1f} MB  peak_rss={stats['peak_rss_mb']:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
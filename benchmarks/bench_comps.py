@@ -0,0 +1,66 @@
+# Benchmark: comparable listings, grid index (comps.ComparablesIndex) vs. a full scan
+#
+#   python benchmarks/bench_comps.py [--rows 10000 100000 1000000] [--queries 200] [--k 10]
+#
+# Cleaned synthetic listings (synthetic.py) at each size. Times the index build
+# once, then --queries comparables lookups for random listings with the index
+# and with a scan of every listing (similarity mask + haversine + sort), and
+# checks both return the same distances.
+import argparse
+import time
+
+import numpy as np
+
+from fixtures import peak_rss_kb
+from synthetic import raw_rows
+from cleanser import clean_data
+from comps import ComparablesIndex, scan_comparables
+
+
+def percentiles_ms(times):
+    return np.percentile(times, 50) * 1000, np.percentile(times, 95) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=20, help="Full-scan lookups timed (they are slow)")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"k={args.k}; query latency in ms (p50 / p95)")
+    print(f"{'listings':>9s} {'build ms':>9s} {'index p50':>10s} {'index p95':>10s} {'scan p50':>9s} "
+          f"{'speedup':>8s} {'median $/sqft':>14s} {'RSS MB':>7s}")
+    for rows in args.rows:
+        # About 16% of the raw rows are dropped by cleaning: generate enough for `rows` listings
+        df = clean_data(raw_rows(int(rows * 1.25))).head(rows).reset_index(drop=True)
+        start = time.perf_counter()
+        index = ComparablesIndex(df)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        rng = np.random.default_rng(1)
+        queries = rng.integers(0, len(df), args.queries)
+        index_times, medians = [], []
+        for position in queries:
+            start = time.perf_counter()
+            comps, median = index.comparables(int(position), args.k)
+            index_times.append(time.perf_counter() - start)
+            medians.append(median)
+
+        scan_times = []
+        for position in queries[:args.scan_queries]:
+            start = time.perf_counter()
+            expected = scan_comparables(df, int(position), args.k)
+            scan_times.append(time.perf_counter() - start)
+            comps, _ = index.comparables(int(position), args.k)
+            assert np.allclose(comps["Distance (mi)"].to_numpy(), expected["Distance (mi)"].to_numpy())
+
+        index_p50, index_p95 = percentiles_ms(index_times)
+        scan_p50, _ = percentiles_ms(scan_times)
+        print(f"{len(df):9d} {build_ms:9.1f} {index_p50:10.2f} {index_p95:10.2f} {scan_p50:9.1f} "
+              f"{scan_p50 / index_p50:7.0f}x {np.nanmedian(medians):14.0f} {peak_rss_kb() / 1024:7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Benchmark: sequential vs. pooled concurrent page scraping
+#
+#   python benchmarks/bench_concurrency.py [--pages 20] [--latency 0.3] [--workers 1 2 4 8] [--chrome]
+#
+# A local server serves paginated HomeCard HTML with a fixed per-request latency.
+# Every worker count must merge to exactly the records of the 1-worker run.
+import argparse
+import os
+
+import pandas as pd
+
+from fixtures import FixtureServer, UrllibDriver, build_pages, project_root
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3, help="Server-side seconds per page")
+    parser.add_argument("--rate", type=float, default=50.0, help="Token bucket rate (requests/s/host)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chrome", action="store_true", help="Use headless Chrome sessions instead of urllib")
+    args = parser.parse_args()
+
+    from extraction import parse_page
+    from pool import HostRateLimiter, SessionPool, scrape_pages
+
+    # Repeat the sample listings until there are enough cards for --pages pages
+    raw = pd.read_csv(os.path.join(project_root, "data", "raw", "redfin_hollywood_hills_master.csv"), dtype=str)
+    sample = pd.concat([raw] * (args.pages * 40 // len(raw) + 1))
+    pages = build_pages(sample.head(args.pages * 40), prefix="/hollywood-hills")
+
+    if args.chrome:
+        from scraper import init_chrome_driver, load_page
+        factory, fetch = init_chrome_driver, load_page
+    else:
+        factory, fetch = UrllibDriver, lambda driver, url: driver.get(url)
+
+    with FixtureServer(pages, delay=args.latency) as server:
+        base_url = server.url + "/hollywood-hills"
+        baseline = None
+        for workers in args.workers:
+            limiter = HostRateLimiter(args.rate, capacity=workers)
+            with SessionPool(factory, size=workers) as pool:
+                records, stats = scrape_pages(
+                    base_url, pool, limiter,
+                    extract=lambda driver, n: parse_page(driver.page_source),
+                    fetch=fetch,
+                )
+            if baseline is None:
+                baseline = (records, stats["seconds"])
+            print(f"workers={workers:2d}  pages={stats['pages']}  listings={stats['listings']}  "
+                  f"wall={stats['seconds']:.2f}s  {stats['pages_per_second']:.2f} pages/s  "
+                  f"speedup={baseline[1] / stats['seconds']:.1f}x  same_order={records == baseline[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# Benchmark: the scheduler's stage DAG (dag.py) with fake stages, then the real pipeline
+#
+#   python benchmarks/bench_dag.py [--regions 4] [--stage-seconds 0.2] [--max-parallel 1 2 4 8] [--real-regions 3]
+#
+# Fake stages sleep instead of working, laid out like the pipeline DAG
+# (scrape:<r> -> clean:<r> -> rollups:<r> + events:<r>) with --regions regions.
+# For each --max-parallel it checks the peak number of stages running at once
+# never exceeds the limit, that no stage starts before its dependencies end, and
+# that the makespan is close to the ideal schedule (critical path, or total work
+# / slots when that is larger) rather than the serial sum. Then the failure paths:
+# a stage over its timeout, one with retries that must not start a retry next to
+# its abandoned attempt, a flaky stage that succeeds on retry, and a failure that
+# skips its downstream stages. Finally scheduler.run_pipeline_dag() scrapes
+# (http backend) and cleans --real-regions fixture regions, serially and as a DAG.
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from fixtures import FixtureServer
+from bench_regions import build_regions
+from dag import Stage, run_dag
+
+# Relative stage durations (in --stage-seconds), like a real run: scraping dominates
+DURATIONS = {"scrape": 4, "clean": 2, "rollups": 1, "events": 1}
+TOLERANCE = 0.25   # scheduling overhead allowed over the ideal makespan
+
+
+class Probe:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def stage(self, seconds, result=None):
+        def fn(inputs):
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            try:
+                time.sleep(seconds)
+            finally:
+                with self.lock:
+                    self.running -= 1
+            return result
+        return fn
+
+
+def fake_pipeline(regions, unit, probe):
+    stages = []
+    for i in range(regions):
+        r = f"region_{i}"
+        stages += [
+            Stage(f"scrape:{r}", probe.stage(DURATIONS["scrape"] * unit)),
+            Stage(f"clean:{r}", probe.stage(DURATIONS["clean"] * unit), after=[f"scrape:{r}"]),
+            Stage(f"rollups:{r}", probe.stage(DURATIONS["rollups"] * unit), after=[f"clean:{r}"]),
+            Stage(f"events:{r}", probe.stage(DURATIONS["events"] * unit), after=[f"clean:{r}"]),
+        ]
+    return stages
+
+
+def check_order(stages, outcomes):
+    for stage in stages:
+        for dependency in stage.after:
+            assert outcomes[stage.name]["started"] >= outcomes[dependency]["finished"], \
+                f"{stage.name} started before {dependency} finished"
+
+
+def failure_paths(unit):
+    attempts = []
+    slow_probe = Probe()   # attempts of the stage that times out with retries left
+
+    def flaky(inputs):
+        attempts.append(time.perf_counter())
+        if len(attempts) < 3:
+            raise ConnectionError("simulated network error")
+        return "ok"
+
+    def broken(inputs):
+        raise ValueError("simulated bad page")
+
+    stages = [
+        Stage("slow", lambda inputs: time.sleep(unit * 10), timeout=unit),
+        Stage("after_slow", lambda inputs: None, after=["slow"]),
+        Stage("slow_with_retries", slow_probe.stage(unit * 4), timeout=unit, retries=2, backoff=unit / 10),
+        Stage("flaky", flaky, retries=2, backoff=unit),
+        Stage("uses_flaky", lambda inputs: inputs["flaky"] + "!", after=["flaky"]),
+        Stage("broken", broken, retries=1, backoff=unit),
+        Stage("after_broken", lambda inputs: None, after=["broken"]),
+        Stage("after_after_broken", lambda inputs: None, after=["after_broken"]),
+        Stage("returns_false", lambda inputs: False),
+    ]
+    outcomes = run_dag(stages, max_parallel=4)
+    status = {name: (outcome["status"], outcome["attempts"]) for name, outcome in outcomes.items()}
+    assert status["slow"] == ("timeout", 1) and status["after_slow"][0] == "skipped", status
+    assert outcomes["slow"]["seconds"] < unit * 3, "the timeout did not stop waiting for the slow stage"
+    assert status["slow_with_retries"] == ("timeout", 1), status
+    time.sleep(unit * 4)   # let the abandoned attempt end: no retry may have started next to it
+    assert slow_probe.peak == 1 and slow_probe.running == 0, f"{slow_probe.peak} attempts ran at once"
+    assert status["flaky"] == ("ok", 3) and outcomes["uses_flaky"]["result"] == "ok!", status
+    gaps = [b - a for a, b in zip(attempts, attempts[1:])]
+    assert gaps[0] >= unit * 0.9 and gaps[1] >= unit * 1.9, f"retry backoff not exponential: {gaps}"
+    assert status["broken"] == ("failed", 2), status
+    assert status["after_broken"][0] == status["after_after_broken"][0] == "skipped", status
+    assert status["returns_false"] == ("failed", 1), status
+    print("failure paths: timeout (never retried), retry with backoff, skip downstream, False = failure ... ok")
+    for name, outcome in outcomes.items():
+        print(f"  {name:20s} {outcome['status']:8s} tries {outcome['attempts']}  {outcome['error'] or ''}")
+
+
+# {relative path: contents} of the CSV outputs (cleaned files, rollups, events) under a data root
+def data_files(data_root):
+    files = {}
+    for directory, _, names in os.walk(data_root):
+        for name in names:
+            if name.endswith(".csv"):
+                with open(os.path.join(directory, name), "rb") as f:
+                    files[os.path.relpath(os.path.join(directory, name), data_root)] = f.read()
+    return files
+
+
+def real_pipeline(regions, delay):
+    from scheduler import run_pipeline, run_pipeline_dag
+
+    pages, _ = build_regions(regions)
+    options = {"backend": "http", "workers": 2, "rate": 1000.0}
+    with FixtureServer(pages, delay=delay) as server, tempfile.TemporaryDirectory() as tmp:
+        _, registry = build_regions(regions, server.url)
+        registry_file = os.path.join(tmp, "regions.json")
+        with open(registry_file, "w") as f:
+            json.dump({"regions": registry}, f)
+        region_ids = [region["id"] for region in registry]
+
+        start = time.perf_counter()
+        for region_id in region_ids:
+            assert run_pipeline(region_id, options, registry=registry_file, data_root=os.path.join(tmp, "serial"))
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        assert run_pipeline_dag(region_ids, options, registry_file, os.path.join(tmp, "dag"), retries=0)
+        parallel = time.perf_counter() - start
+
+        serial_files, dag_files = (data_files(os.path.join(tmp, mode)) for mode in ("serial", "dag"))
+        assert serial_files == dag_files, set(serial_files) ^ set(dag_files)
+        print(f"\nreal pipeline, {regions} regions ({delay * 1000:.0f} ms per page): serial {serial:.2f}s, "
+              f"DAG {parallel:.2f}s ({serial / parallel:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--regions", type=int, default=4)
+    parser.add_argument("--stage-seconds", type=float, default=0.2, help="Duration unit of the fake stages")
+    parser.add_argument("--max-parallel", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--real-regions", type=int, default=3, help="Regions of the real pipeline run (0 = skip)")
+    parser.add_argument("--delay", type=float, default=0.1, help="Fixture server latency per page (s)")
+    args = parser.parse_args()
+
+    unit = args.stage_seconds
+    per_region = sum(DURATIONS.values()) * unit
+    critical_path = (DURATIONS["scrape"] + DURATIONS["clean"] + DURATIONS["rollups"]) * unit
+    serial = per_region * args.regions
+    print(f"{args.regions} regions x 4 fake stages; serial sum {serial:.2f}s, critical path {critical_path:.2f}s")
+    print(f"{'parallel':>8s} {'peak':>5s} {'makespan s':>10s} {'ideal s':>8s} {'vs serial':>9s}")
+    for max_parallel in args.max_parallel:
+        probe = Probe()
+        stages = fake_pipeline(args.regions, unit, probe)
+        start = time.perf_counter()
+        outcomes = run_dag(stages, max_parallel)
+        makespan = time.perf_counter() - start
+
+        assert all(outcome["status"] == "ok" for outcome in outcomes.values())
+        assert probe.peak <= max_parallel, f"{probe.peak} stages ran at once (limit {max_parallel})"
+        check_order(stages, outcomes)
+        ideal = max(critical_path, serial / max_parallel)
+        assert makespan <= ideal * (1 + TOLERANCE) + 0.05, f"makespan {makespan:.2f}s, ideal {ideal:.2f}s"
+        if max_parallel >= args.regions:
+            assert probe.peak >= args.regions, "independent stages did not run concurrently"
+        print(f"{max_parallel:8d} {probe.peak:5d} {makespan:10.2f} {ideal:8.2f} {serial / makespan:8.1f}x")
+
+    print()
+    failure_paths(unit)
+    if args.real_regions:
+        real_pipeline(args.real_regions, args.delay)
+
+
+if __name__ == "__main__":
+    main()
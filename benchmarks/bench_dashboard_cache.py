@@ -0,0 +1,76 @@
+# Benchmark: dashboard loader latency with the persistent frame cache
+#
+#   python benchmarks/bench_dashboard_cache.py [--days 365] [--rows-per-day 2000] [--reruns 50]
+#
+# Builds a synthetic cleaned master (Date partitions of synthetic.py's cleaned
+# history) and times dashboard.read_history() through cache.FrameCache:
+# uncached, a memory hit (Streamlit rerun), a disk hit (new process / server
+# restart), and a miss after the cleanser appends a new day (invalidation).
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from fixtures import best_ms, measure
+from synthetic import cleaned_history, cleaned_rows, write_partitions
+from cache import FrameCache
+from dashboard import read_history
+from storage import master_sources, partition_path, sync_typed_master, CLEANED_SCHEMA
+
+
+# One timed call; returns its frame
+def timed(label, fn):
+    frames = []
+    ms = best_ms(lambda: frames.append(fn()))
+    print(f"{label:34s} {ms:9.1f} ms  ({len(frames[0]):,} rows)")
+    return frames[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--rows-per-day", type=int, default=2000)
+    parser.add_argument("--reruns", type=int, default=50)
+    parser.add_argument("--typed", action="store_true", help="Also write the typed Parquet master")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        master = os.path.join(tmp, "cleaned", "region_master_cleaned.csv")
+        write_partitions(master, cleaned_history(args.days, args.rows_per_day, start="2024-01-01"))
+        if args.typed:
+            sync_typed_master(master, CLEANED_SCHEMA)
+        cache_dir = os.path.join(tmp, "cache")
+
+        def cached(cache):
+            return cache.get("load_historical_data", ["region"], master_sources(master), lambda: read_history(master))
+
+        timed("uncached read_history()", lambda: read_history(master))
+
+        cache = FrameCache(cache_dir)
+        expected = timed("first load (miss)", lambda: cached(cache))
+        timed("rerun (memory hit)", lambda: cached(cache))
+
+        restarted = FrameCache(cache_dir)
+        from_disk = timed("server restart (disk hit)", lambda: cached(restarted))
+        pd.testing.assert_frame_equal(from_disk, expected)
+
+        # The cleanser appends a new day: the key changes and the frame is reloaded
+        day_df = cleaned_rows(100, "2030-01-01")
+        day_df.to_csv(partition_path(master, "2030-01-01"), index=False)
+        if args.typed:
+            sync_typed_master(master, CLEANED_SCHEMA)
+        updated = timed("after a cleanser write (miss)", lambda: cached(restarted))
+        assert len(updated) == len(expected) + len(day_df)
+
+        # A session moving sliders: every rerun asks for the same frame
+        per_rerun = measure(lambda: cached(restarted), args.reruns)["median_ms"]
+
+        stats = restarted.summary()
+        print(f"{args.reruns} reruns: {per_rerun:.2f} ms per load (median), hit rate {stats['hit_rate']:.0%} "
+              f"({stats['memory_hits']} memory, {stats['disk_hits']} disk, {stats['misses']} misses), "
+              f"{stats['memory_mb']:.0f} MB in memory")
+
+
+if __name__ == "__main__":
+    main()
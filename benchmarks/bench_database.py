@@ -0,0 +1,126 @@
+# Benchmark: CSV files vs. the SQLite store (database.py) as the history grows
+#
+#   python benchmarks/bench_database.py [--days 30 365 1825] [--rows-per-day 250] [--repeat 5]
+#
+# For each history length, builds the same synthetic cleaned history (synthetic.py) twice: as
+# the CSV layout the pipeline writes (Date-partitioned master with its typed
+# monthly twin, daily files with Parquet twins, raw daily files for the date
+# list) and as the `listings` table. Then times what a daily run and the
+# dashboard do with each backend:
+#
+#   write      one new day: append_to_master() (CSV + typed twin) vs. upsert_listings()
+#   dates      the date selector: folder glob vs. SELECT DISTINCT on the date index
+#   day        one day's listings: daily file (typed twin) vs. indexed SELECT
+#   trend      average price + listings per date over the whole history:
+#              master read + groupby vs. GROUP BY
+#   trend 30d  the same for the last 30 days (filtered history vs. index range)
+#
+# Both backends must return the same daily series, and writing a day again (some
+# rows without a Listing ID) must not add rows to the store.
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from fixtures import best_ms
+from synthetic import cleaned_history, write_partitions
+from dashboard import read_daily, read_history
+from database import close_all, connect, daily_aggregates, load_day, stored_dates, upsert_listings
+from regions import available_dates
+from storage import CLEANED_SCHEMA, append_to_master, sync_typed_master, typed_path, write_typed
+
+REGION = {"id": "bench", "name": "Bench", "slug": "redfin_bench", "url": "http://127.0.0.1"}
+
+
+# days: (date, cleaned listings) pairs
+def build_history(data_root, days):
+    master = os.path.join(data_root, "cleaned", f"{REGION['slug']}_master_cleaned.csv")
+    write_partitions(master, days)
+    os.makedirs(os.path.join(data_root, "raw"), exist_ok=True)
+    for date, day_df in days:
+        daily_file = os.path.join(data_root, "cleaned", f"{REGION['slug']}_cleaned_{date}.csv")
+        day_df.to_csv(daily_file, index=False)
+        write_typed(day_df, typed_path(daily_file), CLEANED_SCHEMA)
+        open(os.path.join(data_root, "raw", f"{REGION['slug']}_{date}.csv"), "w").close()
+    sync_typed_master(master, CLEANED_SCHEMA)
+
+    database = os.path.join(data_root, "bench.sqlite")
+    upsert_listings(pd.concat([day_df for _, day_df in days], ignore_index=True), REGION["id"], path=database)
+    return master, database
+
+
+# Upserting a day twice stores it once, with or without Listing IDs
+def check_rerun(day_df, database):
+    region_id = f"{REGION['id']}_rerun"
+    day_df = day_df.assign(**{"Listing ID": day_df["Listing ID"].astype(object)})
+    day_df.loc[::10, "Listing ID"] = "N/A"
+    day_df.loc[1::10, "Listing ID"] = None
+    for table in ("listings", "raw_listings"):
+        for _ in range(2):
+            upsert_listings(day_df, region_id, table=table, path=database)
+        stored, = connect(path=database).execute(f"SELECT COUNT(*) FROM {table} WHERE region = ?",
+                                                 (region_id,)).fetchone()
+        assert stored == len(day_df), f"{table}: {stored} rows stored for {len(day_df)} written twice"
+
+
+def scan_trend(master, start=None):
+    df = read_history(master)
+    if start is not None:
+        df = df[df["Date"] >= start]
+    return pd.DataFrame({"Price": df.groupby("Date")["Price"].mean(),
+                         "Listings": df.groupby("Date")["Address"].count()})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 365, 1825])
+    parser.add_argument("--rows-per-day", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    operations = ["write", "dates", "day", "trend", "trend 30d"]
+    print(f"{args.rows_per_day} listings per day; best of {args.repeat}, ms")
+    print(f"{'days':>6s} {'operation':10s} {'CSV':>9s} {'SQLite':>9s} {'speedup':>8s}")
+    for n_days in args.days:
+        days = list(cleaned_history(n_days + 1, args.rows_per_day, start="2020-01-01"))
+        dates = [date for date, _ in days]
+        new_day = days.pop()[1]
+        with tempfile.TemporaryDirectory() as tmp:
+            master, database = build_history(tmp, days)
+            day = dates[len(dates) // 2]
+            daily_file = os.path.join(tmp, "cleaned", f"{REGION['slug']}_cleaned_{day}.csv")
+            last_month = pd.Timestamp(dates[-2]) - pd.Timedelta(days=29)
+
+            # Same answer from both backends
+            csv_trend, sql_trend = scan_trend(master), daily_aggregates(REGION["id"], path=database)
+            assert np.allclose(csv_trend["Price"], sql_trend["Price"])
+            assert (csv_trend["Listings"].to_numpy() == sql_trend["Listings"].to_numpy()).all()
+            assert len(read_daily(daily_file)) == len(load_day(REGION["id"], day, path=database))
+            assert available_dates(REGION, tmp) == stored_dates(REGION["id"], path=database)
+            check_rerun(new_day, database)
+
+            timings = {
+                # One timed write each: repeating it would only measure the "already stored" path
+                "write": (best_ms(lambda: append_to_master(new_day, master, schema=CLEANED_SCHEMA), 1),
+                          best_ms(lambda: upsert_listings(new_day, REGION["id"], path=database), 1)),
+                "dates": (best_ms(lambda: available_dates(REGION, tmp), args.repeat),
+                          best_ms(lambda: stored_dates(REGION["id"], path=database), args.repeat)),
+                "day": (best_ms(lambda: read_daily(daily_file), args.repeat),
+                        best_ms(lambda: load_day(REGION["id"], day, path=database), args.repeat)),
+                "trend": (best_ms(lambda: scan_trend(master), args.repeat),
+                          best_ms(lambda: daily_aggregates(REGION["id"], path=database), args.repeat)),
+                "trend 30d": (best_ms(lambda: scan_trend(master, last_month), args.repeat),
+                              best_ms(lambda: daily_aggregates(REGION["id"], last_month, path=database),
+                                      args.repeat)),
+            }
+            close_all()
+
+        for operation in operations:
+            csv_ms, sql_ms = timings[operation]
+            print(f"{n_days:6d} {operation:10s} {csv_ms:9.1f} {sql_ms:9.1f} {csv_ms / sql_ms:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Benchmark: per-page listing extraction, per-field WebDriver calls vs. single-pass parsing
+#
+#   python benchmarks/bench_extraction.py [--repeat 5]
+#
+# Serves HomeCard pages rendered from data/raw over a local HTTP server, loads each
+# page in headless Chrome and times every extraction mode on the same loaded page.
+import argparse
+
+from fixtures import FixtureServer, measure, sample_pages
+
+
+# Median ms of `repeat` calls, and the records of one more
+def time_call(fn, repeat):
+    return measure(fn, repeat)["median_ms"], fn()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from extraction import parse_page
+
+    pages = sample_pages()
+    with FixtureServer(pages) as server:
+        try:
+            from scraper import extract_page, init_chrome_driver, EXTRACTION_MODES
+            driver = init_chrome_driver()
+        except Exception as e:
+            # No browser available: report the parsing cost on its own
+            print(f"⚠️ Chrome unavailable ({e.__class__.__name__}); timing page_source parsing only")
+            for n, (path, html) in enumerate(pages.items(), start=1):
+                ms, records = time_call(lambda: parse_page(html), args.repeat)
+                print(f"page {n}: {len(records)} cards  parse={ms:.2f} ms")
+            return
+
+        try:
+            totals = {mode: 0.0 for mode in EXTRACTION_MODES}
+            for n, path in enumerate(pages, start=1):
+                driver.get(server.url + (path if path != "/" else ""))
+                results, timings = {}, {}
+                for mode in EXTRACTION_MODES:
+                    ms, records = time_call(lambda: extract_page(driver, n, mode), args.repeat)
+                    totals[mode] += ms
+                    results[mode], timings[mode] = records, ms
+                same = results["page_source"] == results["webdriver"] == results["script"]
+                print(f"page {n}: {len(results['webdriver'])} cards  "
+                      + "  ".join(f"{mode}={timings[mode]:.1f} ms" for mode in EXTRACTION_MODES)
+                      + f"  identical={same}")
+        finally:
+            driver.quit()
+
+        n_pages = len(pages)
+        base = totals["webdriver"] / n_pages
+        for mode in EXTRACTION_MODES:
+            per_page = totals[mode] / n_pages
+            print(f"{mode:12s} {per_page:8.1f} ms/page  ({base / per_page:.1f}x vs webdriver)")
+
+
+if __name__ == "__main__":
+    main()
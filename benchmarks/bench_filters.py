@@ -0,0 +1,64 @@
+# Benchmark: sidebar filter latency, boolean mask + sort vs. listing_index.ListingIndex
+#
+#   python benchmarks/bench_filters.py [--rows 10000 100000 1000000 10000000] [--repeat 5]
+#
+# A synthetic day of cleaned listings (synthetic.py, without the URL columns, as
+# the dashboard keeps them) at each size. For three slider settings, times the
+# original filter (one mask over the four columns, then sort_values by price for
+# the table) against an index query that returns the same price-sorted rows, and
+# checks both give identical frames. Index build time is reported once per size.
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from fixtures import best_ms
+from synthetic import cleaned_rows
+from listing_index import ListingIndex
+
+# The table's columns; the dashboard joins Link to the filtered rows afterwards
+TABLE_COLUMNS = ["Price", "Beds", "Baths", "SqFt", "Address"]
+
+QUERIES = {
+    "default sliders": {"Price": (1000, 50_000_000), "Beds": (1, 5), "Baths": (1, 5), "SqFt": (500, 5000)},
+    "price band": {"Price": (1_000_000, 1_200_000), "Beds": (1, 5), "Baths": (1, 5), "SqFt": (500, 5000)},
+    "narrow": {"Price": (1_000_000, 3_000_000), "Beds": (4, 4), "Baths": (3, 3), "SqFt": (2500, 2600)},
+}
+
+
+# The original dashboard filter
+def mask_and_sort(df, ranges):
+    mask = np.ones(len(df), dtype=bool)
+    for column, (lo, hi) in ranges.items():
+        mask &= (df[column] >= lo) & (df[column] <= hi)
+    return df[mask][TABLE_COLUMNS].sort_values(by="Price", ascending=False, kind="stable")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>11s} {'query':16s} {'matches':>10s} {'mask+sort ms':>13s} {'index ms':>9s} {'speedup':>8s}")
+    for n in args.rows:
+        df = cleaned_rows(n, urls=False)
+        start = time.perf_counter()
+        index = ListingIndex(df)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        for label, ranges in QUERIES.items():
+            expected = mask_and_sort(df, ranges)
+            result = index.query(ranges, columns=TABLE_COLUMNS)
+            pd.testing.assert_frame_equal(result, expected)
+
+            scan_ms = best_ms(lambda: mask_and_sort(df, ranges), args.repeat)
+            index_ms = best_ms(lambda: index.query(ranges, columns=TABLE_COLUMNS), args.repeat)
+            print(f"{n:11,d} {label:16s} {len(result):10,d} {scan_ms:13.2f} {index_ms:9.2f} {scan_ms / index_ms:7.1f}x")
+        print(f"{n:11,d} {'(index build)':16s} {'':>10s} {'':>13s} {build_ms:9.0f}")
+        del df, index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Benchmark: Property Locations map, one folium.Marker per row vs. geo.map_layer()
+#
+#   python benchmarks/bench_map.py [--points 100 10000 100000] [--legacy-max 10000]
+#
+# A synthetic day of cleaned listings (synthetic.py) at each size; times building
+# + rendering the map HTML (what st_folium ships to the browser) and its payload
+# size: the original per-row Marker loop, the clustered layer at the default zoom
+# over the whole area, and a zoomed-in viewport. The layer queries the day's
+# MapIndex, built once per size as the dashboard does (build time not included).
+import argparse
+import time
+
+import folium
+
+from synthetic import LATITUDE, LONGITUDE, cleaned_rows
+from geo import DEFAULT_CENTER, DEFAULT_ZOOM, MapIndex, layer_group, map_layer
+from listing_index import ListingIndex
+
+
+# The original dashboard loop
+def legacy_map(df, selected_address=None):
+    m = folium.Map(location=DEFAULT_CENTER, zoom_start=DEFAULT_ZOOM)
+    for _, row in df.iterrows():
+        popup_info = f"""
+        <b>{row['Address']}</b><br>
+        Price: ${row['Price']:,.0f}<br>
+        Beds: {row['Beds']}, Baths: {row['Baths']}<br>
+        SqFt: {row['SqFt']:,}<br>
+        <a href="{row['Link']}" target="_blank">View Listing</a>
+        """
+        icon_color = "red" if selected_address and row["Address"] == selected_address else "blue"
+        folium.Marker(
+            location=[row["Latitude"], row["Longitude"]],
+            popup=popup_info,
+            icon=folium.Icon(color=icon_color, icon="home"),
+        ).add_to(m)
+    return m
+
+
+def layer_map(df, index, zoom=DEFAULT_ZOOM, bounds=None):
+    m = folium.Map(location=DEFAULT_CENTER, zoom_start=zoom)
+    layer = map_layer(df, zoom, bounds, index=index)
+    layer_group(layer).add_to(m)
+    return m, layer
+
+
+# (seconds, payload bytes) to build the map and render its HTML
+def render(build):
+    start = time.perf_counter()
+    result = build()
+    m = result[0] if isinstance(result, tuple) else result
+    payload = m.get_root().render()
+    return time.perf_counter() - start, len(payload.encode("utf-8")), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--legacy-max", type=int, default=10_000,
+                        help="Largest size to time the per-row Marker loop at (it is linear and slow)")
+    args = parser.parse_args()
+
+    print(f"{'points':>8s} | {'per-row markers':>20s} | {'layer, whole area':>32s} | {'layer, zoomed-in view':>32s}")
+    print(f"{'':>8s} | {'ms':>9s} {'KB':>10s} | {'ms':>7s} {'KB':>8s} {'features':>15s} | "
+          f"{'ms':>7s} {'KB':>8s} {'features':>15s}")
+    for n in args.points:
+        df = cleaned_rows(n)
+        index = MapIndex(ListingIndex(df))
+
+        if n <= args.legacy_max:
+            legacy_s, legacy_bytes, _ = render(lambda: legacy_map(df))
+            legacy = f"{legacy_s * 1000:9.0f} {legacy_bytes / 1024:10.0f}"
+        else:
+            legacy = f"{'skipped':>20s}"
+
+        whole_s, whole_bytes, (_, whole) = render(lambda: layer_map(df, index))
+
+        # A ~1 km view around the middle of the listings at zoom 16
+        lat, lon = sum(LATITUDE) / 2, sum(LONGITUDE) / 2
+        bounds = (lat - 0.005, lon - 0.006, lat + 0.005, lon + 0.006)
+        view_s, view_bytes, (_, view) = render(lambda: layer_map(df, index, zoom=16, bounds=bounds))
+
+        print(f"{n:8,d} | {legacy} | {whole_s * 1000:7.0f} {whole_bytes / 1024:8.0f} "
+              f"{len(whole['features']):6,d} {whole['mode']:>8s} | {view_s * 1000:7.0f} {view_bytes / 1024:8.0f} "
+              f"{len(view['features']):6,d} {view['mode']:>8s}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Benchmark: daily master-dataset update cost, single-file rewrite vs. Date partitions
+#
+#   python benchmarks/bench_master_store.py [--days 200] [--rows 250]
+#
+# Adds synthetic days 1..N (synthetic.py raw rows) to an empty master with both strategies and prints the
+# cost of each day's write. The single-file rewrite grows with history; the
+# partitioned append should stay flat.
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from synthetic import raw_rows
+from storage import append_to_master, load_master
+
+
+# The old update: read everything, concat, dedupe, rewrite everything
+def legacy_append(df, master_file):
+    if os.path.exists(master_file):
+        master_df = pd.read_csv(master_file)
+        df = pd.concat([master_df, df]).drop_duplicates(subset=["Address", "Date"])
+    df.to_csv(master_file, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=250)
+    args = parser.parse_args()
+
+    report_days = {1, 10, 50, 100, 200, 500, 1000, args.days}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file = os.path.join(tmp, "legacy", "master.csv")
+        store_file = os.path.join(tmp, "store", "master.csv")
+        os.makedirs(os.path.dirname(legacy_file))
+
+        print(f"{'day':>6} {'history rows':>13} {'single-file ms':>15} {'partitioned ms':>15}")
+        for day in range(1, args.days + 1):
+            df = raw_rows(args.rows, (date(2025, 1, 1) + timedelta(days=day)).isoformat(), seed=day)
+
+            start = time.perf_counter()
+            legacy_append(df, legacy_file)
+            legacy_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            append_to_master(df, store_file)
+            store_ms = (time.perf_counter() - start) * 1000
+
+            if day in report_days:
+                print(f"{day:>6} {day * args.rows:>13} {legacy_ms:>15.1f} {store_ms:>15.1f}")
+
+        # Readers must see the same frame either way
+        same = pd.read_csv(legacy_file).equals(load_master(store_file))
+        print(f"readers see identical frames: {same}")
+
+
+if __name__ == "__main__":
+    main()
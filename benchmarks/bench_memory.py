@@ -0,0 +1,118 @@
+# Benchmark: bytes per listing in memory, default dtypes vs. compact.py
+#
+#   python benchmarks/bench_memory.py [--rows 1000 10000 100000] [--days 30]
+#
+# The committed cleaned day, a synthetic day of --rows listings (synthetic.py,
+# cleaned by clean_data) and a history of --days days of --rows[0] listings are
+# written as cleaned CSV and read back as the loaders used to keep them
+# (pd.read_csv: object strings, float64 numbers), then converted with
+# compact_listings() plus the listing_urls() table that holds the links. Sizes
+# are DataFrame.memory_usage(deep=True), so Python string objects are counted.
+# Before reporting, it checks that the compact frame holds the same values
+# (coordinates within float32 precision) and that with_urls() gives back every
+# row's Link and Image URL.
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from fixtures import project_root
+from synthetic import raw_history
+from cleanser import clean_data
+from compact import URL_COLUMNS, compact_listings, listing_urls, with_urls
+
+COORDINATE_TOLERANCE = 1e-5   # degrees (~1 m); float32 keeps ~7 significant digits
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+# Cleaned days, written as CSV and read back as the loaders did before compact.py
+def cleaned_frame(days, rows_per_day, directory):
+    frames = []
+    for date, raw in raw_history(days, rows_per_day):
+        frames.append(clean_data(raw))
+    path = os.path.join(directory, f"cleaned_{days}x{rows_per_day}.csv")
+    pd.concat(frames, ignore_index=True).to_csv(path, index=False)
+    df = pd.read_csv(path)
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def check_equivalent(before, compact, urls=None):
+    for column in compact.columns:
+        old, new = before[column], compact[column]
+        if column in ("Latitude", "Longitude"):
+            assert np.allclose(old.to_numpy(float), new.to_numpy(float), rtol=0, atol=COORDINATE_TOLERANCE,
+                               equal_nan=True), column
+        elif pd.api.types.is_numeric_dtype(old):
+            assert np.array_equal(old.to_numpy(float), new.to_numpy(float), equal_nan=True), column
+        else:
+            assert old.astype(object).where(old.notna(), None).tolist() == \
+                new.astype(object).where(new.notna(), None).tolist(), column
+    if urls is None:
+        return
+    # The last row of each listing carries its current URLs
+    latest = before.drop_duplicates("Listing ID", keep="last")
+    joined = with_urls(compact.loc[latest.index], urls)
+    for column in URL_COLUMNS:
+        assert latest[column].fillna("").tolist() == joined[column].fillna("").tolist(), column
+
+
+def measure(label, before, rows):
+    start = time.perf_counter()
+    compact = compact_listings(before)
+    urls = listing_urls(before)
+    seconds = time.perf_counter() - start
+    check_equivalent(before, compact, urls)
+
+    old, new, url_bytes = frame_bytes(before), frame_bytes(compact), frame_bytes(urls)
+    print(f"{label:>18s} {rows:>10,} {old / rows:>12.0f} {new / rows:>13.0f} {url_bytes / rows:>11.0f} "
+          f"{old / (new + url_bytes):>8.1f}x {seconds * 1000:>11.0f}")
+    return compact, urls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Listings per day")
+    parser.add_argument("--days", type=int, default=30, help="Days in the history frame")
+    args = parser.parse_args()
+
+    import logging
+
+    logging.disable(logging.INFO)
+    print(f"{'frame':>18s} {'rows':>10s} {'before B/row':>12s} {'compact B/row':>13s} {'urls B/row':>11s} "
+          f"{'smaller':>9s} {'convert ms':>11s}")
+    committed = pd.read_csv(os.path.join(project_root, "data", "cleaned",
+                                         "redfin_hollywood_hills_cleaned_2025-08-20.csv"))
+    measure("committed day", committed, len(committed))
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            daily = cleaned_frame(1, rows, tmp)
+            day_compact, _ = measure("day", daily, len(daily))
+            breakdown = pd.DataFrame({"before": daily.memory_usage(deep=True, index=False) / len(daily),
+                                      "compact": day_compact.memory_usage(deep=True, index=False) / len(daily)})
+
+        history = cleaned_frame(args.days, args.rows[0], tmp)
+        measure(f"history {args.days} days", history, len(history))
+        # The trends tab keeps the history without URLs (dashboard.HISTORY_COLUMNS)
+        history = history.drop(columns=URL_COLUMNS)
+        compact = compact_listings(history)
+        check_equivalent(history, compact)
+        print(f"{'  trends columns':>18s} {len(history):>10,} {frame_bytes(history) / len(history):>12.0f} "
+              f"{frame_bytes(compact) / len(history):>13.0f} {'':>11s} "
+              f"{frame_bytes(history) / frame_bytes(compact):>8.1f}x")
+
+    print(f"\nbytes per listing by column, day of {args.rows[-1]:,} listings:")
+    breakdown["dtype"] = [str(day_compact[c].dtype) if c in day_compact.columns else "(listing_urls)"
+                          for c in breakdown.index]
+    print(breakdown.round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
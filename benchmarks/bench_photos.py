@@ -0,0 +1,81 @@
+# Benchmark: listing photo downloads (photos.py) against a local image CDN stand-in
+#
+#   python benchmarks/bench_photos.py [--photos 400] [--workers 1 4 16] [--delay 0.05] [--budget-mb 8]
+#
+# A FixtureServer serves --photos distinct JPEG URLs (1024x768, drawn from a few
+# synthetic photos) with --delay seconds of latency each. For each worker count:
+# a cold run into an empty cache (download + thumbnails), then a warm run that
+# must not request anything. Reports throughput and the cache's bytes on disk,
+# and finally re-runs with a --budget-mb cache to show LRU eviction.
+import argparse
+import io
+import os
+import tempfile
+
+import numpy as np
+
+from fixtures import FixtureServer
+from photos import PhotoCache, download_photos
+
+BASE_PHOTOS = 16
+
+
+# Smooth, photo-like JPEGs (upscaled random colour fields), so sizes resemble real listing photos
+def synthetic_jpegs(count, size=(1024, 768)):
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    jpegs = []
+    for _ in range(count):
+        field = rng.integers(0, 256, (12, 16, 3), dtype=np.uint8)
+        image = Image.fromarray(field).resize(size, Image.BICUBIC)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=85)
+        jpegs.append(buffer.getvalue())
+    return jpegs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--delay", type=float, default=0.05, help="Simulated CDN latency per photo (s)")
+    parser.add_argument("--thumbnail-workers", type=int, default=None)
+    parser.add_argument("--budget-mb", type=float, default=8, help="Cache budget of the eviction run")
+    args = parser.parse_args()
+
+    jpegs = synthetic_jpegs(BASE_PHOTOS)
+    paths = {f"/photo/40/islphoto/{i % 1000:03d}/genIslnoResize.{25_000_000 + i}_0.jpg": jpegs[i % BASE_PHOTOS]
+             for i in range(args.photos)}
+    print(f"{args.photos} photos, {sum(map(len, paths.values())) / 2**20:.1f} MB, {args.delay * 1000:.0f} ms latency")
+    print(f"{'workers':>7s} {'run':5s} {'requests':>8s} {'download s':>10s} {'total s':>8s} {'photos/s':>9s} "
+          f"{'MB/s':>6s} {'thumbnails':>10s} {'cache MB':>9s}")
+
+    with FixtureServer(paths, delay=args.delay) as server:
+        urls = [server.url + path for path in paths]
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = PhotoCache(tmp)
+                for run in ("cold", "warm"):
+                    server.requests.clear()
+                    stats = download_photos(urls, cache, workers, args.thumbnail_workers)
+                    assert stats["failed"] == 0
+                    print(f"{workers:7d} {run:5s} {len(server.requests):8d} {stats['download_seconds']:10.2f} "
+                          f"{stats['seconds']:8.2f} {stats['urls'] / stats['seconds']:9.1f} "
+                          f"{stats['bytes_downloaded'] / 2**20 / stats['download_seconds']:6.1f} "
+                          f"{stats['thumbnails']:10d} {stats['cache_bytes'] / 2**20:9.1f}")
+                assert not server.requests, "the warm run re-fetched cached photos"
+
+        # LRU eviction: a cache smaller than the day's photos keeps the most recently used ones
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = PhotoCache(tmp, budget_mb=args.budget_mb)
+            stats = download_photos(urls, cache, max(args.workers), args.thumbnail_workers)
+            print(f"\nbudget {args.budget_mb:g} MB: {stats['evicted']} photos evicted, {stats['cache_photos']} kept, "
+                  f"{stats['cache_bytes'] / 2**20:.1f} MB on disk")
+            assert stats["cache_bytes"] <= args.budget_mb * 2**20
+            kept = sum(os.path.exists(cache.path(url)) for url in urls)
+            print(f"originals still cached: {kept}; a re-run fetches only the evicted ones")
+
+
+if __name__ == "__main__":
+    main()
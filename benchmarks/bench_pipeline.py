@@ -0,0 +1,79 @@
+# Benchmark: scheduler job latency and peak memory, in-process vs. isolated stages
+#
+#   python benchmarks/bench_pipeline.py [--runs 3]
+#
+# Each mode runs in a fresh child process (like a freshly started scheduler) that
+# calls scheduler.run_pipeline() --runs times against a local fixture server
+# (http backend). The first run includes imports; later runs show the cost a
+# long-running scheduler pays per job. Peak RSS covers the job process and, for
+# the isolated mode, its largest stage subprocess. The cleaned outputs of both
+# modes are compared at the end.
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from fixtures import FixtureServer, peak_rss_kb, sample_pages
+
+MODES = ("in-process", "isolated")
+PREFIX = "/neighborhood/547223/CA/Los-Angeles/Hollywood-Hills"
+
+
+def run_one(mode, registry, data_root, runs):
+    from scheduler import run_pipeline
+
+    options = {"backend": "http", "workers": 2, "rate": 1000.0}
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        assert run_pipeline(options=options, isolated=mode == "isolated", registry=registry, data_root=data_root)
+        seconds.append(time.perf_counter() - start)
+
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    print(json.dumps({"seconds": seconds, "rss_mb": peak_rss_kb() / 1024, "children_rss_mb": children_kb / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--run-one", nargs=3, metavar=("MODE", "REGISTRY", "DATA_ROOT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(*args.run_one, args.runs)
+        return
+
+    with FixtureServer(sample_pages(PREFIX)) as server, tempfile.TemporaryDirectory() as tmp:
+        registry = os.path.join(tmp, "regions.json")
+        with open(registry, "w") as f:
+            json.dump({"regions": [{"id": "hollywood_hills", "name": "Hollywood Hills",
+                                    "url": server.url + PREFIX, "slug": "redfin_hollywood_hills"}]}, f)
+
+        print(f"{'mode':11s} {'first run':>10s} {'later runs':>11s} {'peak RSS':>9s} {'stage RSS':>10s}")
+        outputs = {}
+        for mode in MODES:
+            data_root = os.path.join(tmp, mode)
+            result = subprocess.run(
+                [sys.executable, __file__, "--runs", str(args.runs), "--run-one", mode, registry, data_root],
+                check=True, capture_output=True, text=True,
+            )
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            later = stats["seconds"][1:] or stats["seconds"]
+            stage = f"{stats['children_rss_mb']:9.0f}M" if mode == "isolated" else f"{'-':>10s}"
+            print(f"{mode:11s} {stats['seconds'][0]:9.2f}s {sum(later) / len(later):10.2f}s "
+                  f"{stats['rss_mb']:8.0f}M {stage}")
+
+            cleaned_dir = os.path.join(data_root, "cleaned")
+            daily = sorted(f for f in os.listdir(cleaned_dir) if f.endswith(".csv"))
+            with open(os.path.join(cleaned_dir, daily[0]), encoding="utf-8") as f:
+                outputs[mode] = f.read()
+
+        print(f"identical cleaned output: {outputs['in-process'] == outputs['isolated']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Benchmark: multi-region scrape + clean throughput vs. process count
+#
+#   python benchmarks/bench_regions.py [--regions 8] [--processes 1 2 4 8] [--delay 0.25]
+#
+# One local fixture server stands in for several Redfin regions (each region is
+# the committed raw scrape served under its own path), a temporary registry
+# points at them, and runner.run_regions() scrapes (http backend) and cleans all
+# of them into a temporary data directory for each process count.
+import argparse
+import contextlib
+import glob
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from fixtures import FixtureServer, build_pages, project_root
+from runner import run_regions
+
+
+def build_regions(n_regions, server_url=None):
+    raw_file = os.path.join(project_root, "data", "raw", "redfin_hollywood_hills_2025-08-20.csv")
+    rows = pd.read_csv(raw_file, dtype=str)
+    pages, registry = {}, []
+    for i in range(n_regions):
+        prefix = f"/neighborhood/{i}/CA/Region-{i}"
+        pages.update(build_pages(rows, prefix=prefix))
+        registry.append({"id": f"region_{i}", "name": f"Region {i}", "slug": f"redfin_region_{i}",
+                         "url": (server_url or "") + prefix})
+    return pages, registry
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--regions", type=int, default=8)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--region-workers", type=int, default=2)
+    parser.add_argument("--delay", type=float, default=0.25, help="Simulated server latency per page (s)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    pages, _ = build_regions(args.regions)
+    pages_per_region = len(pages) // args.regions
+
+    with FixtureServer(pages, delay=args.delay) as server, tempfile.TemporaryDirectory() as tmp:
+        _, registry = build_regions(args.regions, server.url)
+        registry_file = os.path.join(tmp, "regions.json")
+        with open(registry_file, "w") as f:
+            json.dump({"regions": registry}, f)
+
+        print(f"{args.regions} regions x {pages_per_region} pages, {args.region_workers} sessions per region, "
+              f"{args.delay:.2f}s latency")
+        print(f"{'processes':>9s} {'seconds':>8s} {'pages/s':>8s} {'listings/s':>10s} {'speedup':>8s}")
+        baseline = None
+        for processes in args.processes:
+            data_root = os.path.join(tmp, f"data_{processes}")
+            start = time.perf_counter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results, failures = run_regions(
+                    processes=processes, region_workers=args.region_workers, rate=1000.0,
+                    backend="http", registry=registry_file, data_root=data_root,
+                )
+            elapsed = time.perf_counter() - start
+            if failures:
+                sys.exit(f"failed regions: {failures}")
+
+            # Every region wrote its own namespaced raw and cleaned files
+            for region in registry:
+                assert glob.glob(os.path.join(data_root, "raw", f"{region['slug']}_????-??-??.csv"))
+                assert glob.glob(os.path.join(data_root, "cleaned", f"{region['slug']}_cleaned_*.csv"))
+
+            listings = sum(stats["listings"] for stats in results)
+            baseline = baseline or elapsed
+            print(f"{processes:9d} {elapsed:8.2f} {args.regions * pages_per_region / elapsed:8.1f} "
+                  f"{listings / elapsed:10.0f} {baseline / elapsed:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Benchmark: killing a scrape mid-way and resuming it from its journal
+#
+#   python benchmarks/bench_resume.py [--pages 12] [--kill-after 5] [--delay 0.3] [--workers 2]
+#
+# A local fixture server serves --pages result pages (the committed raw scrape,
+# repeated with fresh listing ids) with --delay seconds of latency per page.
+# scraper.py runs in a subprocess (http backend) and is SIGKILLed once its journal
+# holds --kill-after pages; a second run for the same date must fetch only the
+# pages the journal does not have. Its daily file is compared with the one of an
+# uninterrupted run.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from fixtures import CARDS_PER_PAGE, FixtureServer, build_pages, project_root
+from journal import journal_path
+from regions import raw_daily_path
+
+PREFIX = "/neighborhood/1/CA/Resume-Test"
+REGION = {"id": "resume_test", "name": "Resume Test", "slug": "redfin_resume_test"}
+
+
+def synthetic_rows(pages):
+    sample = pd.read_csv(os.path.join(project_root, "data", "raw", "redfin_hollywood_hills_2025-08-20.csv"), dtype=str)
+    rows = sample.sample(n=pages * CARDS_PER_PAGE, replace=True, random_state=0).reset_index(drop=True)
+    ids = (10_000_000 + rows.index).astype(str)
+    rows["Link"] = "https://www.redfin.com/CA/Los-Angeles/Resume-Test/home/" + ids
+    rows["Address"] = ids + " Resume Test Dr, Los Angeles, CA 90068"
+    return rows
+
+
+def scraper_command(registry, data_root, workers):
+    return [sys.executable, os.path.join(project_root, "src", "scraper.py"), "--backend", "http",
+            "--workers", str(workers), "--rate", "1000", "--region", REGION["id"], "--registry", registry,
+            "--data-root", data_root]
+
+
+def journaled_pages(path):
+    if not os.path.exists(path):
+        return set()
+    pages = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                pages.add(json.loads(line)["page"])
+            except json.JSONDecodeError:
+                pass
+    return pages
+
+
+def page_number(path):
+    return 1 if path == PREFIX else int(path.rsplit("-", 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--kill-after", type=int, default=5, help="Journaled pages before the run is killed")
+    parser.add_argument("--delay", type=float, default=0.3, help="Simulated server latency per page (s)")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    pages = build_pages(synthetic_rows(args.pages), prefix=PREFIX)
+    with FixtureServer(pages, delay=args.delay) as server, tempfile.TemporaryDirectory() as tmp:
+        registry = os.path.join(tmp, "regions.json")
+        with open(registry, "w") as f:
+            json.dump({"regions": [{**REGION, "url": server.url + PREFIX}]}, f)
+
+        # 1. Uninterrupted reference run
+        start = time.perf_counter()
+        subprocess.run(scraper_command(registry, os.path.join(tmp, "reference"), args.workers),
+                       check=True, capture_output=True)
+        reference_seconds = time.perf_counter() - start
+        date = pd.Timestamp.today().strftime("%Y-%m-%d")
+        reference = pd.read_csv(raw_daily_path(REGION, date, os.path.join(tmp, "reference")), dtype=str)
+
+        # 2. Killed run
+        data_root = os.path.join(tmp, "resumed")
+        journal = journal_path(raw_daily_path(REGION, date, data_root))
+        server.requests.clear()
+        start = time.perf_counter()
+        process = subprocess.Popen(scraper_command(registry, data_root, args.workers),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while len(journaled_pages(journal)) < args.kill_after and process.poll() is None:
+            time.sleep(0.01)
+        process.kill()
+        process.wait()
+        killed_seconds = time.perf_counter() - start
+        checkpointed = journaled_pages(journal)
+        first_requests = [page_number(path) for path in server.requests]
+
+        # 3. Resumed run
+        server.requests.clear()
+        start = time.perf_counter()
+        subprocess.run(scraper_command(registry, data_root, args.workers), check=True, capture_output=True)
+        resumed_seconds = time.perf_counter() - start
+        resumed_requests = [page_number(path) for path in server.requests]
+        resumed = pd.read_csv(raw_daily_path(REGION, date, data_root), dtype=str)
+
+    print(f"{args.pages} pages x {CARDS_PER_PAGE} listings, {args.delay:.2f}s per page, {args.workers} workers")
+    print(f"{'run':13s} {'seconds':>8s} {'pages fetched':>14s}")
+    print(f"{'uninterrupted':13s} {reference_seconds:8.2f} {args.pages:14d}")
+    print(f"{'killed':13s} {killed_seconds:8.2f} {len(first_requests):14d}  ({len(checkpointed)} journaled)")
+    print(f"{'resumed':13s} {resumed_seconds:8.2f} {len(resumed_requests):14d}")
+
+    refetched = sorted(set(resumed_requests) & checkpointed)
+    expected = set(range(1, args.pages + 1)) - checkpointed
+    print(f"re-fetched journaled pages: {refetched or 'none'}")
+    print(f"resumed run fetched exactly the remaining pages: {sorted(resumed_requests) == sorted(expected)}")
+    print(f"journal removed after saving: {not os.path.exists(journal)}")
+    print(f"daily file identical to the uninterrupted run: {resumed.equals(reference)}")
+    if refetched or sorted(resumed_requests) != sorted(expected) or not resumed.equals(reference):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Benchmark: Historical Trends queries, full scan vs. daily rollups
+#
+#   python benchmarks/bench_rollups.py [--years 10] [--rows-per-day 300] [--repeat 5]
+#
+# Builds a synthetic cleaned master (one Date partition per day of synthetic.py's
+# cleaned history, listings selling and being repriced), then answers the trends tab
+# (average price and listings per date + describe() summary) for the full
+# history, the last year and the last 30 days, by scanning the listings and by
+# merging rollups.py rows. Also times the incremental rollup refresh after a new
+# day is appended, and checks the rollup summary against the exact one.
+import argparse
+import os
+import tempfile
+import time
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from fixtures import best_ms
+from synthetic import cleaned_history, write_partitions
+from dashboard import read_history
+from rollups import ALPHA, daily_series, load_rollups, rebuild_rollups, rollup_path, summarize, update_rollups
+from storage import append_to_master
+
+METRICS = ["Price", "Price per SqFt", "Beds", "Baths", "SqFt"]
+
+
+# Trends tab answered by scanning the listings
+def scan_query(history, start, end):
+    df = history[(history["Date"] >= start) & (history["Date"] <= end)]
+    daily = pd.DataFrame({"Price": df.groupby("Date")["Price"].mean(),
+                          "Listings": df.groupby("Date")["Address"].count()})
+    df = df.assign(**{"Price per SqFt": df["Price"] / df["SqFt"].where(df["SqFt"] > 0)})
+    return daily, df[METRICS].describe()
+
+
+# Trends tab answered from the rollups
+def rollup_query(rollup_file, start, end):
+    daily = daily_series(load_rollups(rollup_file, start, end, columns=["Date", "listings", "Price|sum", "Price|count"]))
+    return daily, summarize(load_rollups(rollup_file, start, end))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--rows-per-day", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        master = os.path.join(tmp, "region_master_cleaned.csv")
+        history_days = cleaned_history(args.years * 365 + 1, args.rows_per_day, start="2016-01-01", urls=False)
+        start = time.perf_counter()
+        dates = pd.to_datetime(write_partitions(master, islice(history_days, args.years * 365)))
+        print(f"{len(dates):,} days x {args.rows_per_day} listings written in {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        history = read_history(master)
+        load_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        rebuild_rollups(master)
+        rollup_file = rollup_path(master)
+        print(f"load master for scanning: {load_ms:,.0f} ms ({len(history):,} rows); "
+              f"rollup build: {(time.perf_counter() - start) * 1000:,.0f} ms "
+              f"({os.path.getsize(rollup_file) / 2**20:.1f} MB)")
+
+        end = dates[-1]
+        ranges = {"full history": dates[0], "last year": end - pd.Timedelta(days=364),
+                  "last 30 days": end - pd.Timedelta(days=29)}
+        print(f"\n{'range':14s} {'scan ms':>9s} {'rollup ms':>10s} {'speedup':>8s} {'max quartile err':>17s}")
+        for label, first in ranges.items():
+            scan_daily, exact = scan_query(history, first, end)
+            rollup_daily, approx = rollup_query(rollup_file, first, end)
+
+            # Exact parts of the summary and the trend charts must match the scan
+            np.testing.assert_allclose(rollup_daily["Price"].to_numpy(), scan_daily["Price"].to_numpy())
+            np.testing.assert_array_equal(rollup_daily["Listings"].to_numpy(), scan_daily["Listings"].to_numpy())
+            exact_rows = ["count", "mean", "std", "min", "max"]
+            np.testing.assert_allclose(approx.loc[exact_rows, METRICS], exact.loc[exact_rows, METRICS], rtol=1e-6)
+
+            # Quartiles come from the sketches: relative error bounded by ALPHA
+            quartiles = ["25%", "50%", "75%"]
+            error = (np.abs(approx.loc[quartiles, METRICS] - exact.loc[quartiles, METRICS])
+                     / exact.loc[quartiles, METRICS].abs()).max().max()
+
+            scan_ms = best_ms(lambda: scan_query(history, first, end), args.repeat)
+            rollup_ms = best_ms(lambda: rollup_query(rollup_file, first, end), args.repeat)
+            print(f"{label:14s} {scan_ms:9.1f} {rollup_ms:10.1f} {scan_ms / rollup_ms:7.0f}x {error:16.2%}")
+
+        # The cleanser appends one more day: only that day is rolled up again
+        new_date, day_df = next(history_days)
+        append_to_master(day_df, master)
+        start = time.perf_counter()
+        update_rollups(master, [new_date])
+        update_ms = (time.perf_counter() - start) * 1000
+        assert load_rollups(rollup_file).num_rows == len(dates) + 1
+        print(f"\nincremental refresh after appending {new_date}: {update_ms:.1f} ms")
+        print(f"quartile error bound: {ALPHA:.0%}")
+
+
+if __name__ == "__main__":
+    main()
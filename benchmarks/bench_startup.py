@@ -0,0 +1,85 @@
+# Benchmark: cold import time of each entry point, with a budget per module
+#
+#   python benchmarks/bench_startup.py [--repeat 3]
+#
+# Imports every entry point in a fresh interpreter under `python -X importtime`
+# (best of --repeat runs) and fails when an import exceeds its budget, pulls in a
+# dependency that should load lazily, or has side effects (rewrapped stdout,
+# logging handlers installed).
+import argparse
+import os
+import subprocess
+import sys
+
+from fixtures import project_root
+
+# module: (budget in ms, modules that must not be imported)
+BUDGETS = {
+    "scraper": (150, ["selenium", "webdriver_manager", "pandas", "pyarrow", "requests"]),
+    "runner": (150, ["selenium", "pandas", "pyarrow"]),
+    "scheduler": (150, ["apscheduler", "selenium", "pandas"]),
+    "cleanser": (150, ["selenium", "requests", "matplotlib", "pandas", "pyarrow", "numpy"]),
+    "storage": (150, ["pandas", "pyarrow", "numpy"]),
+    "rollups": (150, ["pandas", "pyarrow", "numpy"]),
+    "dashboard": (1500, ["matplotlib", "seaborn", "folium", "streamlit_folium", "selenium"]),
+}
+
+SIDE_EFFECT_CHECK = (
+    "import logging, sys; stdout = sys.stdout; import {module}; "
+    "assert sys.stdout is stdout, 'sys.stdout was replaced'; "
+    "assert not logging.getLogger().handlers, 'logging was configured'"
+)
+
+
+# (cumulative import time in ms, names of every module imported)
+def import_profile(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.join(project_root, "src"), capture_output=True, text=True, check=True,
+    )
+    cumulative, imported = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if not total.strip().isdigit():
+            continue  # header line
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative = int(total) / 1000
+    return cumulative, imported
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':10s} {'import ms':>10s} {'budget':>7s}  eager heavy imports")
+    for module, (budget, forbidden) in BUDGETS.items():
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        best = min(ms for ms, _ in runs)
+        eager = sorted({name for name in runs[0][1] if name.split(".")[0] in forbidden and "." not in name})
+        print(f"{module:10s} {best:10.0f} {budget:7d}  {', '.join(eager) or '-'}")
+
+        if best > budget:
+            failures.append(f"{module}: {best:.0f} ms > {budget} ms")
+        if eager:
+            failures.append(f"{module}: imports {', '.join(eager)} eagerly")
+
+        side_effects = subprocess.run(
+            [sys.executable, "-c", SIDE_EFFECT_CHECK.format(module=module)],
+            cwd=os.path.join(project_root, "src"), capture_output=True, text=True,
+        )
+        if side_effects.returncode != 0:
+            failures.append(f"{module}: {side_effects.stderr.strip().splitlines()[-1]}")
+
+    if failures:
+        sys.exit("FAILED\n  " + "\n  ".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
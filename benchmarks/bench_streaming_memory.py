@@ -0,0 +1,103 @@
+# Benchmark: peak memory of the streaming historical cleanser
+#
+#   python benchmarks/bench_streaming_memory.py [--gb 2] [--max-memory-mb 256] [--cap-mb 448]
+#
+# Writes a multi-GB synthetic raw master (Date partitions built by resampling the
+# committed raw rows, with repeated (Address, Date) rows spread across chunk
+# boundaries), then runs cleanser.stream_data_prep() in a child process and fails
+# if its peak RSS exceeds --cap-mb or if the cleaned master has the wrong rows.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from fixtures import peak_rss_kb, project_root
+
+DAYS = 365
+DUPLICATE_SHARE = 0.01
+
+
+# Write one Date partition per day until the raw master reaches target_bytes;
+# returns the number of distinct valid (Address, Date) rows the cleaner should keep
+def write_synthetic_master(master_file, target_bytes, days=DAYS):
+    import pandas as pd
+
+    from cleanser import clean_data
+    from storage import partition_dir, partition_path
+
+    sample = pd.read_csv(os.path.join(project_root, "data", "raw", "redfin_hollywood_hills_master.csv"), dtype=str)
+    bytes_per_row = len(sample.to_csv(index=False).encode("utf-8")) / len(sample)
+    rows_per_day = max(1, int(target_bytes / days / bytes_per_row))
+
+    os.makedirs(partition_dir(master_file), exist_ok=True)
+    expected = 0
+    for day, date in enumerate(pd.date_range("2020-01-01", periods=days).strftime("%Y-%m-%d")):
+        day_df = sample.sample(n=rows_per_day, replace=True, random_state=day).reset_index(drop=True)
+        day_df["Address"] = day_df["Address"] + " #" + day_df.index.astype(str)
+        day_df["Date"] = date
+        # Re-scraped listings: repeats of earlier rows at the end of the partition
+        repeats = day_df.sample(frac=DUPLICATE_SHARE, random_state=day)
+        day_df = pd.concat([day_df, repeats], ignore_index=True)
+        day_df.to_csv(partition_path(master_file, date), index=False)
+
+        expected += len(clean_data(day_df.copy()).drop_duplicates(subset=["Address", "Date"]))
+    return expected
+
+
+def run_one(raw_master, cleaned_master, max_memory_mb):
+    from cleanser import stream_data_prep
+
+    start = time.perf_counter()
+    stats = stream_data_prep(raw_master, cleaned_master, max_memory_mb=max_memory_mb)
+    stats["seconds"] = time.perf_counter() - start
+    stats["peak_rss_mb"] = peak_rss_kb() / 1024
+    print(json.dumps(stats))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gb", type=float, default=2.0, help="Size of the synthetic raw master")
+    parser.add_argument("--max-memory-mb", type=int, default=256)
+    parser.add_argument("--cap-mb", type=int, default=None,
+                        help="Peak RSS limit (default: the budget plus 192 MB for Python, pandas and pyarrow)")
+    parser.add_argument("--workdir", default=None)
+    parser.add_argument("--run-one", nargs=3, metavar=("RAW", "CLEANED", "MB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        raw_master, cleaned_master, mb = args.run_one
+        run_one(raw_master, cleaned_master, int(mb))
+        return
+
+    cap_mb = args.cap_mb or args.max_memory_mb + 192
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        raw_master = os.path.join(tmp, "raw_master.csv")
+        cleaned_master = os.path.join(tmp, "cleaned_master.csv")
+
+        start = time.perf_counter()
+        expected = write_synthetic_master(raw_master, args.gb * 2**30)
+        from storage import list_partitions
+        size = sum(os.path.getsize(f) for f in list_partitions(raw_master))
+        print(f"synthetic raw master: {size / 2**30:.2f} GB in {len(list_partitions(raw_master))} partitions "
+              f"({time.perf_counter() - start:.0f}s to write)")
+
+        output = subprocess.run(
+            [sys.executable, __file__, "--run-one", raw_master, cleaned_master, str(args.max_memory_mb)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        stats = json.loads(output.strip().splitlines()[-1])
+
+        print(f"streamed {stats['rows_read']:,} rows in {stats['chunks']} chunks of {stats['chunk_rows']:,} "
+              f"in {stats['seconds']:.0f}s — {stats['rows_added']:,} rows kept (expected {expected:,})")
+        print(f"peak RSS: {stats['peak_rss_mb']:.0f} MB (budget {args.max_memory_mb} MB, cap {cap_mb} MB)")
+
+        assert stats["rows_added"] == expected, "cleaned master has the wrong number of rows"
+        assert stats["peak_rss_mb"] <= cap_mb, f"peak RSS {stats['peak_rss_mb']:.0f} MB exceeds {cap_mb} MB"
+        print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# Benchmark: time to first render of the dashboard after a pipeline run, with and without warm-up
+#
+#   python benchmarks/bench_warmup.py [--days 60] [--rows-per-day 5000]
+#
+# A copy of src/ and config/ in a temporary project gets a synthetic history
+# (synthetic.py, --days - 1 cleaned days). A child process stands in for the
+# long-running Streamlit server: it renders one session (streamlit.testing
+# AppTest, the whole script) on the existing data, then the pipeline writes a
+# new day, and the child times the first session after the run and a second one.
+# In "warm" mode src/warmup.py runs (as the scheduler starts it, in its own
+# process) between the pipeline and the first session.
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from fixtures import project_root
+from synthetic import raw_history
+
+MODES = ("cold", "warm")
+REGION = "hollywood_hills"
+
+
+# Child: a dashboard server stand-in on the copied project (its own src/ first on sys.path)
+def serve(project):
+    sys.path.insert(0, os.path.join(project, "src"))
+    from streamlit.testing.v1 import AppTest
+
+    def session():
+        start = time.perf_counter()
+        app = AppTest.from_file(os.path.join(project, "src", "dashboard.py"), default_timeout=300).run()
+        assert not app.exception, app.exception
+        return (time.perf_counter() - start) * 1000
+
+    print(json.dumps({"before_run_ms": session()}), flush=True)
+    sys.stdin.readline()   # the pipeline has written a new day
+    first = session()
+    print(json.dumps({"first_ms": first, "second_ms": session()}), flush=True)
+
+
+# Next JSON line of the server stand-in; its log when it died instead
+def read_result(server, server_log):
+    line = server.stdout.readline()
+    if not line:
+        server.wait()
+        server_log.seek(0)
+        raise RuntimeError(f"dashboard session failed:\n{server_log.read()[-4000:]}")
+    return json.loads(line)
+
+
+# Clean one raw day into the copied project, as the pipeline does
+def pipeline_day(date, raw, data_root):
+    from cleanser import run_data_prep
+    from regions import raw_daily_path
+
+    path = raw_daily_path(REGION, date, data_root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    raw.to_csv(path, index=False)
+    assert run_data_prep(date, region=REGION, data_root=data_root, df=raw)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--rows-per-day", type=int, default=5000)
+    parser.add_argument("--serve", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    import logging
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "base")
+        for folder in ("src", "config"):
+            shutil.copytree(os.path.join(project_root, folder), os.path.join(base, folder),
+                            ignore=shutil.ignore_patterns("__pycache__"))
+        days = list(raw_history(args.days, args.rows_per_day))
+        start = time.perf_counter()
+        for date, raw in days[:-1]:
+            pipeline_day(date, raw, os.path.join(base, "data"))
+        print(f"{args.days - 1} days x {args.rows_per_day:,} listings written in {time.perf_counter() - start:.0f}s; "
+              f"the pipeline run adds {days[-1][0]}")
+        print(f"{'mode':5s} {'warm-up s':>9s} {'server session before run ms':>29s} {'first session ms':>17s} "
+              f"{'second session ms':>18s}")
+
+        for mode in MODES:
+            project = os.path.join(tmp, mode)
+            shutil.copytree(base, project)
+            # Streamlit's bare-mode warnings go to a file, shown only if the server fails
+            server_log = open(os.path.join(tmp, f"{mode}.log"), "w+")
+            server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", project],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=server_log, text=True)
+            before = read_result(server, server_log)
+
+            pipeline_day(*days[-1], os.path.join(project, "data"))
+            warm_seconds = 0.0
+            if mode == "warm":
+                start = time.perf_counter()
+                subprocess.run([sys.executable, os.path.join(project, "src", "warmup.py"), "--region", REGION],
+                               check=True, capture_output=True)
+                warm_seconds = time.perf_counter() - start
+
+            server.stdin.write("go\n")
+            server.stdin.flush()
+            after = read_result(server, server_log)
+            server.wait()
+            server_log.close()
+            print(f"{mode:5s} {warm_seconds:9.1f} {before['before_run_ms']:29.0f} {after['first_ms']:17.0f} "
+                  f"{after['second_ms']:18.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# Import libraries
+import html
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Resolve project root and make src/ importable ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# Runs recorded by the benchmarks (and their child processes) go to a temp file, not logs/metrics.jsonl
+os.environ.setdefault("PROPERTY_PULSE_METRICS_FILE",
+                      os.path.join(tempfile.gettempdir(), "property_pulse_benchmarks", "metrics.jsonl"))
+
+CARDS_PER_PAGE = 40
+
+
+# --- Timing ---
+
+# Best and median milliseconds of `repeat` calls; `setup` runs untimed before each call
+def measure(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return {"best_ms": round(min(times) * 1000, 3), "median_ms": round(statistics.median(times) * 1000, 3),
+            "runs": repeat}
+
+
+def best_ms(fn, repeat=1, setup=None):
+    return measure(fn, repeat, setup)["best_ms"]
+
+
+# Peak RSS of this process in KB; VmHWM resets on exec, unlike ru_maxrss on Linux
+def peak_rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+# Render one HomeCard the way Redfin's search results page does
+def render_card(row):
+    geo = {"@type": "SingleFamilyResidence"}
+    if row["Latitude"] != "N/A":   # cards without coordinates have no "geo" entry
+        geo["geo"] = {"latitude": float(row["Latitude"]), "longitude": float(row["Longitude"])}
+    return f"""
+<div class="HomeCardContainer flex justify-center">
+  <div class="bp-Homecard bp-InteractiveHomecard">
+    <a class="bp-Homecard bp-Homecard--link" href="{html.escape(row['Link'])}">
+      <div class="bp-Homecard__Photo"><img class="bp-Homecard__Photo--image" src="{html.escape(row['Image URL'])}" alt="{html.escape(row['Address'])}"></div>
+    </a>
+    <div class="bp-Homecard__Content">
+      <div class="bp-Homecard__Price"><span class="bp-Homecard__Price--value">{html.escape(str(row['Price']))}</span></div>
+      <div class="bp-Homecard__Stats">
+        <span class="bp-Homecard__Stats--beds text-nowrap">{html.escape(str(row['Beds']))}</span>
+        <span class="bp-Homecard__Stats--baths text-nowrap">{html.escape(str(row['Baths']))}</span>
+        <span class="bp-Homecard__Stats--sqft text-nowrap"><span class="bp-Homecard__LockedStat--value">{html.escape(str(row['SqFt']))}</span><span class="bp-Homecard__LockedStat--label">sq ft</span></span>
+      </div>
+      <div class="bp-Homecard__Address flex align-center color-text-primary font-body-xsmall-compact">{html.escape(row['Address'])}</div>
+    </div>
+    <script type="application/ld+json">{json.dumps([{"@context": "http://schema.org"}, geo])}</script>
+  </div>
+</div>"""
+
+
+# Render a full search-results page with pagination anchors
+def render_page(rows, page_number, total_pages):
+    # An empty search shows the site's no-results notice instead of cards
+    cards = "".join(render_card(row) for row in rows) or \
+        '\n<div class="NoResults"><h2>No results found</h2><p>Try changing your filters.</p></div>'
+    pager = "".join(
+        f'<a class="clickable goToPage" href="/page-{n}" aria-label="page {n}">{n}</a>'
+        for n in range(1, total_pages + 1)
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Hollywood Hills Homes for Sale - page {page_number}</title></head>
+<body>
+<div id="sidepane-header"><h1>Hollywood Hills, Los Angeles, CA Homes for Sale</h1></div>
+<div class="HomeCardsContainer flex flex-wrap">{cards}
+</div>
+<div class="PagingControls">{pager}</div>
+</body></html>"""
+
+
+# Split raw listing rows into {url path: page html}, using Redfin's /page-N scheme
+def build_pages(df, prefix="", cards_per_page=CARDS_PER_PAGE):
+    rows = df.to_dict("records")
+    chunks = [rows[i:i + cards_per_page] for i in range(0, len(rows), cards_per_page)] or [[]]
+    pages = {}
+    for n, chunk in enumerate(chunks, start=1):
+        path = prefix if n == 1 else f"{prefix}/page-{n}"
+        pages[path or "/"] = render_page(chunk, n, len(chunks))
+    return pages
+
+
+# Pages built from the committed raw scrape (the closest thing to saved Redfin HTML)
+def sample_pages(prefix=""):
+    import pandas as pd
+
+    raw_file = os.path.join(project_root, "data", "raw", "redfin_hollywood_hills_2025-08-20.csv")
+    return build_pages(pd.read_csv(raw_file, dtype=str), prefix=prefix)
+
+
+class _PagesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+    def __init__(self, *args, pages=None, delay=0.0, log=None, **kwargs):
+        self.pages = pages
+        self.delay = delay
+        self.log = log
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/") or "/"
+        if self.log is not None:
+            self.log.append(path)
+        page = self.pages.get(path)
+        if page is None:
+            self.send_error(404)
+            return
+        if self.delay:
+            threading.Event().wait(self.delay)
+        if isinstance(page, bytes):   # e.g. listing photos for an image CDN stand-in
+            body, content_type = page, "image/jpeg"
+        else:
+            body, content_type = page.encode("utf-8"), "text/html; charset=utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # the client went away (e.g. a scraper killed mid-page)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# --- Local stand-in for redfin.com ---
+# Serves {path: html or bytes} from a background thread; use as a context manager.
+# `requests` lists the paths asked for, in arrival order.
+class FixtureServer:
+    def __init__(self, pages, delay=0.0):
+        self.requests = []
+        handler = partial(_PagesHandler, pages=pages, delay=delay, log=self.requests)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# Minimal stand-in for a WebDriver session (get / page_source / quit), for runs without Chrome
+class UrllibDriver:
+    def __init__(self, startup_delay=0.0):
+        if startup_delay:
+            threading.Event().wait(startup_delay)
+        self.page_source = ""
+
+    def get(self, url):
+        with urllib.request.urlopen(url) as response:
+            self.page_source = response.read().decode("utf-8")
+
+    def quit(self):
+        pass
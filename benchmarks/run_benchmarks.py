@@ -0,0 +1,187 @@
+# Benchmark suite: the pipeline's hot paths on synthetic data, results saved as JSON
+#
+#   python benchmarks/run_benchmarks.py [--rows 100000] [--days 90] [--rows-per-day 2000] [--repeat 5]
+#                                       [--only extraction cleaning ...] [--compare latest|FILE]
+#
+# Generates the data with synthetic.py (raw rows in the scraper's string formats,
+# a daily history with churn and price changes, HomeCard pages) and times:
+#
+#   extraction   parse_page() per results page (40 cards)
+#   cleaning     clean_data() on one --rows raw scrape
+#   merge        append_to_master() of one new day into a --days partitioned master (with its typed twin)
+#   load         read_daily() of a --rows cleaned daily file (typed twin and CSV), read_history() of the master
+#   filter       ListingIndex build and the sidebar queries on the --rows day
+#   aggregation  daily rollups of the history, trends and summary from the rollups vs. a master scan
+#
+# Each case reports best and median wall time over --repeat runs. Results go to
+# benchmarks/results/<timestamp>.json with the commit, Python version and
+# parameters; --compare prints the change against an earlier results file
+# (`latest`: the newest one with the same parameters).
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from fixtures import CARDS_PER_PAGE, measure, project_root
+from synthetic import raw_history, raw_rows, synthetic_pages
+from cleanser import clean_data
+from dashboard import read_daily, read_history
+from extraction import parse_page
+from listing_index import ListingIndex
+from rollups import daily_series, rollup_frame, summarize
+from storage import CLEANED_SCHEMA, append_to_master, typed_path, write_typed
+
+RESULTS_DIR = os.path.join(project_root, "benchmarks", "results")
+CASES = ["extraction", "cleaning", "merge", "load", "filter", "aggregation"]
+
+# Sidebar settings: the defaults, a narrow price band, a narrow everything
+QUERIES = {
+    "default sliders": {"Price": (1000, 50_000_000), "Beds": (1, 5), "Baths": (1, 5), "SqFt": (500, 5000)},
+    "price band": {"Price": (1_000_000, 1_200_000), "Beds": (1, 5), "Baths": (1, 5), "SqFt": (500, 5000)},
+    "narrow": {"Price": (1_000_000, 3_000_000), "Beds": (4, 4), "Baths": (3, 3), "SqFt": (2500, 2600)},
+}
+
+
+def bench_extraction(args, results, tmp):
+    pages = list(synthetic_pages(max(args.rows // 25, CARDS_PER_PAGE)).values())
+    cards = sum(len(parse_page(html)[0]) for html in pages)
+    result = measure(lambda: [parse_page(html) for html in pages], args.repeat)
+    per_page = {key: round(value / len(pages), 3) if key.endswith("_ms") else value for key, value in result.items()}
+    results["extraction.parse_page"] = {**per_page, "rows": cards // len(pages), "unit": "per page"}
+
+
+def bench_cleaning(args, results, tmp):
+    raw = raw_rows(args.rows)
+    results["cleaning.clean_data"] = {**measure(clean_data, args.repeat, setup=lambda: (raw.copy(),)),
+                                      "rows": args.rows}
+
+
+# Cleaned history of --days days in a partitioned master under `tmp` (plus `extra` days not stored yet)
+def build_master(args, tmp, extra=0):
+    days = [(date, clean_data(df)) for date, df in raw_history(args.days + extra, args.rows_per_day)]
+    master = os.path.join(tmp, "cleaned", "bench_master_cleaned.csv")
+    append_to_master(pd.concat([df for _, df in days[:args.days]], ignore_index=True), master, schema=CLEANED_SCHEMA)
+    return master, days
+
+
+def bench_merge(args, results, tmp):
+    master, days = build_master(args, os.path.join(tmp, "merge"), extra=args.repeat)
+    new_days = iter(df for _, df in days[args.days:])
+    # Every run appends the next day: repeating one day would only time the "already stored" path
+    result = measure(lambda df: append_to_master(df, master, schema=CLEANED_SCHEMA), args.repeat,
+                     setup=lambda: (next(new_days),))
+    results["merge.append_to_master"] = {**result, "rows": args.rows_per_day, "history_days": args.days}
+
+
+def bench_load(args, results, tmp):
+    daily = clean_data(raw_rows(args.rows))
+    typed_file = os.path.join(tmp, "load", "bench_cleaned_typed.csv")
+    csv_file = os.path.join(tmp, "load", "bench_cleaned_csv.csv")
+    os.makedirs(os.path.dirname(typed_file), exist_ok=True)
+    daily.to_csv(typed_file, index=False)
+    write_typed(daily, typed_path(typed_file), CLEANED_SCHEMA)
+    daily.to_csv(csv_file, index=False)
+    results["load.read_daily.typed"] = {**measure(lambda: read_daily(typed_file), args.repeat), "rows": len(daily)}
+    results["load.read_daily.csv"] = {**measure(lambda: read_daily(csv_file), args.repeat), "rows": len(daily)}
+
+    master, days = build_master(args, os.path.join(tmp, "load"))
+    rows = sum(len(df) for _, df in days)
+    results["load.read_history"] = {**measure(lambda: read_history(master), args.repeat), "rows": rows}
+
+
+def bench_filter(args, results, tmp):
+    df = clean_data(raw_rows(args.rows))
+    results["filter.build_index"] = {**measure(lambda: ListingIndex(df), args.repeat), "rows": len(df)}
+    index = ListingIndex(df)
+    for name, ranges in QUERIES.items():
+        results[f"filter.query.{name}"] = {**measure(lambda: index.query(ranges), args.repeat), "rows": len(df),
+                                           "matches": index.count(ranges)}
+
+
+def bench_aggregation(args, results, tmp):
+    master, _ = build_master(args, os.path.join(tmp, "aggregation"))
+    history = read_history(master)
+    results["aggregation.rollup_frame"] = {**measure(lambda: rollup_frame(history), args.repeat),
+                                           "rows": len(history)}
+    table = rollup_frame(history)
+    results["aggregation.trends.rollups"] = {**measure(lambda: (daily_series(table), summarize(table)), args.repeat),
+                                             "rows": len(history)}
+
+    def scan():
+        df = read_history(master)
+        return df.groupby("Date")["Price"].agg(["mean", "count"]), df[["Price", "Beds", "Baths", "SqFt"]].describe()
+
+    results["aggregation.trends.scan"] = {**measure(scan, args.repeat), "rows": len(history)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def find_baseline(compare, params):
+    if compare != "latest":
+        return compare
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")), reverse=True):
+        with open(path) as f:
+            if json.load(f).get("params") == params:
+                return path
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000, help="Listings in one day's scrape")
+    parser.add_argument("--days", type=int, default=90, help="Days of history in the master")
+    parser.add_argument("--rows-per-day", type=int, default=2000, help="Listings per day of history")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--compare", default=None, help="Earlier results file, or `latest`")
+    parser.add_argument("--output", default=None, help="Results file (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    params = {"rows": args.rows, "days": args.days, "rows_per_day": args.rows_per_day, "repeat": args.repeat}
+    baseline_file = find_baseline(args.compare, params) if args.compare else None
+    baseline = {}
+    if baseline_file:
+        with open(baseline_file) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for case in args.only:
+            start = time.perf_counter()
+            globals()[f"bench_{case}"](args, results, tmp)
+            print(f"⏱ {case} done in {time.perf_counter() - start:.1f}s")
+
+    started = datetime.now()
+    output = args.output or os.path.join(RESULTS_DIR, f"{started:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"started": started.isoformat(timespec="seconds"), "commit": git_commit(),
+                   "python": platform.python_version(), "platform": platform.platform(),
+                   "cpus": os.cpu_count(), "pandas": pd.__version__, "params": params, "results": results},
+                  f, indent=2)
+
+    print(f"\n{'case':34s} {'rows':>9s} {'best ms':>10s} {'median ms':>10s}"
+          + (f" {'vs. ' + os.path.basename(baseline_file):>24s}" if baseline_file else ""))
+    for name, result in results.items():
+        line = f"{name:34s} {result['rows']:9d} {result['best_ms']:10.3f} {result['median_ms']:10.3f}"
+        if name in baseline:
+            line += f" {result['best_ms'] / baseline[name]['best_ms']:23.2f}x"
+        print(line)
+    print(f"\nresults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# Import libraries
+import os
+
+import numpy as np
+import pandas as pd
+
+from fixtures import build_pages
+
+# --- Synthetic Redfin data ---
+# Raw listing rows in the scraper's exact string formats, at any size:
+#
+#   Price "$1,547,000"   Beds "2 beds" / "1 bed" / "— beds"   Baths "3.5 baths" / "1 bath" / "— baths"
+#   SqFt "1,552" / "—"   Latitude/Longitude "34.1110294" (from the card's ld+json) / "N/A"
+#
+# Distributions follow the committed Hollywood Hills scrape: log-normal prices
+# and square footage, ~15% of cards without beds/baths/sqft, coordinates inside
+# the neighbourhood's bounding box. Everything is drawn from a seeded generator,
+# so a given (rows, days, seed) always produces the same data.
+#
+# The cleaned_* generators give what clean_data() makes of the same listings
+# (typed columns, rows missing an essential value dropped), built from the
+# attributes directly: nothing to render and parse, so millions of rows are cheap.
+# Without `urls`, Link and Image URL are left out (as in the dashboard's compact
+# frames), which keeps 10M-row frames in memory.
+
+RAW_COLUMNS = ["Listing ID", "Price", "Address", "Beds", "Baths", "SqFt", "Link", "Image URL", "Latitude",
+               "Longitude", "Date"]
+
+STREETS = ["Verde Oak Dr", "Castilian Dr", "N Beachwood Dr", "Cahuenga Ter", "Holly Dr", "La Presa Dr", "Taft Ave",
+           "Deronda Dr", "Hollywood Blvd", "Barham Blvd", "W Gill Way", "Cahuenga Park Trl", "Mulholland Dr",
+           "Outpost Dr", "Woodrow Wilson Dr", "Nichols Canyon Rd", "Laurel Canyon Blvd", "Lake Hollywood Dr"]
+ZIP_CODES = ["90068", "90068", "90068", "90046", "90028"]
+
+PRICE_LOG_MEAN, PRICE_LOG_STD = 14.16, 1.03
+SQFT_LOG_MEAN, SQFT_LOG_STD = 7.7, 0.58
+LATITUDE = (34.1018, 34.1378)
+LONGITUDE = (-118.3638, -118.3083)
+
+MISSING_STATS_SHARE = 0.15    # cards without beds/baths ("— beds")
+MISSING_SQFT_SHARE = 0.16     # cards with "—" square footage (all of the above, and a few more)
+MISSING_GEO_SHARE = 0.005     # cards whose ld+json has no geo ("N/A")
+NO_CITY_SHARE = 0.01          # addresses without ", City, ST zip"
+
+FIRST_LISTING_ID = 7_000_000
+
+
+# Numeric attributes of n listings (the values the strings are rendered from)
+def listing_attributes(n, rng, first_id=FIRST_LISTING_ID):
+    beds = np.clip(rng.poisson(3.2, n), 0, 24)
+    baths = np.clip(np.round(beds * rng.uniform(0.6, 1.3, n) * 2) / 2, 1, 22)
+    return pd.DataFrame({
+        "id": first_id + np.arange(n),
+        "price": np.round(np.exp(rng.normal(PRICE_LOG_MEAN, PRICE_LOG_STD, n)), -3).astype(np.int64).clip(5_000),
+        "beds": beds,
+        "baths": baths,
+        "sqft": np.exp(rng.normal(SQFT_LOG_MEAN, SQFT_LOG_STD, n)).round().astype(np.int64).clip(150),
+        "missing_stats": rng.random(n) < MISSING_STATS_SHARE,
+        "missing_sqft": rng.random(n) < MISSING_SQFT_SHARE - MISSING_STATS_SHARE,
+        "missing_geo": rng.random(n) < MISSING_GEO_SHARE,
+        "latitude": rng.uniform(*LATITUDE, n),
+        "longitude": rng.uniform(*LONGITUDE, n),
+        "number": rng.integers(1000, 9999, n),
+        "street": rng.integers(0, len(STREETS), n),
+        "zip": rng.integers(0, len(ZIP_CODES), n),
+        "no_city": rng.random(n) < NO_CITY_SHARE,
+        "photo": rng.integers(0, 3, n),
+    })
+
+
+def _thousands(values):
+    return pd.Series(values).map("{:,}".format)
+
+
+# Street address (number and street) and full address of each listing; every
+# distinct address is built once and shared by the rows that have it
+def _addresses(a):
+    streets, zips = np.array(STREETS, dtype=object), np.array(ZIP_CODES, dtype=object)
+    combos = ((a["number"].to_numpy() * len(STREETS) + a["street"].to_numpy()) * len(ZIP_CODES)
+              + a["zip"].to_numpy()) * 2 + a["no_city"].to_numpy()
+    unique, codes = np.unique(combos, return_inverse=True)
+    no_city, rest = unique % 2 == 1, unique // 2
+    number, street = rest // len(ZIP_CODES) // len(STREETS), rest // len(ZIP_CODES) % len(STREETS)
+    street_address = np.array([f"{n} {st}" for n, st in zip(number, streets[street])], dtype=object)
+    full = np.array([sa if nc else f"{sa}, Los Angeles, CA {z}"
+                     for sa, nc, z in zip(street_address, no_city, zips[rest % len(ZIP_CODES)])], dtype=object)
+    return pd.Series(street_address[codes]), pd.Series(full[codes])
+
+
+# Render listing attributes as the scraper's raw string rows
+def render_rows(attributes, date):
+    a = attributes.reset_index(drop=True)
+    ids = a["id"].astype(str)
+
+    beds = a["beds"].astype(str) + np.where(a["beds"] == 1, " bed", " beds")
+    whole = a["baths"] % 1 == 0
+    baths = (a["baths"].astype(int).astype(str).where(whole, a["baths"].astype(str))
+             + np.where(a["baths"] == 1, " bath", " baths"))
+    zip_code = pd.Series(np.array(ZIP_CODES, dtype=object)[a["zip"]])
+    street_address, address = _addresses(a)
+    slug = street_address.str.replace(" ", "-", regex=False) + "-" + zip_code
+
+    return pd.DataFrame({
+        "Listing ID": ids,
+        "Price": "$" + _thousands(a["price"]),
+        "Address": address,
+        "Beds": beds.mask(a["missing_stats"], "— beds"),
+        "Baths": baths.mask(a["missing_stats"], "— baths"),
+        "SqFt": _thousands(a["sqft"]).mask(a["missing_stats"] | a["missing_sqft"], "—"),
+        "Link": "https://www.redfin.com/CA/Los-Angeles/" + slug + "/home/" + ids,
+        "Image URL": ("https://ssl.cdn-redfin.com/photo/40/islphoto/" + (a["id"] % 1000).map("{:03d}".format)
+                      + "/genIslnoResize." + (a["id"] + 18_000_000).astype(str) + "_" + a["photo"].astype(str)
+                      + ".jpg"),
+        "Latitude": a["latitude"].round(7).astype(str).mask(a["missing_geo"], "N/A"),
+        "Longitude": a["longitude"].round(7).astype(str).mask(a["missing_geo"], "N/A"),
+        "Date": date,
+    }, columns=RAW_COLUMNS)
+
+
+# One day's raw scrape of `rows` listings
+def raw_rows(rows, date="2025-08-20", seed=0):
+    return render_rows(listing_attributes(rows, np.random.default_rng(seed)), date)
+
+
+# Cleaned listings from their attributes (see cleaned_rows)
+def render_cleaned(attributes, date, urls=True):
+    a = attributes[~(attributes["missing_stats"] | attributes["missing_sqft"] | attributes["missing_geo"])]
+    a = a.reset_index(drop=True)
+    df = pd.DataFrame({
+        "Listing ID": a["id"].to_numpy(),
+        "Price": a["price"].to_numpy(dtype=float),
+        "Address": _addresses(a)[1],
+        "Beds": a["beds"].to_numpy(dtype=float),
+        "Baths": a["baths"].to_numpy(dtype=float),
+        "SqFt": a["sqft"].to_numpy(dtype=float),
+    })
+    if urls:
+        rendered = render_rows(a, date)
+        df["Link"], df["Image URL"] = rendered["Link"], rendered["Image URL"]
+    df["Latitude"] = a["latitude"].round(7).to_numpy()
+    df["Longitude"] = a["longitude"].round(7).to_numpy()
+    df["Date"] = date
+    return df
+
+
+# One day of cleaned listings (clean_data(raw_rows(...)) without the strings in between)
+def cleaned_rows(rows, date="2025-08-20", seed=0, urls=True, first_id=FIRST_LISTING_ID):
+    return render_cleaned(listing_attributes(rows, np.random.default_rng(seed), first_id), date, urls)
+
+
+# Attributes of a market that changes from day to day: each day about `churn` of
+# the listings sell (and as many new ones come up) and `repriced` of the remaining
+# ones change price. Yields (date, listing attributes) per day.
+def market_history(days, rows_per_day, start="2025-01-01", churn=0.03, repriced=0.02, seed=0):
+    rng = np.random.default_rng(seed)
+    listings = listing_attributes(rows_per_day, rng)
+    next_id = FIRST_LISTING_ID + rows_per_day
+    for date in pd.date_range(start, periods=days).strftime("%Y-%m-%d"):
+        yield date, listings
+
+        sold = rng.random(len(listings)) < churn
+        listings = listings[~sold].copy()
+        new = listing_attributes(int(sold.sum()), rng, first_id=next_id)
+        next_id += len(new)
+        cuts = rng.random(len(listings)) < repriced
+        new_prices = listings.loc[cuts, "price"] * rng.uniform(0.9, 1.02, cuts.sum())
+        listings.loc[cuts, "price"] = np.round(new_prices, -3).astype(np.int64)
+        listings = pd.concat([listings, new], ignore_index=True)
+
+
+# Daily raw scrapes of market_history(): (date, raw rows) per day
+def raw_history(days, rows_per_day, **kwargs):
+    for date, listings in market_history(days, rows_per_day, **kwargs):
+        yield date, render_rows(listings, date)
+
+
+# Daily cleaned snapshots of market_history(): (date, cleaned listings) per day
+def cleaned_history(days, rows_per_day, urls=True, **kwargs):
+    for date, listings in market_history(days, rows_per_day, **kwargs):
+        yield date, render_cleaned(listings, date, urls)
+
+
+# Write (date, frame) days as the Date partitions of a master; returns the dates
+def write_partitions(master_file, days):
+    from storage import partition_dir, partition_path
+
+    os.makedirs(partition_dir(master_file), exist_ok=True)
+    dates = []
+    for date, df in days:
+        df.to_csv(partition_path(master_file, date), index=False)
+        dates.append(date)
+    return dates
+
+
+# Average price and number of listings per date over `days` days (a trends tab series)
+def daily_trend(days=365, start="2025-01-01", seed=1):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=days, name="Date")
+    return pd.DataFrame({"Price": 2e6 + rng.normal(0, 1e5, days).cumsum(), "Listings": rng.integers(150, 250, days)},
+                        index=index)
+
+
+# All days of raw_history() as one raw master frame
+def raw_master(days, rows_per_day, **kwargs):
+    return pd.concat([df for _, df in raw_history(days, rows_per_day, **kwargs)], ignore_index=True)
+
+
+# Search-result pages ({url path: html}) with `rows` synthetic HomeCards, for the
+# scraper's extraction and a FixtureServer
+def synthetic_pages(rows, prefix="", seed=0):
+    return build_pages(raw_rows(rows, seed=seed), prefix=prefix)
@@ -0,0 +1,115 @@
+# Import libraries
+import logging
+import random
+
+# --- Fetch backends ---
+# "selenium": a full Chrome session per worker (see scraper.init_chrome_driver)
+# "http":     plain keep-alive HTTP requests; the listing cards and their ld+json
+#             geo data are in the server-rendered HTML, so no browser is needed.
+#             A Chrome session is started only if a page turns out to need JS.
+BACKENDS = ("selenium", "http")
+
+# Optional: List of randomized user agents
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Firefox/119.0"
+]
+
+REQUEST_TIMEOUT = 30
+
+# Statuses a bot wall or challenge page answers with: retried in the browser, not raised
+BLOCKED_STATUSES = (403, 429, 503)
+
+
+# One pooled, keep-alive requests.Session shared by every HttpSession
+def create_http_client(pool_size=10):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    client = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    client.mount("http://", adapter)
+    client.mount("https://", adapter)
+    client.headers.update({
+        "User-Agent": random.choice(USER_AGENTS),
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+    return client
+
+
+# Markers of the site's empty search results page ("No results found"): a valid page without cards
+NO_RESULTS_MARKERS = ('class="NoResults', "No results found")
+
+
+# True when the static HTML has no listing cards (client-side rendered or a bot wall);
+# a genuine no-results page is returned as it is
+def needs_js(html):
+    if any(marker in html for marker in NO_RESULTS_MARKERS):
+        return False
+    return "HomeCardContainer" not in html or "bp-Homecard" not in html
+
+
+# Driver-like wrapper around the shared HTTP client: get(url) / page_source / quit()
+class HttpSession:
+    def __init__(self, client):
+        self.client = client
+        self.page_source = ""
+
+    def get(self, url):
+        response = self.client.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        self.page_source = response.text
+
+    def quit(self):
+        pass
+
+
+# HTTP first; falls back to a (lazily started) Selenium driver for pages that need JS
+# or that the HTTP client was blocked from (BLOCKED_STATUSES). The driver loads
+# pages with page_loader(driver, url) (scraper.load_page waits for the listing
+# cards to render); without one, driver.get(url).
+class HybridSession(HttpSession):
+    def __init__(self, client, driver_factory, page_loader=None):
+        super().__init__(client)
+        self.driver_factory = driver_factory
+        self.page_loader = page_loader or (lambda driver, url: driver.get(url))
+        self.driver = None
+        self.fallbacks = 0
+
+    def get(self, url):
+        import requests
+
+        try:
+            super().get(url)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in BLOCKED_STATUSES:
+                raise
+            logging.info(f"🌐 {url} answered HTTP {e.response.status_code} — falling back to Selenium")
+        else:
+            if not needs_js(self.page_source):
+                return
+            logging.info(f"🌐 {url} needs JavaScript — falling back to Selenium")
+
+        if self.driver is None:
+            self.driver = self.driver_factory()
+        self.page_loader(self.driver, url)
+        self.page_source = self.driver.page_source
+        self.fallbacks += 1
+
+    def quit(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+
+# Session factory for the chosen backend (used by the scraper and the session pool)
+def session_factory(backend, driver_factory, pool_size=10, page_loader=None):
+    if backend == "selenium":
+        return driver_factory
+
+    client = create_http_client(pool_size)
+    return lambda: HybridSession(client, driver_factory, page_loader)
+
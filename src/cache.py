@@ -0,0 +1,185 @@
+# Import libraries
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# --- Persistent frame cache ---
+# Loaded DataFrames are cached under a key built from the loader name, its
+# arguments and the (path, mtime, size) of every file it reads, so any write by
+# the scraper or cleanser changes the key and the stale entry is never served.
+#
+#   memory tier: LRU of frames in this process (shared by every Streamlit session),
+#                bounded by memory_budget_mb
+#   disk tier:   one Arrow IPC file per key (dtypes, categories and index kept),
+#                shared across processes and server restarts, bounded by disk_budget_mb
+#
+# Stale entries are not deleted eagerly; they age out of both LRUs.
+# FORMAT is part of every key: bumping it when the loaders change what they
+# return keeps frames cached on disk by older code from being served.
+
+DEFAULT_MEMORY_MB = 512
+DEFAULT_DISK_MB = 2048
+FORMAT = 2   # 2: compact listing dtypes, URL columns in their own frame (compact.py)
+
+OUTCOMES = {"memory_hits": "memory hit", "disk_hits": "disk hit", "misses": "miss"}
+
+
+# (path, mtime_ns, size) for each source file; missing files are recorded as such
+def fingerprint(paths):
+    stamps = []
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+            stamps.append((path, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamps.append((path, None, None))
+    return stamps
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+class FrameCache:
+    def __init__(self, directory, memory_budget_mb=DEFAULT_MEMORY_MB, disk_budget_mb=DEFAULT_DISK_MB):
+        self.directory = directory
+        self.memory_budget = memory_budget_mb * 2**20
+        self.disk_budget = disk_budget_mb * 2**20
+        self.frames = OrderedDict()   # key -> (DataFrame, nbytes)
+        self.memory_used = 0
+        self.lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "seconds": 0.0}
+
+    def key(self, name, args, sources):
+        payload = json.dumps([FORMAT, name, args, fingerprint(sources)], default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, f"{key}.arrow")
+
+    # Cached frame for (name, args) if current, else load() it and cache the result.
+    # Returns a shallow copy, so callers can add or drop columns without touching the cache.
+    def get(self, name, args, sources, load):
+        start = time.perf_counter()
+        key = self.key(name, args, sources)
+
+        df, outcome = self._from_memory(key), "memory_hits"
+        if df is None:
+            df, outcome = self._from_disk(key), "disk_hits"
+            if df is not None:
+                self._remember(key, df)
+        if df is None:
+            df, outcome = load(), "misses"
+            self._remember(key, df)
+            self._save(key, df)
+
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.stats[outcome] += 1
+            self.stats["seconds"] += elapsed
+        logging.info(f"🗄 {name}{tuple(args)}: {OUTCOMES[outcome]} in {elapsed * 1000:.1f} ms "
+                     f"(hit rate {self.hit_rate():.0%})")
+        return df.copy(deep=False)
+
+    def hit_rate(self):
+        total = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        return (self.stats["memory_hits"] + self.stats["disk_hits"]) / total if total else 0.0
+
+    def summary(self):
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        return {
+            **{k: v for k, v in self.stats.items() if k != "seconds"},
+            "hit_rate": self.hit_rate(),
+            "avg_ms": self.stats["seconds"] / lookups * 1000 if lookups else 0.0,
+            "memory_mb": self.memory_used / 2**20,
+            "frames_in_memory": len(self.frames),
+        }
+
+    # --- memory tier ---
+
+    def _from_memory(self, key):
+        with self.lock:
+            entry = self.frames.get(key)
+            if entry is None:
+                return None
+            self.frames.move_to_end(key)
+            return entry[0]
+
+    def _remember(self, key, df):
+        nbytes = frame_nbytes(df)
+        if nbytes > self.memory_budget:
+            return  # too big to keep in memory; the disk tier still has it
+        with self.lock:
+            if key in self.frames:
+                return
+            self.frames[key] = (df, nbytes)
+            self.memory_used += nbytes
+            while self.memory_used > self.memory_budget:
+                _, (_, evicted) = self.frames.popitem(last=False)
+                self.memory_used -= evicted
+
+    # --- disk tier ---
+
+    def _from_disk(self, key):
+        import pyarrow as pa
+
+        path = self._disk_path(key)
+        try:
+            with pa.memory_map(path) as source:
+                table = pa.ipc.open_file(source).read_all()
+            os.utime(path)  # mark as recently used
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        return table.to_pandas()
+
+    def _save(self, key, df):
+        import pyarrow as pa
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            with pa.ipc.new_file(tmp_path, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+        except (pa.ArrowException, OSError) as e:
+            logging.warning(f"⚠️ Could not cache frame on disk: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict_disk()
+
+    # Drop least recently used files until the directory fits the disk budget
+    def _evict_disk(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".arrow"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        used = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if used <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+                used -= size
+            except FileNotFoundError:
+                pass
+
+
+# One cache per directory per process: Streamlit re-runs the dashboard script on
+# every interaction, but imported modules (and so this registry) persist
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_frame_cache(directory, memory_budget_mb=DEFAULT_MEMORY_MB, disk_budget_mb=DEFAULT_DISK_MB):
+    with _caches_lock:
+        if directory not in _caches:
+            _caches[directory] = FrameCache(directory, memory_budget_mb, disk_budget_mb)
+        return _caches[directory]
@@ -0,0 +1,183 @@
+# Import libraries
+import glob
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from storage import list_partitions, load_master, partition_dir, partition_path, PARTITION_PATTERN
+
+# --- Listing change tracking ---
+# Each daily snapshot in the cleaned master is diffed against the previous one on
+# `Listing ID` (a hash index: pandas Index.get_indexer), emitting one event per
+# change into an append-only event table partitioned by Date, next to the master
+# ("<slug>_master_cleaned_events/Date=YYYY-MM-DD.csv"):
+#
+#   new                a listing that was not in the previous snapshot
+#   removed            a listing of the previous snapshot that is gone (delisted or sold)
+#   price_changed      same listing, different Price
+#   attribute_changed  same listing, different Address / Beds / Baths / SqFt ("Changed" lists them)
+#
+# A date's events depend only on its snapshot and the previous one, so the cost is
+# proportional to a day's listings, not to the history. The first snapshot is the
+# baseline and has no events. Recomputing a date replaces its partition.
+
+TRACKED_ATTRIBUTES = ["Address", "Beds", "Baths", "SqFt"]
+SNAPSHOT_COLUMNS = ["Listing ID", "Price", *TRACKED_ATTRIBUTES]
+EVENT_COLUMNS = ["Date", "Listing ID", "Event", "Address", "Price", "Previous Price", "Previous Date", "Changed"]
+EVENT_TYPES = ["new", "removed", "price_changed", "attribute_changed"]
+
+
+# "<name>_master_cleaned.csv" -> "<name>_master_cleaned_events.csv" (a partitioned table)
+def events_path(master_file):
+    return os.path.splitext(master_file)[0] + "_events.csv"
+
+
+def _partition_dates(master_file):
+    return [PARTITION_PATTERN.search(path).group(1) for path in list_partitions(master_file)]
+
+
+def _differs(current, previous):
+    current, previous = np.asarray(current), np.asarray(previous)
+    return (current != previous) & ~(pd.isna(current) & pd.isna(previous))
+
+
+# Columns of one kind of event as arrays; scalars are repeated, and Series are
+# taken positionally (not aligned on their Listing ID index)
+def _events(date, previous_date, event, listing_ids, address, price, previous_price, changed=""):
+    values = {
+        "Date": date, "Listing ID": listing_ids, "Event": event, "Address": address,
+        "Price": price, "Previous Price": previous_price, "Previous Date": previous_date, "Changed": changed,
+    }
+    n = len(listing_ids)
+    return {column: np.full(n, value) if np.ndim(value) == 0 else np.asarray(value)
+            for column, value in values.items()}
+
+
+# Events between two snapshots (DataFrames with SNAPSHOT_COLUMNS)
+def diff_snapshots(previous, current, date, previous_date):
+    previous = previous.dropna(subset=["Listing ID"]).drop_duplicates(subset="Listing ID").set_index("Listing ID")
+    current = current.dropna(subset=["Listing ID"]).drop_duplicates(subset="Listing ID").set_index("Listing ID")
+
+    # Position of each current listing in the previous snapshot (-1: not there)
+    matches = previous.index.get_indexer(current.index)
+    is_new = matches < 0
+    is_removed = np.ones(len(previous), dtype=bool)
+    is_removed[matches[~is_new]] = False
+
+    new = current[is_new]
+    removed = previous[is_removed]
+    now = current[~is_new]
+    before = previous.iloc[matches[~is_new]]
+
+    price_changed = _differs(now["Price"], before["Price"])
+    changed = pd.Series("", index=now.index)
+    for column in TRACKED_ATTRIBUTES:
+        changed += np.where(_differs(now[column], before[column]), column + ",", "")
+    attribute_changed = (changed != "").to_numpy()
+
+    events = [
+        _events(date, previous_date, "new", new.index, new["Address"], new["Price"], np.nan),
+        _events(date, previous_date, "removed", removed.index, removed["Address"], np.nan, removed["Price"]),
+        _events(date, previous_date, "price_changed", now.index[price_changed], now["Address"][price_changed],
+                now["Price"][price_changed], before["Price"].to_numpy()[price_changed]),
+        _events(date, previous_date, "attribute_changed", now.index[attribute_changed],
+                now["Address"][attribute_changed], now["Price"][attribute_changed],
+                before["Price"].to_numpy()[attribute_changed], changed[attribute_changed].str.rstrip(",")),
+    ]
+    return pd.DataFrame({column: np.concatenate([e[column] for e in events]) for column in EVENT_COLUMNS})
+
+
+def _read_snapshot(master_file, date):
+    return pd.read_csv(partition_path(master_file, date), usecols=lambda c: c in SNAPSHOT_COLUMNS)
+
+
+def _write_events(events, events_file, date):
+    os.makedirs(partition_dir(events_file), exist_ok=True)
+    path = partition_path(events_file, date)
+    tmp_path = path + ".tmp"
+    events.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+# Recompute the events of `dates` (and of the snapshot following each of them,
+# whose previous snapshot may have changed) from the master's Date partitions
+# (without an event table yet, the whole history is diffed once)
+def update_events(master_file, dates, events_file=None):
+    events_file = events_file or events_path(master_file)
+    if not list_partitions(events_file):
+        return rebuild_events(master_file, events_file)
+
+    partition_dates = _partition_dates(master_file)
+    position = {date: i for i, date in enumerate(partition_dates)}
+
+    todo = set()
+    for date in pd.to_datetime(pd.Series(list(dates)), errors="coerce", format="ISO8601").dropna():
+        i = position.get(date.strftime("%Y-%m-%d"))
+        if i is not None:
+            todo.update(j for j in (i, i + 1) if 0 < j < len(partition_dates))
+
+    counts = dict.fromkeys(EVENT_TYPES, 0)
+    for i in sorted(todo):
+        date, previous_date = partition_dates[i], partition_dates[i - 1]
+        events = diff_snapshots(_read_snapshot(master_file, previous_date), _read_snapshot(master_file, date),
+                                date, previous_date)
+        _write_events(events, events_file, date)
+        _count(counts, events)
+    if todo:
+        logging.info(f"🔁 Listing changes for {len(todo)} dates: {_describe(counts)}")
+    return counts
+
+
+# Rebuild the whole event table, reading each snapshot once
+def rebuild_events(master_file, events_file=None):
+    events_file = events_file or events_path(master_file)
+    counts = dict.fromkeys(EVENT_TYPES, 0)
+    previous, previous_date = None, None
+    for date in _partition_dates(master_file):
+        current = _read_snapshot(master_file, date)
+        if previous is not None:
+            events = diff_snapshots(previous, current, date, previous_date)
+            _write_events(events, events_file, date)
+            _count(counts, events)
+        previous, previous_date = current, date
+    logging.info(f"🔁 Rebuilt listing events: {events_file} ({_describe(counts)})")
+    return counts
+
+
+def _count(counts, events):
+    for event, count in events["Event"].value_counts().items():
+        counts[event] += int(count)
+
+
+def _describe(counts):
+    return ", ".join(f"{count} {event}" for event, count in counts.items())
+
+
+# The event table, typed
+def load_events(events_file):
+    if not list_partitions(events_file):
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    events = load_master(events_file)
+    events["Date"] = pd.to_datetime(events["Date"], errors="coerce")
+    events["Previous Date"] = pd.to_datetime(events["Previous Date"], errors="coerce")
+    events["Changed"] = events["Changed"].fillna("")
+    return events
+
+
+# Price changes with their absolute and relative change, largest drops first
+def price_changes(events):
+    changes = events[events["Event"] == "price_changed"].copy()
+    changes["Change"] = changes["Price"] - changes["Previous Price"]
+    changes["Change %"] = changes["Change"] / changes["Previous Price"] * 100
+    return changes.sort_values("Change %")
+
+
+if __name__ == "__main__":
+    # Rebuild the event tables of every partitioned cleaned master under data/cleaned
+    project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    for master_dir in sorted(glob.glob(os.path.join(project_root, "data", "cleaned", "*_master_cleaned"))):
+        rebuild_events(master_dir + ".csv")
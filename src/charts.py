@@ -0,0 +1,260 @@
+# Import libraries
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# --- Dashboard charts ---
+# The data behind each chart (histogram, KDE, category counts) is computed with
+# NumPy, separately from drawing. Drawing uses a standalone matplotlib Figure
+# (never registered with pyplot, so nothing accumulates across reruns), is saved
+# as PNG bytes and released. PNGs are memoized in a bounded LRU keyed by a digest
+# of the exact input values and chart options, so a rerun with the same filters
+# and data version reuses the image, and any change to either draws a new one.
+# With a directory, PNGs are also kept on disk (<key>.png, LRU within
+# disk_budget_mb), so other processes (a restarted server, the post-pipeline
+# warm-up in warmup.py) share the images drawn once.
+
+DEFAULT_CHART_CACHE_MB = 64
+DEFAULT_CHART_DISK_MB = 256
+DPI = 200   # what st.pyplot uses
+
+KDE_GRIDSIZE = 200
+KDE_CUT = 0   # bandwidths the curve extends past the data (0: data range, as sns.histplot)
+
+
+# --- Chart data ---
+
+# Histogram counts and bin edges
+def histogram(values, bins=30):
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    return np.histogram(values, bins=bins)
+
+
+# Gaussian KDE on a grid, scaled to histogram counts for bins of `bin_width`.
+# Binned estimate: values are histogrammed on the grid and convolved with the
+# kernel, O(n + grid * kernel) instead of O(n * grid). Scott's rule bandwidth.
+def kde_curve(values, bin_width, gridsize=KDE_GRIDSIZE, cut=KDE_CUT):
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    n = len(values)
+    if n < 2 or values.std() == 0:
+        return np.array([]), np.array([])
+
+    bandwidth = values.std(ddof=1) * n ** (-1 / 5)
+    grid = np.linspace(values.min() - cut * bandwidth, values.max() + cut * bandwidth, gridsize)
+    step = grid[1] - grid[0]
+
+    # Linear binning: each value is split between its two neighbouring grid points
+    position = (values - grid[0]) / step
+    left = np.clip(np.floor(position).astype(int), 0, gridsize - 2)
+    weight = position - left
+    binned = (np.bincount(left, weights=1 - weight, minlength=gridsize)
+              + np.bincount(left + 1, weights=weight, minlength=gridsize))
+
+    half_width = int(np.ceil(4 * bandwidth / step))
+    offsets = np.arange(-half_width, half_width + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    density = np.convolve(binned, kernel)[half_width:half_width + gridsize] / n
+    return grid, density * n * bin_width
+
+
+# Sorted distinct values and how often each occurs
+def category_counts(values):
+    values = np.asarray(values, dtype=float)
+    return np.unique(values[np.isfinite(values)], return_counts=True)
+
+
+# Colors of a matplotlib colormap for n categories, light to dark (as seaborn palettes)
+def palette(name, n):
+    from matplotlib import colormaps
+
+    return colormaps[name](np.linspace(0, 1, n + 2)[1:-1])
+
+
+def _label(value):
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+# --- Drawing ---
+
+def _render(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=DPI, bbox_inches="tight")
+    fig.clear()
+    return buffer.getvalue()
+
+
+def _new_figure(figsize, ncols=1):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots(1, ncols)
+
+
+# Price histogram with its KDE curve (x axis in $M)
+def draw_price_histogram(prices, bins=30):
+    from matplotlib.ticker import FuncFormatter
+
+    counts, edges = histogram(prices, bins)
+    grid, curve = kde_curve(prices, edges[1] - edges[0]) if len(edges) > 1 else ([], [])
+
+    fig, ax = _new_figure((8, 4))
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", color="C0", alpha=0.75, edgecolor="white")
+    ax.plot(grid, curve, color="C0")
+    ax.xaxis.set_major_formatter(FuncFormatter(lambda x, _: f"${x/1_000_000:.0f}M"))
+    ax.set_xlabel("Price ($)")
+    ax.set_ylabel("Count")
+    return _render(fig)
+
+
+# Bedrooms and bathrooms count bars side by side
+def draw_beds_baths(beds, baths):
+    fig, axes = _new_figure((12, 5), ncols=2)
+    for ax, values, cmap, title, label in [(axes[0], beds, "Blues", "Number of Bedrooms", "Beds"),
+                                           (axes[1], baths, "Reds", "Number of Bathrooms", "Baths")]:
+        categories, counts = category_counts(values)
+        ax.bar([_label(c) for c in categories], counts, color=palette(cmap, len(categories)))
+        ax.set_title(title)
+        ax.set_xlabel(label)
+        ax.set_ylabel("count")
+    return _render(fig)
+
+
+# One line chart of a date-indexed series
+def draw_trend(series, title, ylabel, color="C0", money=False):
+    from matplotlib.ticker import FuncFormatter
+
+    fig, ax = _new_figure((10, 5))
+    ax.plot(series.index, series.to_numpy(), marker="o", linestyle="-", color=color)
+    if money:
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"${x/1e6:.1f}M"))
+    ax.set_ylabel(ylabel)
+    ax.set_xlabel("Date")
+    ax.set_title(title)
+    fig.autofmt_xdate()
+    return _render(fig)
+
+
+# --- PNG cache ---
+
+# Digest of the chart inputs: arrays by their bytes, everything else by repr
+def chart_key(name, *inputs, **options):
+    digest = hashlib.sha1(name.encode("utf-8"))
+    for value in inputs:
+        if hasattr(value, "index") and hasattr(value, "to_numpy"):   # Series: index matters too
+            digest.update(np.ascontiguousarray(value.index.to_numpy()).tobytes())
+            value = value.to_numpy()
+        array = np.ascontiguousarray(value)
+        digest.update(str(array.dtype).encode("utf-8"))
+        digest.update(array.tobytes())
+    digest.update(repr(sorted(options.items())).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ChartCache:
+    def __init__(self, budget_mb=DEFAULT_CHART_CACHE_MB, directory=None, disk_budget_mb=DEFAULT_CHART_DISK_MB):
+        self.budget = budget_mb * 2**20
+        self.directory = directory
+        self.disk_budget = disk_budget_mb * 2**20
+        self.images = OrderedDict()   # key -> PNG bytes
+        self.used = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    # PNG of draw(*inputs, **options), drawn only when not cached
+    def get(self, name, draw, *inputs, **options):
+        key = chart_key(name, *inputs, **options)
+        with self.lock:
+            png = self.images.get(key)
+            if png is not None:
+                self.images.move_to_end(key)
+                self.stats["hits"] += 1
+                return png
+
+        png, outcome = self._from_disk(key), "disk_hits"
+        if png is None:
+            png, outcome = draw(*inputs, **options), "misses"
+            self._save(key, png)
+        with self.lock:
+            self.stats[outcome] += 1
+            if key not in self.images and len(png) <= self.budget:
+                self.images[key] = png
+                self.used += len(png)
+                while self.used > self.budget:
+                    _, evicted = self.images.popitem(last=False)
+                    self.used -= len(evicted)
+        return png
+
+    def summary(self):
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        reused = self.stats["hits"] + self.stats["disk_hits"]
+        return {**self.stats, "hit_rate": reused / lookups if lookups else 0.0,
+                "images": len(self.images), "memory_mb": self.used / 2**20}
+
+    # --- disk tier ---
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _from_disk(self, key):
+        if self.directory is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return png
+
+    def _save(self, key, png):
+        if self.directory is None:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"⚠️ Could not cache chart on disk: {e}")
+            return
+        self._evict_disk()
+
+    # Drop least recently used images until the directory fits the disk budget
+    def _evict_disk(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".png"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        used = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if used <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+                used -= size
+            except FileNotFoundError:
+                pass
+
+
+# One chart cache per process, shared by every Streamlit session and rerun
+_chart_cache = None
+_chart_cache_lock = threading.Lock()
+
+
+def get_chart_cache(budget_mb=DEFAULT_CHART_CACHE_MB, directory=None):
+    global _chart_cache
+    with _chart_cache_lock:
+        if _chart_cache is None:
+            _chart_cache = ChartCache(budget_mb, directory)
+        return _chart_cache
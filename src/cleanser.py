@@ -1,16 +1,17 @@
 # Import libraries
 import os                          # for directory manipulation
-import pandas as pd                # for DataFrame manipulation
-import numpy as np                 # for numerical operations
-import re                          # for using regular expressions
 import logging
 from datetime import datetime
 
-# Suppress warnings
-import warnings
-warnings.filterwarnings('ignore')
+from regions import (DEFAULT_REGION, cleaned_daily_path, cleaned_master_path, get_region, raw_daily_path,
+                     raw_master_path)
+import metrics
+
+# pandas, pyarrow and the modules built on them (storage, compact, database, rollups,
+# changes) are imported by the functions that use them, so that importing this module
+# (e.g. from runner.py or scheduler.py) stays cheap
 
-# Setup logging
+import warnings
 
 # --- Always resolve relative to the project root ---
 # (script_dir = folder containing cleanser.py)
@@ -19,86 +20,276 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 # Go up one level to project root
 project_root = os.path.abspath(os.path.join(script_dir, ".."))
 
-# --- Setup logging ---
+# --- Setup logging (called by the command-line entry point) ---
 log_file = os.path.join(project_root, "logs", "cleanser.log")
-os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-logging.basicConfig(
-    filename=log_file,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+
+def setup_logging():
+    # Suppress warnings
+    warnings.filterwarnings('ignore')
+
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    logging.basicConfig(
+        filename=log_file,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
 
 # Load dataset (specific date or full historical dataset)
-def load_data(date=None):
+def load_data(date=None, region=None, data_root=None):
+    import pandas as pd
+    from compact import compact_text
+    from storage import load_frame, load_master, load_master_typed, master_exists
     if date:
-        raw_filename = f"redfin_hollywood_hills_{date}.csv"
+        raw_data_path = raw_daily_path(region, date, data_root)
     else:
-        raw_filename = "redfin_hollywood_hills_master.csv"
+        raw_data_path = raw_master_path(region, data_root)
 
-    # Construct the path to the Excel file in the desired location
-    raw_data_path = os.path.join(project_root, "data", "raw", raw_filename)
+    # The master dataset may be stored as Date partitions (see storage.py)
+    exists = os.path.exists(raw_data_path) if date else master_exists(raw_data_path)
 
-    if os.path.exists(raw_data_path):
-        df = pd.read_csv(raw_data_path)
+    if exists:
+        # Typed Parquet twins are used when they are current
+        if date:
+            df = load_frame(raw_data_path)
+        else:
+            df = load_master_typed(raw_data_path)
+            if df is None:
+                df = load_master(raw_data_path)
         df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
         logging.info(f"📊 Loaded data from {raw_data_path}")
-        return df
+        # Text as Arrow strings instead of one Python object per value (see compact.py)
+        return compact_text(df)
     else:
         logging.warning(f"⚠️ No data found for {date or 'historical records'}!")
         return pd.DataFrame()
 
+# --- Cleaning kernel ---
+# Each numeric column is parsed exactly once by a precompiled Arrow regex kernel
+# (no DataFrame-wide replace, no per-column regex + astype chains). Placeholders
+# such as "—", "— beds" or "N/A" simply fail to match and become NaN.
+
+# Values treated as missing in the text columns
+PLACEHOLDERS = ["—", "N/A", ""]
+
+# Column -> pattern whose "v" group holds the number (thousands separators allowed)
+NUMBER_PATTERNS = {
+    "Price": r"^\s*\$?\s*(?P<v>\d[\d,]*(?:\.\d+)?)\s*$",   # "$1,547,000"
+    "SqFt": r"^\s*(?P<v>\d[\d,]*(?:\.\d+)?)\s*$",            # "1,552"
+    "Beds": r"(?P<v>\d+(?:\.\d+)?)",                          # "2 beds"
+    "Baths": r"(?P<v>\d+(?:\.\d+)?)",                         # "2.5 baths" -> 2.5
+}
+
+# The old regex kept only the integer part of baths ("2.5 baths" -> 2)
+LEGACY_BATHS_PATTERN = r"(?P<v>\d+)"
+
+
+# Parse one text column into float64 with a single regex pass
+def parse_number(values, pattern):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc       # vectorized string kernels
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    if not isinstance(values.dtype, pd.ArrowDtype):
+        values = values.astype(object)
+    strings = pa.array(values, type=pa.string(), from_pandas=True)
+    digits = pc.struct_field(pc.extract_regex(strings, pattern), [0])
+    digits = pc.replace_substring(digits, ",", "")
+    return pd.Series(pc.cast(digits, pa.float64()).to_numpy(zero_copy_only=False), index=values.index)
+
+
 # Handle missing values & clean data
-def clean_data(df):
+def clean_data(df, legacy_baths=False):
+    import pandas as pd
+    from compact import STRING
     logging.info("🛠 Cleaning Data...")
 
-    # Replace invalid or missing values
-    df.replace({"—": np.nan, "N/A": np.nan, "": np.nan}, inplace=True)
+    metrics.count("rows_in", len(df))
 
     # Convert numeric columns
-    df["Price"] = df["Price"].str.replace(r"[$,]", "", regex=True).astype(float)
-    df["SqFt"] = df["SqFt"].str.replace(r",", "", regex=True).astype(float)
-    df["Beds"] = df["Beds"].str.extract(r"(\d+)").astype(float)
-    df["Baths"] = df["Baths"].str.extract(r"(\d+)").astype(float)
+    for col, pattern in NUMBER_PATTERNS.items():
+        if col == "Baths" and legacy_baths:
+            pattern = LEGACY_BATHS_PATTERN
+        with metrics.timer(f"clean.parse_{col.lower()}"):
+            df[col] = parse_number(df[col], pattern)
 
     # Convert Latitude & Longitude to float
-    df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce")
-    df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce")
+    with metrics.timer("clean.coordinates"):
+        df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce").astype(float)
+        df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce").astype(float)
+
+    # Replace invalid or missing values in the remaining text columns
+    with metrics.timer("clean.placeholders"):
+        for col in df.columns.difference(list(NUMBER_PATTERNS) + ["Latitude", "Longitude"]):
+            if df[col].dtype == object or df[col].dtype == STRING:
+                df[col] = df[col].mask(df[col].isin(PLACEHOLDERS))
 
     # Drop rows missing essential values
-    df.dropna(
-        subset=["Price", "Beds", "Baths", "SqFt", "Latitude", "Longitude"],
-        inplace=True,
-    )
+    with metrics.timer("clean.dropna"):
+        df.dropna(
+            subset=["Price", "Beds", "Baths", "SqFt", "Latitude", "Longitude"],
+            inplace=True,
+        )
+    metrics.count("rows_out", len(df))
 
     logging.info(f"✅ Cleaned data: {len(df)} valid listings remaining.")
     return df
 
 # Save cleaned data & append to master dataset
-def save_cleaned_data(df, date):
-    cleaned_filename = f"redfin_hollywood_hills_cleaned_{date}.csv"
-
+# aggregate=False leaves the rollups and events to the caller (e.g. as separate
+# scheduler DAG stages, see refresh_rollups / refresh_events)
+def save_cleaned_data(df, date, region=None, data_root=None, aggregate=True):
+    from database import database_enabled, database_path, upsert_listings
+    from storage import CLEANED_SCHEMA, append_to_master, typed_path, write_typed
     # Construct the path to the cleaned CSV file in the desired relative location
-    path_to_clean_file = os.path.join(project_root, "data", "cleaned", cleaned_filename)
+    path_to_clean_file = cleaned_daily_path(region, date, data_root)
+    os.makedirs(os.path.dirname(path_to_clean_file), exist_ok=True)
 
-    df.to_csv(path_to_clean_file, index=False)
+    with metrics.timer("save.daily"):
+        df.to_csv(path_to_clean_file, index=False)
+        write_typed(df, typed_path(path_to_clean_file), CLEANED_SCHEMA)
     logging.info(f"✅ Saved cleaned daily data: {path_to_clean_file}")
 
     # Append to master dataset
-    master_filename = "redfin_hollywood_hills_master_cleaned.csv"
-    path_to_master_file = os.path.join(project_root, "data", "cleaned", master_filename)
-    if os.path.exists(path_to_master_file):
-        master_df = pd.read_csv(path_to_master_file)
-        df = pd.concat([master_df, df]).drop_duplicates(subset=["Address", "Date"])
+    path_to_master_file = cleaned_master_path(region, data_root)
+    with metrics.timer("save.master"):
+        added = append_to_master(df, path_to_master_file, schema=CLEANED_SCHEMA)
+    metrics.count("rows_added", added)
+    logging.info(f"✅ Updated master dataset: {path_to_master_file} (+{added} rows)")
+
+    # Optional SQL store (see database.py)
+    if database_enabled(data_root):
+        with metrics.timer("save.database"):
+            written = upsert_listings(df, get_region(region)["id"], "listings", data_root)
+        logging.info(f"✅ Upserted {written} rows into {database_path(data_root)}")
+
+    # Refresh the daily rollups (Historical Trends) and listing events for the dates just written
+    if added and aggregate:
+        refresh_rollups(df["Date"], region, data_root)
+        refresh_events(df["Date"], region, data_root)
+    return added
+
+
+# Daily rollups (Historical Trends) of the cleaned master for `dates`
+def refresh_rollups(dates, region=None, data_root=None):
+    from rollups import update_rollups
+    with metrics.timer("save.rollups"):
+        update_rollups(cleaned_master_path(region, data_root), dates)
+
+
+# Listing events (new, price changes, delistings) of the cleaned master for `dates`
+def refresh_events(dates, region=None, data_root=None):
+    from changes import update_events
+    with metrics.timer("save.events"):
+        update_events(cleaned_master_path(region, data_root), dates)
+
+# --- Streaming historical prep ---
+# The raw master is read in bounded chunks (in Date partition order), each chunk is
+# cleaned and appended to the cleaned master before the next one is read. The
+# cleaned master's Date partitions are the (Address, Date) index, so rows repeated
+# across chunk boundaries, or already stored by a daily run, are skipped on append.
+# Peak memory follows max_memory_mb, not the size of the history.
+
+DEFAULT_MEMORY_MB = 256
+
+# In-memory size of a chunk relative to its parsed frame (read buffers, clean_data
+# temporaries, the groupby in append_to_master)
+CHUNK_OVERHEAD = 4
+
+
+# Rows per chunk that fit the memory budget, measured on a sample of the input
+def chunk_rows_for_budget(raw_master, max_memory_mb=DEFAULT_MEMORY_MB, sample_rows=1000):
+    from storage import iter_master_chunks
+    sample = next(iter_master_chunks(raw_master, sample_rows), None)
+    if sample is None or sample.empty:
+        return sample_rows
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+    return max(sample_rows, int(max_memory_mb * 2**20 / (bytes_per_row * CHUNK_OVERHEAD)))
+
+
+# Clean the raw master into the cleaned master chunk by chunk; returns run stats
+def stream_data_prep(raw_master=None, cleaned_master=None, max_memory_mb=DEFAULT_MEMORY_MB, chunk_rows=None,
+                     region=None, data_root=None):
+    import pandas as pd
+    from changes import update_events
+    from database import database_enabled, upsert_listings
+    from rollups import update_rollups
+    from storage import CLEANED_SCHEMA, append_to_master, iter_master_chunks, sync_typed_master
+    raw_master = raw_master or raw_master_path(region, data_root)
+    cleaned_master = cleaned_master or cleaned_master_path(region, data_root)
+    chunk_rows = chunk_rows or chunk_rows_for_budget(raw_master, max_memory_mb)
+    use_database = database_enabled(data_root)
+
+    stats = {"chunks": 0, "rows_read": 0, "rows_cleaned": 0, "rows_added": 0, "chunk_rows": chunk_rows}
+    touched_dates = set()
+    chunks = iter_master_chunks(raw_master, chunk_rows)
+    while True:
+        with metrics.timer("stream.read"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        stats["chunks"] += 1
+        stats["rows_read"] += len(chunk)
+
+        chunk["Date"] = pd.to_datetime(chunk["Date"], errors="coerce")
+        chunk = clean_data(chunk)
+        stats["rows_cleaned"] += len(chunk)
+
+        # Typed twin, rollups and events are refreshed once at the end, not per chunk
+        with metrics.timer("save.master"):
+            added = append_to_master(chunk, cleaned_master)
+        if use_database:
+            with metrics.timer("save.database"):
+                upsert_listings(chunk, get_region(region)["id"], "listings", data_root)
+        if added:
+            touched_dates.update(chunk["Date"].dropna().dt.strftime("%Y-%m-%d"))
+        stats["rows_added"] += added
+        del chunk
+
+    with metrics.timer("save.typed_master"):
+        sync_typed_master(cleaned_master, CLEANED_SCHEMA)
+    if touched_dates:
+        with metrics.timer("save.rollups"):
+            update_rollups(cleaned_master, touched_dates)
+        with metrics.timer("save.events"):
+            update_events(cleaned_master, touched_dates)
+    metrics.count("rows_added", stats["rows_added"])
+    logging.info(f"✅ Streamed {stats['rows_read']} rows in {stats['chunks']} chunks of {chunk_rows}: "
+                 f"{stats['rows_cleaned']} valid, {stats['rows_added']} new in {cleaned_master}")
+    return stats
 
-    df.to_csv(path_to_master_file, index=False)
-    logging.info(f"✅ Updated master dataset: {path_to_master_file}")
 
 # Run data preparation
-def run_data_prep(date=None):
+# `df` (e.g. the scraper's DataFrame for `date`) is cleaned directly instead of
+# being re-read from the raw CSV. Timings go to the run metrics (metrics.py).
+# aggregate=False skips the rollups/events refresh of a daily run (see save_cleaned_data).
+@metrics.recorded_run("clean")
+def run_data_prep(date=None, stream=False, max_memory_mb=DEFAULT_MEMORY_MB, region=None, data_root=None,
+                  df=None, aggregate=True):
+    import pandas as pd
+    from storage import master_exists
     try:
         logging.info(f"\n🚀 Running Data Prep. for {date or 'historical data'}...\n")
-        df = load_data(date)
+        mode = "daily" if date else ("stream" if stream else "history")
+        metrics.label(region=get_region(region)["id"], date=date, mode=mode)
+
+        if stream and not date:
+            raw_master = raw_master_path(region, data_root)
+            if not master_exists(raw_master):
+                logging.warning("⚠️ No data available to preparation.")
+                return False
+            stream_data_prep(raw_master, cleaned_master_path(region, data_root), max_memory_mb=max_memory_mb,
+                             region=region, data_root=data_root)
+            logging.info("✅ Data Prep. complete.\n")
+            return True
+
+        if df is None:
+            with metrics.timer("load"):
+                df = load_data(date, region, data_root)
+        else:
+            df = df.copy()
+            df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
 
         if df.empty:
             logging.warning("⚠️ No data available to preparation.")
@@ -107,7 +298,7 @@ def run_data_prep(date=None):
         df = clean_data(df)
 
         if date:
-            save_cleaned_data(df, date)
+            save_cleaned_data(df, date, region, data_root, aggregate)
 
         logging.info("✅ Data Prep. complete.\n")
         return True
@@ -118,8 +309,26 @@ def run_data_prep(date=None):
 
 # Run the script automatically
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", action="store_true",
+                        help="Clean the full raw history in bounded chunks into the cleaned master")
+    parser.add_argument("--max-memory-mb", type=int, default=DEFAULT_MEMORY_MB,
+                        help="Memory budget for one chunk in --stream mode")
+    parser.add_argument("--region", default=DEFAULT_REGION, help="Region id from config/regions.json")
+    parser.add_argument("--registry", default=None, help="Alternative region registry file")
+    parser.add_argument("--data-root", default=None, help="Alternative data directory (default: data/)")
+    parser.add_argument("--profile", choices=metrics.PROFILERS, default=None,
+                        help="Profile each run (cProfile, or a sampling profiler) into logs/profiles/")
+    args = parser.parse_args()
+
+    setup_logging()
+    metrics.enable_profiling(args.profile)
+    region = get_region(args.region, args.registry)
     today = datetime.today().strftime("%Y-%m-%d")
-    run_data_prep(today)  # Run for today’s data
-    run_data_prep()       # Run historical analysis
+    run_data_prep(today, region=region, data_root=args.data_root)  # Run for today’s data
+    run_data_prep(stream=args.stream, max_memory_mb=args.max_memory_mb, region=region,
+                  data_root=args.data_root)  # Run historical analysis
 
 
@@ -0,0 +1,115 @@
+# Import libraries
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# --- Compact in-memory listings ---
+# Listing frames that stay in memory (the dashboard's frame cache and the
+# indexes built from it, the trends history) are converted by compact_listings().
+# With the default dtypes (float64 numbers, one Python object per string) a
+# listing costs several times more:
+#
+#   Listing ID          int32      (int64 when an id does not fit, unchanged when some are missing)
+#   Price, SqFt         int32      (unchanged when a value is fractional or missing)
+#   Beds, Baths         uint8      (Baths float32 when there are half baths)
+#   Latitude/Longitude  float32    (~1 m; the cleaned files keep full precision)
+#   Address             category when addresses repeat (the history), else an Arrow string
+#   other text          Arrow string (one buffer per column, no Python objects)
+#   Link, Image URL     dropped; see listing_urls() / with_urls()
+#
+# Numbers are only downcast when every value converts exactly. Beds and Baths
+# are unsigned: subtract them as floats (np.asarray(values, dtype=float)).
+#
+# The Redfin URLs cannot be rebuilt from the Listing ID alone (the link embeds the
+# address slug, the photo URL the MLS number), so they are kept once per listing
+# in a separate table, loaded only where links are displayed, and joined back by
+# Listing ID for the displayed rows.
+
+STRING = pd.ArrowDtype(pa.string())
+URL_COLUMNS = ["Link", "Image URL"]
+COORDINATE_COLUMNS = ["Latitude", "Longitude"]
+
+# Column -> candidate dtypes, smallest first; the first one holding every value exactly is used
+NUMBER_DTYPES = {
+    "Listing ID": ["int32", "int64"],
+    "Price": ["int32", "int64"],
+    "SqFt": ["int32"],
+    "Beds": ["uint8", "float32"],
+    "Baths": ["uint8", "float32"],
+}
+
+# Addresses are stored as a category when there are at most this many distinct values per row
+CATEGORY_RATIO = 0.5
+
+
+# First of `dtypes` that holds every value of a numeric column exactly, None when none does
+def _exact_dtype(values, dtypes):
+    numbers = values.to_numpy(dtype=float, na_value=np.nan)
+    missing = np.isnan(numbers)
+    for dtype in map(np.dtype, dtypes):
+        if dtype.kind in "iu":
+            info = np.iinfo(dtype)
+            if (not missing.any() and (numbers == np.round(numbers)).all()
+                    and (len(numbers) == 0 or (numbers.min() >= info.min and numbers.max() <= info.max))):
+                return dtype
+        elif ((numbers.astype(dtype) == numbers) | missing).all():
+            return dtype
+    return None
+
+
+# Python object / StringDtype text as Arrow strings; other columns (mixed objects) unchanged
+def _arrow_text(values):
+    if not (pd.api.types.is_object_dtype(values) or isinstance(values.dtype, pd.StringDtype)):
+        return values
+    try:
+        return values.astype(STRING)
+    except (pa.ArrowException, TypeError, ValueError):
+        return values
+
+
+# Text columns as Arrow strings, nothing else changed (lossless; for raw frames before cleaning)
+def compact_text(df):
+    return df.assign(**{column: _arrow_text(df[column]) for column in df.columns})
+
+
+# Listing frame in the compact dtypes above, without the URL columns
+def compact_listings(df):
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if column in URL_COLUMNS:
+            continue
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            if column in COORDINATE_COLUMNS:
+                values = values.astype("float32")
+            elif column in NUMBER_DTYPES:
+                dtype = _exact_dtype(values, NUMBER_DTYPES[column])
+                if dtype is not None:
+                    values = values.astype(dtype)
+        elif column == "Address" and values.nunique() <= CATEGORY_RATIO * len(values):
+            values = values.astype("category")
+        else:
+            values = _arrow_text(values)
+        columns[column] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+# --- Listing URLs ---
+
+# One row per listing (the last one seen): Link and Image URL as Arrow strings, indexed by Listing ID
+def listing_urls(df):
+    present = [column for column in URL_COLUMNS if column in df.columns]
+    ids = pd.to_numeric(df["Listing ID"], errors="coerce") if "Listing ID" in df.columns else pd.Series(dtype=float)
+    urls = df.loc[ids.notna(), present].astype(STRING)
+    urls.index = pd.Index(ids[ids.notna()].astype("int64"), name="Listing ID")
+    return urls[~urls.index.duplicated(keep="last")]
+
+
+# Rows with the URL columns joined back from a listing_urls() table (missing listings get NA)
+def with_urls(rows, urls):
+    if "Listing ID" not in rows.columns or all(column in rows.columns for column in urls.columns):
+        return rows
+    # Position of each row's listing in the int64 index (-1: missing id or listing)
+    ids = pd.to_numeric(rows["Listing ID"], errors="coerce").astype("Int64")
+    positions = urls.index.get_indexer(ids)
+    return rows.assign(**{column: urls[column].array.take(positions, allow_fill=True) for column in urls.columns})
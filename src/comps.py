@@ -0,0 +1,201 @@
+# Import libraries
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# --- Comparable listings ---
+# Built once per loaded dataset: listings are bucketed on a uniform grid over
+# (longitude * cos(mean latitude), latitude), so cells are about square on the
+# ground, and stored sorted by cell (a flat geohash-style index: cell keys plus
+# row positions). A query searches square rings of cells around the listing,
+# nearest ring first, keeps the candidates similar to it (beds, baths and
+# square footage within tolerance) and measures haversine distances. It stops
+# once k comparables are found that are closer than anything in the rings not
+# searched yet, so a query touches a few cells instead of every listing.
+
+CELL_POINTS = 16          # average listings per occupied cell the grid is sized for
+MIN_CELL_DEGREES = 1e-4   # about 11 m: a grid over a single block stays small
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE = EARTH_RADIUS_MILES * np.pi / 180
+
+DEFAULT_COMPS = 10
+BEDS_TOLERANCE = 1        # comparables have beds and baths within +/- these
+BATHS_TOLERANCE = 1
+SQFT_TOLERANCE = 0.25     # and square footage within +/- 25%
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class ComparablesIndex:
+    def __init__(self, df, cell_points=CELL_POINTS):
+        self.frame = df
+        lat = df["Latitude"].to_numpy(dtype=float)
+        lon = df["Longitude"].to_numpy(dtype=float)
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        self.rows = len(valid)
+        self._by_address = None
+
+        if self.rows:
+            self.cos_lat = np.cos(np.radians(np.mean(lat[valid])))
+            x, y = lon[valid] * self.cos_lat, lat[valid]
+            area = max(np.ptp(x) * np.ptp(y), 0.0)
+            self.cell = max(np.sqrt(area * cell_points / self.rows), MIN_CELL_DEGREES)
+            self.origin = (x.min(), y.min())
+            ix, iy = self._cells(x, y)
+            self.nx, self.ny = int(ix.max()) + 1, int(iy.max()) + 1
+            # cos(latitude) varies over the grid: ring distances are scaled by its smallest ratio
+            lat_range = np.radians([lat[valid].min(), lat[valid].max()])
+            self.distance_floor = min(np.cos(lat_range).min() / self.cos_lat, 1.0)
+        else:
+            self.cell, self.origin, self.nx, self.ny, self.distance_floor = 1.0, (0.0, 0.0), 1, 1, 1.0
+            ix = iy = np.zeros(0, dtype=np.int64)
+
+        keys = ix * self.ny + iy
+        order = np.argsort(keys, kind="stable")
+        position_dtype = np.int32 if len(df) < 2**31 else np.int64
+        self.keys = keys[order]
+        self.positions = valid[order].astype(position_dtype)   # row positions in `frame`, in cell order
+
+        # Columns in cell order, so a cell's candidates are contiguous in memory
+        self.lat, self.lon = lat[self.positions], lon[self.positions]
+        self.beds = df["Beds"].to_numpy(dtype=float)[self.positions]
+        self.baths = df["Baths"].to_numpy(dtype=float)[self.positions]
+        self.sqft = df["SqFt"].to_numpy(dtype=float)[self.positions]
+        self.price = df["Price"].to_numpy(dtype=float)[self.positions]
+        self.slot_of = np.full(len(df), -1, dtype=position_dtype)   # row position -> index slot
+        self.slot_of[self.positions] = np.arange(self.rows, dtype=position_dtype)
+
+    def __len__(self):
+        return self.rows
+
+    def _cells(self, x, y):
+        ix = np.floor((np.asarray(x) - self.origin[0]) / self.cell).astype(np.int64)
+        iy = np.floor((np.asarray(y) - self.origin[1]) / self.cell).astype(np.int64)
+        return ix, iy
+
+    # Keys of the cells at Chebyshev distance r from (cx, cy) that lie on the grid
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            ix, iy = np.array([cx]), np.array([cy])
+        else:
+            side = np.arange(-r, r + 1)
+            inner = side[1:-1]
+            ix = cx + np.concatenate([side, side, np.full(len(inner), -r), np.full(len(inner), r)])
+            iy = cy + np.concatenate([np.full(len(side), -r), np.full(len(side), r), inner, inner])
+        on_grid = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+        return ix[on_grid] * self.ny + iy[on_grid]
+
+    # Index slots of every listing in the given cells
+    def _slots(self, cell_keys):
+        starts = np.searchsorted(self.keys, cell_keys, side="left")
+        lengths = np.searchsorted(self.keys, cell_keys, side="right") - starts
+        lengths_total = int(lengths.sum())
+        if not lengths_total:
+            return np.zeros(0, dtype=np.int64)
+        offsets = np.cumsum(lengths) - lengths
+        return np.repeat(starts - offsets, lengths) + np.arange(lengths_total)
+
+    # Row positions and distances (miles) of the k nearest listings to (lat, lon) for
+    # which similar(slots) is true, nearest first
+    def nearest(self, lat, lon, k=DEFAULT_COMPS, similar=None, max_miles=None):
+        if not self.rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        ix, iy = self._cells(lon * self.cos_lat, lat)
+        cx, cy = int(ix), int(iy)
+        # Rings needed to cover the whole grid from the query cell
+        max_ring = max(cx + 1, self.nx - cx, cy + 1, self.ny - cy)
+        ring_miles = self.cell * MILES_PER_DEGREE * self.distance_floor
+
+        slots, distances = np.zeros(0, dtype=np.int64), np.zeros(0)
+        for r in range(max_ring + 1):
+            candidates = self._slots(self._ring(cx, cy, r))
+            if similar is not None and len(candidates):
+                candidates = candidates[similar(candidates)]
+            if len(candidates):
+                slots = np.concatenate([slots, candidates])
+                distances = np.concatenate([distances, haversine_miles(lat, lon, self.lat[candidates],
+                                                                       self.lon[candidates])])
+            # Everything outside rings 0..r is at least r cells away
+            searched_miles = r * ring_miles
+            if len(slots) >= k and np.partition(distances, k - 1)[k - 1] <= searched_miles:
+                break
+            if max_miles is not None and searched_miles >= max_miles:
+                break
+
+        if max_miles is not None:
+            keep = distances <= max_miles
+            slots, distances = slots[keep], distances[keep]
+        best = np.argsort(distances, kind="stable")[:k]
+        return self.positions[slots[best]], distances[best]
+
+    # Row position of a listing by address (first match), or None
+    def position_of(self, address):
+        if self._by_address is None:
+            addresses = self.frame["Address"].astype(str).to_numpy()
+            self._by_address = {}
+            for position, value in enumerate(addresses):
+                self._by_address.setdefault(value, position)
+        return self._by_address.get(str(address))
+
+    # The k nearest listings similar to the one at row `position`, nearest first,
+    # with their distance and price per sqft, and the median price per sqft of them
+    def comparables(self, position, k=DEFAULT_COMPS, max_miles=None):
+        slot = self.slot_of[position]
+        if slot < 0:   # no coordinates
+            return self.frame.iloc[:0].assign(**{"Distance (mi)": [], "Price per SqFt": []}), np.nan
+        beds, baths, sqft = self.beds[slot], self.baths[slot], self.sqft[slot]
+
+        def similar(slots):
+            return ((np.abs(self.beds[slots] - beds) <= BEDS_TOLERANCE)
+                    & (np.abs(self.baths[slots] - baths) <= BATHS_TOLERANCE)
+                    & (np.abs(self.sqft[slots] - sqft) <= SQFT_TOLERANCE * sqft)
+                    & (self.positions[slots] != position))
+
+        positions, distances = self.nearest(self.lat[slot], self.lon[slot], k, similar, max_miles)
+        slots = self.slot_of[positions]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            price_per_sqft = np.where(self.sqft[slots] > 0, self.price[slots] / self.sqft[slots], np.nan)
+        median = np.nanmedian(price_per_sqft) if np.isfinite(price_per_sqft).any() else np.nan
+        comps = self.frame.iloc[positions].assign(**{"Distance (mi)": distances, "Price per SqFt": price_per_sqft})
+        return comps, median
+
+
+# Comparables indexes of the most recently used datasets, keyed by the caller
+# (e.g. a frame cache key, which changes when the source files do)
+MAX_INDEXES = 8
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_comps_index(key, df):
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    index = ComparablesIndex(df)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+# Brute-force reference: the same comparables from a full scan (for checks)
+def scan_comparables(df, position, k=DEFAULT_COMPS):
+    subject = df.iloc[position]
+    sqft = float(subject["SqFt"])
+    beds, baths = df["Beds"].to_numpy(float), df["Baths"].to_numpy(float)   # compact frames: unsigned ints
+    candidates = df[(np.abs(beds - float(subject["Beds"])) <= BEDS_TOLERANCE)
+                    & (np.abs(baths - float(subject["Baths"])) <= BATHS_TOLERANCE)
+                    & (np.abs(df["SqFt"].to_numpy(float) - sqft) <= SQFT_TOLERANCE * sqft)
+                    & (np.arange(len(df)) != position)
+                    & df["Latitude"].notna() & df["Longitude"].notna()]
+    distances = haversine_miles(float(subject["Latitude"]), float(subject["Longitude"]),
+                                candidates["Latitude"].to_numpy(float), candidates["Longitude"].to_numpy(float))
+    best = np.argsort(distances, kind="stable")[:k]
+    return candidates.iloc[best].assign(**{"Distance (mi)": distances[best]})
@@ -0,0 +1,148 @@
+# Import libraries
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+# --- Stage DAG ---
+# A pipeline run as a graph of stages: each stage starts as soon as every stage
+# it runs `after` has succeeded, so independent stages (other regions, rollups
+# next to events) run concurrently, at most `max_parallel` at a time. Stages are
+# plain functions run in worker threads by an asyncio event loop:
+#
+#   fn(inputs) -> result     inputs = {dependency name: its result}
+#
+# A stage fails when it raises, returns False or exceeds its `timeout`. A stage
+# that raised or returned False is retried up to `retries` times with exponential
+# backoff (backoff, 2x, 4x, ... seconds). Stages after a failed one are skipped.
+# A thread cannot be stopped, so a timed-out attempt is abandoned: it keeps
+# running in the background and its result is discarded. Timeouts are therefore
+# never retried: a retry would run next to the abandoned attempt, and both would
+# write the same files (journal, daily CSV, master partitions).
+
+DEFAULT_PARALLEL = 4
+
+STATUSES = ("ok", "failed", "timeout", "skipped")
+
+
+class Stage:
+    def __init__(self, name, fn, after=(), timeout=None, retries=0, backoff=1.0):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+
+class StageFailed(Exception):
+    pass
+
+
+# Stage names in an order where every stage comes after its dependencies
+def topological_order(stages):
+    by_name = {stage.name: stage for stage in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Stage names must be unique")
+    order, state = [], {}
+
+    def visit(name, path):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Stage cycle: {' -> '.join(path + [name])}")
+        if name not in by_name:
+            raise ValueError(f"Unknown stage {name} (required by {path[-1]})")
+        state[name] = "visiting"
+        for dependency in by_name[name].after:
+            visit(dependency, path + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+    return order
+
+
+# Run the stages; returns {name: outcome} in topological order, with outcome =
+# {"status", "attempts", "started", "finished" (seconds since the DAG started),
+#  "seconds", "error", "result"}
+def run_dag(stages, max_parallel=DEFAULT_PARALLEL):
+    order = topological_order(stages)
+    outcomes = asyncio.run(_run_dag(stages, max_parallel))
+    return {name: outcomes[name] for name in order}
+
+
+async def _run_dag(stages, max_parallel):
+    start = time.perf_counter()
+    slots = asyncio.Semaphore(max_parallel)
+    # One thread per stage: an abandoned (timed-out) attempt never holds up the others
+    executor = ThreadPoolExecutor(max_workers=len(stages))
+    tasks = {}
+
+    async def run_stage(stage):
+        inputs = {}
+        for dependency in stage.after:
+            outcome = await tasks[dependency]
+            if outcome["status"] != "ok":
+                logging.warning(f"⏭ {stage.name}: skipped ({dependency} {outcome['status']})")
+                return _outcome("skipped", 0, None, None, f"{dependency} {outcome['status']}")
+            inputs[dependency] = outcome["result"]
+
+        loop = asyncio.get_running_loop()
+        first_start = None
+        for attempt in range(1, stage.retries + 2):
+            async with slots:
+                attempt_start = time.perf_counter() - start
+                first_start = attempt_start if first_start is None else first_start
+                logging.info(f"▶️ {stage.name}: attempt {attempt}/{stage.retries + 1}")
+                try:
+                    future = loop.run_in_executor(executor, metrics.in_context(stage.fn), inputs)
+                    result = await asyncio.wait_for(future, stage.timeout)
+                    if result is False:
+                        raise StageFailed("returned False")
+                    status, error = "ok", None
+                except asyncio.TimeoutError:
+                    status, error = "timeout", f"no result after {stage.timeout}s (still running, not retried)"
+                except Exception as e:
+                    status, error = "failed", f"{e.__class__.__name__}: {e}"
+                finished = time.perf_counter() - start
+            metrics.add_time(f"stage.{stage.name}", finished - attempt_start)
+
+            if status == "ok":
+                logging.info(f"✅ {stage.name}: done in {finished - attempt_start:.1f}s")
+                return _outcome("ok", attempt, first_start, finished, None, result)
+            logging.warning(f"⚠️ {stage.name}: attempt {attempt} {status} ({error})")
+            if status == "timeout":
+                break
+            if attempt <= stage.retries:
+                metrics.count("stage_retries")
+                await asyncio.sleep(stage.backoff * 2 ** (attempt - 1))   # outside the slot
+        logging.error(f"❌ {stage.name}: {status} after {attempt} attempts")
+        return _outcome(status, attempt, first_start, finished, error)
+
+    try:
+        for stage in stages:
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+        outcomes = await asyncio.gather(*tasks.values())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return dict(zip(tasks, outcomes))
+
+
+def _outcome(status, attempts, started, finished, error, result=None):
+    seconds = finished - started if started is not None else 0.0
+    return {"status": status, "attempts": attempts, "started": started, "finished": finished,
+            "seconds": seconds, "error": error, "result": result}
+
+
+# Text table of a DAG run: one row per stage with its timeline
+def describe(outcomes):
+    lines = [f"{'stage':28s} {'status':8s} {'tries':>5s} {'start':>7s} {'end':>7s}"]
+    for name, outcome in outcomes.items():
+        started = f"{outcome['started']:7.2f}" if outcome["started"] is not None else f"{'-':>7s}"
+        finished = f"{outcome['finished']:7.2f}" if outcome["finished"] is not None else f"{'-':>7s}"
+        lines.append(f"{name[:28]:28s} {outcome['status']:8s} {outcome['attempts']:5d} {started} {finished}")
+    return "\n".join(lines)
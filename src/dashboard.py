@@ -1,16 +1,26 @@
 # Import libraries
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mtick
-from matplotlib.ticker import FuncFormatter
-import seaborn as sns
-import folium
-from streamlit_folium import st_folium
 import numpy as np
-import glob
 import os
-import re
+
+# matplotlib, seaborn and folium are imported where a chart or the map is drawn,
+# so the page header and selectors render before they load
+
+from cache import get_frame_cache
+from changes import events_path, load_events, price_changes
+from charts import draw_beds_baths, draw_price_histogram, draw_trend, get_chart_cache
+from compact import URL_COLUMNS, compact_listings, listing_urls, with_urls
+from comps import get_comps_index
+from database import (daily_aggregates, database_enabled, database_sources, date_bounds, load_day, metric_summary,
+                      stored_dates)
+from geo import DEFAULT_CENTER, DEFAULT_ZOOM, get_map_index, layer_group, map_layer, view_from_state
+from listing_index import get_listing_index
+from metrics import flush_due, shared_run
+from photos import cached_thumbnail
+from regions import DEFAULT_REGION, available_dates, cleaned_daily_path, cleaned_master_path, data_dir, load_regions
+from rollups import daily_series, load_rollups, rollup_path, rollups_ready, summarize
+from storage import has_fresh_twin, load_master, load_master_typed, master_sources, read_typed, typed_path
 
 # Get the directory of the script's location, assumed here to be '../src' and to be on the same folder
 
@@ -21,276 +31,560 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 # Go up one level to project root
 project_root = os.path.abspath(os.path.join(script_dir, ".."))
 
-# Fetch available dates from stored CSV files
-def get_available_dates():
-    # Build the path to the data folder inside the project root directory
-    data_dir = os.path.join(project_root, "data", "raw")
-
-    # Use glob to find matching files
-    files = glob.glob(os.path.join(data_dir, "redfin_hollywood_hills_*.csv"))
-    
-    # Extract valid dates from filenames (YYYY-MM-DD format)
-    date_pattern = re.compile(r"redfin_hollywood_hills_(\d{4}-\d{2}-\d{2})\.csv")
-    dates = sorted(
-        {date_pattern.search(f).group(1) for f in files if date_pattern.search(f)},
-        reverse=True
-    )
-    return dates
+# --- Loader cache ---
+# Frames are cached in memory and on disk (see cache.py), keyed by the files they
+# are read from, so reruns, other sessions and restarts skip parsing until the
+# scraper or cleanser writes new data.
+CACHE_DIR = os.path.join(project_root, ".cache", "frames")
+CHART_DIR = os.path.join(project_root, ".cache", "charts")
+frame_cache = get_frame_cache(CACHE_DIR)
+chart_cache = get_chart_cache(directory=CHART_DIR)
+
+# Loader latency for this server process, appended to logs/metrics.jsonl about once a minute
+loader_metrics = shared_run("dashboard")
+
+# Fetch available dates from stored CSV files (re-listed only when the folder changes)
+_dates_seen = {}
+
+@loader_metrics.timed("dates")
+def get_available_dates(region_id=DEFAULT_REGION):
+    # SQL store: read from the (region, date) index
+    if database_enabled():
+        return stored_dates(region_id)
+    try:
+        stamp = os.stat(data_dir("raw")).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if _dates_seen.get(region_id, (None,))[0] != stamp:
+        _dates_seen[region_id] = (stamp, available_dates(region_id))
+    return _dates_seen[region_id][1]
+
+# Read and type one cleaned daily file (compact dtypes, without the URL columns: see compact.py)
+def read_daily(path_to_clean_file):
+    # Typed Parquet twin: columns already have their final dtypes
+    if has_fresh_twin(path_to_clean_file):
+        df = read_typed(typed_path(path_to_clean_file))
+        df.dropna(subset=["Price", "Beds", "Baths", "SqFt", "Latitude", "Longitude"], inplace=True)
+        return compact_listings(df)
+
+    df = pd.read_csv(path_to_clean_file)
+
+    # 🛠 Handle missing values & clean numeric columns
+    df.replace({'—': np.nan, 'N/A': np.nan, '': np.nan}, inplace=True)
+
+    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
+    df["Beds"] = pd.to_numeric(df["Beds"], errors="coerce")
+    df["Baths"] = pd.to_numeric(df["Baths"], errors="coerce")
+    df["SqFt"] = pd.to_numeric(df["SqFt"], errors="coerce")
+    df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce")
+    df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce")
+
+    df.dropna(subset=["Price", "Beds", "Baths", "SqFt", "Latitude", "Longitude"], inplace=True)
+
+    return compact_listings(df)
 
 # Load selected date's data
-@st.cache_data
-def load_data(selected_date=None):
+@loader_metrics.timed("load_data")
+def load_data(selected_date=None, region_id=DEFAULT_REGION):
     if not selected_date:
         st.error("❌ No date selected.")
         return pd.DataFrame()
-    
-    cleaned_filename = f"redfin_hollywood_hills_cleaned_{selected_date}.csv"
+
+    if database_enabled():
+        return frame_cache.get(
+            "load_data_sql", [region_id, selected_date], database_sources(),
+            lambda: compact_listings(load_day(region_id, selected_date).dropna(
+                subset=["Price", "Beds", "Baths", "SqFt", "Latitude", "Longitude"])),
+        )
 
     # Construct the path to the cleaned CSV file in the desired location
-    path_to_clean_file = os.path.join(project_root, "data", "cleaned", cleaned_filename)
+    path_to_clean_file = cleaned_daily_path(region_id, selected_date)
     if not os.path.exists(path_to_clean_file):
         st.error(f"❌ Cleaned data file not found: {path_to_clean_file}")
         return pd.DataFrame()
 
     try:
-        df = pd.read_csv(path_to_clean_file)
-
-        # 🛠 Handle missing values & clean numeric columns
-        df.replace({'—': np.nan, 'N/A': np.nan, '': np.nan}, inplace=True)
-        
-        df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
-        df["Beds"] = pd.to_numeric(df["Beds"], errors="coerce")
-        df["Baths"] = pd.to_numeric(df["Baths"], errors="coerce")
-        df["SqFt"] = pd.to_numeric(df["SqFt"], errors="coerce")
-        df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce")
-        df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce")
-
-        df.dropna(subset=["Price", "Beds", "Baths", "SqFt", "Latitude", "Longitude"], inplace=True)
-
-        return df
-
+        return frame_cache.get(
+            "load_data", [region_id, selected_date],
+            [path_to_clean_file, typed_path(path_to_clean_file)],
+            lambda: read_daily(path_to_clean_file),
+        )
     except FileNotFoundError:
         st.error(f"❌ Data file not found: {path_to_clean_file}")
         return pd.DataFrame()
 
-def load_historical_data():
-    master_filename = "redfin_hollywood_hills_master_cleaned.csv"
-    path_to_master_file = os.path.join(project_root, "data", "cleaned", master_filename)
-    try:
-        df = pd.read_csv(path_to_master_file)
-        df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
-        df["Beds"] = pd.to_numeric(df["Beds"], errors="coerce")
-        df["Baths"] = pd.to_numeric(df["Baths"], errors="coerce")
-        df["SqFt"] = pd.to_numeric(df["SqFt"], errors="coerce")
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df.dropna(subset=["Price", "Beds", "Baths", "SqFt", "Date"], inplace=True)
-        return df
-    except FileNotFoundError:
-        return pd.DataFrame()
-
-# Streamlit UI
-st.title("🏡Real Estate Dashboard")
-st.write("Analyze real estate trends in Hollywood Hills using interactive visualizations.")
+# Link and Image URL of a day's listings, by Listing ID (loaded only where they are displayed)
+def read_daily_urls(path_to_clean_file):
+    columns = ["Listing ID", *URL_COLUMNS]
+    if has_fresh_twin(path_to_clean_file):
+        return listing_urls(read_typed(typed_path(path_to_clean_file), columns=columns))
+    return listing_urls(pd.read_csv(path_to_clean_file, usecols=lambda column: column in columns))
+
+@loader_metrics.timed("listing_urls")
+def load_listing_urls(selected_date, region_id=DEFAULT_REGION):
+    if database_enabled():
+        return frame_cache.get(
+            "load_listing_urls_sql", [region_id, selected_date], database_sources(),
+            lambda: listing_urls(load_day(region_id, selected_date)),
+        )
 
-# Create Tabs
-tab1, tab2 = st.tabs(["📆 Listings by Date", "📈 Historical Trends"])
+    path_to_clean_file = cleaned_daily_path(region_id, selected_date)
+    return frame_cache.get(
+        "load_listing_urls", [region_id, selected_date],
+        [path_to_clean_file, typed_path(path_to_clean_file)],
+        lambda: read_daily_urls(path_to_clean_file),
+    )
 
-# TAB 1: Listings by Date
-with tab1:
-    st.subheader("📆 View Listings by Date")
+# Sidebar filter index of a loaded day (rebuilt only when its files change)
+@loader_metrics.timed("listing_index")
+def load_listing_index(df, selected_date, region_id=DEFAULT_REGION):
+    path_to_clean_file = cleaned_daily_path(region_id, selected_date)
+    if database_enabled():
+        sources = database_sources()
+    else:
+        sources = [path_to_clean_file, typed_path(path_to_clean_file)]
+    key = frame_cache.key("listing_index", [region_id, selected_date], sources)
+    return get_listing_index(key, df)
+
+# Comparables index of a loaded day (rebuilt only when its files change)
+@loader_metrics.timed("comps_index")
+def load_comps_index(df, selected_date, region_id=DEFAULT_REGION):
+    path_to_clean_file = cleaned_daily_path(region_id, selected_date)
+    if database_enabled():
+        sources = database_sources()
+    else:
+        sources = [path_to_clean_file, typed_path(path_to_clean_file)]
+    key = frame_cache.key("comps_index", [region_id, selected_date], sources)
+    return get_comps_index(key, df)
+
+# Map viewport index of a loaded day, on its sidebar index (rebuilt only when its files change)
+@loader_metrics.timed("map_index")
+def load_map_index(listing_index, selected_date, region_id=DEFAULT_REGION):
+    path_to_clean_file = cleaned_daily_path(region_id, selected_date)
+    if database_enabled():
+        sources = database_sources()
+    else:
+        sources = [path_to_clean_file, typed_path(path_to_clean_file)]
+    key = frame_cache.key("map_index", [region_id, selected_date], sources)
+    return get_map_index(key, listing_index)
 
-    # Dropdown to select a date
-    available_dates = get_available_dates()
-    selected_date = st.selectbox("Select Date", available_dates)
+HISTORY_COLUMNS = ["Listing ID", "Price", "Address", "Beds", "Baths", "SqFt", "Latitude", "Longitude", "Date"]
 
-    # Load selected day's data
-    df = load_data(selected_date)
+# Read and type the whole cleaned master (compact dtypes, see compact.py)
+def read_history(path_to_master_file):
+    # Typed Parquet twin: only the columns the trends tab uses, no re-parsing
+    df = load_master_typed(path_to_master_file, columns=HISTORY_COLUMNS)
+    if df is not None:
+        df.dropna(subset=["Price", "Beds", "Baths", "SqFt", "Date"], inplace=True)
+        return compact_listings(df)
+
+    df = load_master(path_to_master_file, usecols=lambda column: column in HISTORY_COLUMNS)
+    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
+    df["Beds"] = pd.to_numeric(df["Beds"], errors="coerce")
+    df["Baths"] = pd.to_numeric(df["Baths"], errors="coerce")
+    df["SqFt"] = pd.to_numeric(df["SqFt"], errors="coerce")
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df.dropna(subset=["Price", "Beds", "Baths", "SqFt", "Date"], inplace=True)
+    return compact_listings(df)
+
+@loader_metrics.timed("load_history")
+def load_historical_data(region_id=DEFAULT_REGION):
+    path_to_master_file = cleaned_master_path(region_id)
+    try:
+        return frame_cache.get(
+            "load_historical_data", [region_id],
+            master_sources(path_to_master_file),
+            lambda: read_history(path_to_master_file),
+        )
+    except FileNotFoundError:
+        return pd.DataFrame()
 
-    if df.empty:
-        st.warning("⚠️ No data available for the selected date.")
-        st.stop()
+# --- Historical Trends queries ---
+# Answered by indexed queries on the SQL store when there is one (see database.py),
+# else from the daily rollups (one pre-aggregated row per date, see rollups.py)
+# when they are current; otherwise the whole cleaned master is scanned.
 
-    # Sidebar Filters
-    st.sidebar.header("🔍 Filter Listings")
+SUMMARY_METRICS = ["Price", "Price per SqFt", "Beds", "Baths", "SqFt"]
 
-    show_all = st.sidebar.checkbox("Show All Properties", value=False)
+def history_rollups(region_id):
+    path_to_master_file = cleaned_master_path(region_id)
+    return rollup_path(path_to_master_file) if rollups_ready(path_to_master_file) else None
 
-    if show_all:
-        filtered_df = df
+def history_in_range(region_id, start_date=None, end_date=None):
+    df = load_historical_data(region_id)
+    if df.empty:
+        return df
+    if start_date is not None:
+        df = df[df["Date"] >= pd.to_datetime(start_date)]
+    if end_date is not None:
+        df = df[df["Date"] <= pd.to_datetime(end_date)]
+    return df
+
+# (first date, last date) of the history, or None when there is none
+@loader_metrics.timed("history_bounds")
+def history_bounds(region_id):
+    if database_enabled():
+        return date_bounds(region_id)
+    rollup_file = history_rollups(region_id)
+    if rollup_file:
+        dates = pd.to_datetime(load_rollups(rollup_file, columns=["Date"])["Date"].to_numpy(zero_copy_only=False))
     else:
-        min_price_value = max(1000, df["Price"].min()) if not np.isnan(df["Price"].min()) else 1000
-        max_price_value = np.ceil(df["Price"].max() / 1_000_000) * 1_000_000 if not np.isnan(df["Price"].max()) else 1_000_000
-
-        min_price, max_price = st.sidebar.slider(
-            "Select Price Range ($)", 
-            min_value=int(min_price_value), 
-            max_value=int(max_price_value), 
-            value=(int(min_price_value), int(max_price_value)),
-            format="$%d",
-            key="main_slider"
-        )
-
-        min_beds, max_beds = 1, int(np.ceil(df["Beds"].max() / 5) * 5)
-        min_baths, max_baths = 1, int(np.ceil(df["Baths"].max() / 5) * 5)
-        min_sqft, max_sqft = 100, int(np.ceil(df["SqFt"].max() / 10_000) * 10_000)
-
-        selected_beds = st.sidebar.slider("Bedrooms", min_beds, max_beds, (1, 5))
-        selected_baths = st.sidebar.slider("Bathrooms", min_baths, max_baths, (1, 5))
-        selected_sqft = st.sidebar.slider("Square Footage", min_sqft, max_sqft, (500, 5000))
-
-        filtered_df = df[
-            (df["Price"] >= min_price) & (df["Price"] <= max_price) &
-            (df["Beds"] >= selected_beds[0]) & (df["Beds"] <= selected_beds[1]) &
-            (df["Baths"] >= selected_baths[0]) & (df["Baths"] <= selected_baths[1]) &
-            (df["SqFt"] >= selected_sqft[0]) & (df["SqFt"] <= selected_sqft[1])
-        ]
-
-    st.subheader(f"📊 {len(filtered_df)} Listings Found")
-    # Create an interactive table where users can select a row
-    selected_rows = st.data_editor(
-        filtered_df[["Price", "Beds", "Baths", "SqFt", "Address", "Link"]]
-        .sort_values(by="Price", ascending=False)
-        .reset_index(drop=True),
-        use_container_width=True,  # Makes the table responsive
-        height=400,
-        num_rows="dynamic",
-        hide_index=True,  # Hides the index column
-        column_config={"Link": st.column_config.LinkColumn()},  # Make links clickable
-        key="table_selection"
+        dates = history_in_range(region_id).get("Date", pd.Series(dtype="datetime64[ns]"))
+    if len(dates) == 0:
+        return None
+    return dates.min().date(), dates.max().date()
+
+# Average price and number of listings per date
+@loader_metrics.timed("history_daily")
+def history_daily(region_id, start_date=None, end_date=None):
+    if database_enabled():
+        return daily_aggregates(region_id, start_date, end_date)
+    rollup_file = history_rollups(region_id)
+    if rollup_file:
+        return daily_series(load_rollups(rollup_file, start_date, end_date,
+                                         columns=["Date", "listings", "Price|sum", "Price|count"]))
+    df = history_in_range(region_id, start_date, end_date)
+    return pd.DataFrame({"Price": df.groupby("Date")["Price"].mean(),
+                         "Listings": df.groupby("Date")["Address"].count()})
+
+# describe()-style summary of the listing metrics
+@loader_metrics.timed("history_summary")
+def history_summary(region_id, start_date=None, end_date=None):
+    if database_enabled():
+        return metric_summary(region_id, start_date, end_date)
+    rollup_file = history_rollups(region_id)
+    if rollup_file:
+        return summarize(load_rollups(rollup_file, start_date, end_date))
+    df = history_in_range(region_id, start_date, end_date)
+    df = df.assign(**{"Price per SqFt": df["Price"] / df["SqFt"].where(df["SqFt"] > 0)})
+    return df[SUMMARY_METRICS].describe()
+
+# --- Listing changes ---
+
+EVENT_LABELS = {"new": "🆕 New", "removed": "🚫 Removed", "price_changed": "💸 Price changed",
+                "attribute_changed": "✏️ Details changed"}
+
+@loader_metrics.timed("load_events")
+def load_listing_events(region_id=DEFAULT_REGION):
+    path_to_events_file = events_path(cleaned_master_path(region_id))
+    return frame_cache.get(
+        "load_listing_events", [region_id],
+        master_sources(path_to_events_file),
+        lambda: load_events(path_to_events_file),
     )
 
-    # Get selected address (if any)
-    selected_address = selected_rows.iloc[0]["Address"] if not selected_rows.empty else None
-    
-    # Price Distribution
-    st.subheader("💰 Price Distribution")
-    with st.container():
-        fig, ax = plt.subplots(figsize=(8, 4))
-        
-        # Plot histogram
-        sns.histplot(filtered_df["Price"], bins=30, kde=True, ax=ax)
-
-        # Format x-axis: Convert to millions and append "M"
-        ax.xaxis.set_major_formatter(mtick.FuncFormatter(lambda x, _: f'${x/1_000_000:.0f}M'))
-
-        ax.set_xlabel("Price ($)")
-        ax.set_ylabel("Count")
-        st.pyplot(fig)
-
-    # Beds/Baths Analysis
-    st.subheader("🛏️ Bedrooms & 🛁 Bathrooms Distribution")
-    with st.container():
-        fig, ax = plt.subplots(1, 2, figsize=(12, 5))
-
-        sns.countplot(x="Beds", data=filtered_df, ax=ax[0], hue="Beds", palette="Blues", legend=False)
-        ax[0].set_title("Number of Bedrooms")
-        ax[0].set_xlabel("Beds")
-
-        sns.countplot(x="Baths", data=filtered_df, ax=ax[1], hue="Baths", palette="Reds", legend=False)
-        ax[1].set_title("Number of Bathrooms")
-        ax[1].set_xlabel("Baths")
-
-        st.pyplot(fig)
-
-    st.subheader("📍 Property Locations")
-    m = folium.Map(location=[34.1, -118.3], zoom_start=12)
-    # Add markers for all filtered properties
-    for _, row in filtered_df.iterrows():
-        popup_info = f"""
-        <b>{row['Address']}</b><br>
-        Price: ${row['Price']:,.0f}<br>
-        Beds: {row['Beds']}, Baths: {row['Baths']}<br>
-        SqFt: {row['SqFt']:,}<br>
-        <a href="{row['Link']}" target="_blank">View Listing</a>
-        """
-
-        # Check if the row matches the selected property
-        icon_color = "red" if selected_address and row["Address"] == selected_address else "blue"
-
-        folium.Marker(
-            location=[row["Latitude"], row["Longitude"]],
-            popup=popup_info,
-            icon=folium.Icon(color=icon_color, icon="home"),
-        ).add_to(m)
-
-    # Display map with full width
-    st_folium(m, width=800, height=500)
-
-# TAB 2: Historical Trends
-with tab2:
-    st.subheader("📈 Historical Trends")
-
-    historical_df = load_historical_data()
-    if historical_df.empty:
-        st.warning("⚠️ No historical data available.")
-        st.stop()
-
-    # Convert Pandas Timestamp to Python Date for Streamlit Slider
-    min_date, max_date = historical_df["Date"].min().date(), historical_df["Date"].max().date()
-
-    if min_date == max_date:
-        st.warning(f"⚠️ Only one date available: {min_date}. No range to select.")
-        selected_range = (min_date, max_date)
-    else:
-        selected_range = st.sidebar.slider(
-            "Select Date Range",
-            min_value=min_date,
-            max_value=max_date,
-            value=(min_date, max_date),
-            format="YYYY-MM-DD",
-            key="historical_slider"
-        )
+# --- Sidebar filters ---
+
+# Slider bounds and initial ranges for a day's listings: {column: (min, max, initial range)}
+def filter_ranges(df):
+    min_price_value = max(1000, df["Price"].min()) if not np.isnan(df["Price"].min()) else 1000
+    max_price_value = np.ceil(df["Price"].max() / 1_000_000) * 1_000_000 if not np.isnan(df["Price"].max()) else 1_000_000
+    max_beds = int(np.ceil(df["Beds"].max() / 5) * 5)
+    max_baths = int(np.ceil(df["Baths"].max() / 5) * 5)
+    max_sqft = int(np.ceil(df["SqFt"].max() / 10_000) * 10_000)
+    return {
+        "Price": (int(min_price_value), int(max_price_value), (int(min_price_value), int(max_price_value))),
+        "Beds": (1, max_beds, (1, 5)),
+        "Baths": (1, max_baths, (1, 5)),
+        "SqFt": (100, max_sqft, (500, 5000)),
+    }
+
+# --- Charts (PNG bytes from the chart cache, see charts.py) ---
+
+def price_chart(listings):
+    return chart_cache.get("price_histogram", draw_price_histogram, listings["Price"])
+
+def beds_baths_chart(listings):
+    return chart_cache.get("beds_baths", draw_beds_baths, listings["Beds"], listings["Baths"])
+
+def price_trend_chart(daily_trend):
+    return chart_cache.get("price_trend", draw_trend, daily_trend["Price"],
+                           title="Historical Trend: Average Price", ylabel="Average Price ($M)", money=True)
+
+def listings_trend_chart(daily_trend):
+    return chart_cache.get("listings_trend", draw_trend, daily_trend["Listings"],
+                           title="Historical Trend: Number of Listings", ylabel="Number of Listings", color="red")
+
+# --- Cache warm-up (warmup.py, run by the scheduler after each pipeline run) ---
+# Goes through what the first session of the day loads and draws, for the newest
+# date and the initial sidebar state, so the frames and charts land in the disk
+# tiers of the frame and chart caches and the server reads them back instead of
+# parsing and drawing. The sidebar and comparables indexes stay per process:
+# they are rebuilt from the cached frame by the server.
+def warm_cache(region_id=DEFAULT_REGION, selected_date=None):
+    stats = {"date": None, "listings": 0, "charts": 0}
+    load_listing_events(region_id)
+
+    available_dates = get_available_dates(region_id)
+    selected_date = selected_date or (available_dates[0] if available_dates else None)
+    df = load_data(selected_date, region_id) if selected_date else pd.DataFrame()
+    if not df.empty:
+        load_listing_urls(selected_date, region_id)
+        filters = {column: initial for column, (_, _, initial) in filter_ranges(df).items()}
+        filtered_df = load_listing_index(df, selected_date, region_id).query(filters)
+        price_chart(filtered_df)
+        beds_baths_chart(filtered_df)
+        stats.update(date=selected_date, listings=len(filtered_df), charts=2)
+
+    bounds = history_bounds(region_id)
+    if bounds is not None:
+        daily_trend = history_daily(region_id, *bounds)
+        price_trend_chart(daily_trend)
+        listings_trend_chart(daily_trend)
+        history_summary(region_id, *bounds)
+        stats["charts"] += 2
+    return stats
+
+# Sidebar panel: cache hit rate and load latency for this server process
+def show_cache_stats():
+    stats = frame_cache.summary()
+    with st.sidebar.expander("⚙️ Data cache"):
+        st.write(f"Hit rate: {stats['hit_rate']:.0%} "
+                 f"({stats['memory_hits']} memory, {stats['disk_hits']} disk, {stats['misses']} misses)")
+        st.write(f"Average load: {stats['avg_ms']:.1f} ms")
+        st.write(f"In memory: {stats['frames_in_memory']} frames, {stats['memory_mb']:.0f} MB")
+        charts = chart_cache.summary()
+        st.write(f"Charts: {charts['hit_rate']:.0%} reused, {charts['images']} cached ({charts['memory_mb']:.1f} MB)")
 
-    # Ensure date filtering is using correct format
-    filtered_historical_df = historical_df[
-        (historical_df["Date"] >= pd.to_datetime(selected_range[0])) &
-        (historical_df["Date"] <= pd.to_datetime(selected_range[1]))
-    ]
-
-    # Average Price Over Time
-    st.subheader("📊 Average Price Over Time")
-    avg_price_trend = filtered_historical_df.groupby("Date")["Price"].mean()
-    fig, ax = plt.subplots(figsize=(10, 5))
-    avg_price_trend.plot(ax=ax, marker="o", linestyle="-")
-    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"${x/1e6:.1f}M"))
-    ax.set_ylabel("Average Price ($M)")
-    ax.set_xlabel("Date")
-    ax.set_title("Historical Trend: Average Price")
-    st.pyplot(fig)
-
-    # Number of Listings Over Time
-    st.subheader("🏠 Number of Listings Over Time")
-    listings_trend = filtered_historical_df.groupby("Date")["Address"].count()
-    fig, ax = plt.subplots(figsize=(10, 5))
-    listings_trend.plot(ax=ax, marker="o", linestyle="-", color="red")
-    ax.set_ylabel("Number of Listings")
-    ax.set_xlabel("Date")
-    ax.set_title("Historical Trend: Number of Listings")
-    st.pyplot(fig)
-
-    # Filter Historical Trends
-    st.sidebar.subheader("📊 Filter Historical Trends")
-    min_date, max_date = historical_df["Date"].min().date(), historical_df["Date"].max().date()
-
-    if min_date == max_date:
-        st.warning(f"⚠️ Only one date available: {min_date}. No range to select.")
-    else:
-        selected_range = st.sidebar.slider(
-            "Select Date Range",
-            min_value=min_date,
-            max_value=max_date,
-            value=(min_date, max_date),
-            format="YYYY-MM-DD"
+# Streamlit UI
+def main():
+    regions = load_regions()
+    region_id = st.sidebar.selectbox(
+        "🗺 Region", list(regions), format_func=lambda region_id: regions[region_id]["name"],
+        index=list(regions).index(DEFAULT_REGION) if DEFAULT_REGION in regions else 0,
+    )
+    show_cache_stats()  # lookups so far in this server process
+
+    st.title("🏡Real Estate Dashboard")
+    st.write(f"Analyze real estate trends in {regions[region_id]['name']} using interactive visualizations.")
+
+    # Create Tabs
+    tab1, tab2, tab3 = st.tabs(["📆 Listings by Date", "📈 Historical Trends", "💸 Price Changes"])
+
+    # TAB 3: Price Changes (rendered first: the other tabs st.stop() when they have no data)
+    with tab3:
+        st.subheader("💸 Price Changes")
+
+        events = load_listing_events(region_id)
+        if events.empty:
+            st.info("ℹ️ No listing changes recorded yet; they start with the second cleaned snapshot.")
+        else:
+            event_dates = sorted(events["Date"].dropna().dt.date.unique(), reverse=True)
+            selected_event_date = st.selectbox("Changes since the previous snapshot on", event_dates,
+                                               key="events_date")
+            day_events = events[events["Date"].dt.date == selected_event_date]
+
+            counts = day_events["Event"].value_counts()
+            for column, (event, label) in zip(st.columns(len(EVENT_LABELS)), EVENT_LABELS.items()):
+                column.metric(label, int(counts.get(event, 0)))
+
+            changes = price_changes(day_events)
+            if st.checkbox("Price drops only", value=False, key="price_drops_only"):
+                changes = changes[changes["Change"] < 0]
+            st.dataframe(
+                changes[["Address", "Previous Price", "Price", "Change", "Change %"]],
+                hide_index=True,
+                column_config={
+                    "Previous Price": st.column_config.NumberColumn(format="$%d"),
+                    "Price": st.column_config.NumberColumn(format="$%d"),
+                    "Change": st.column_config.NumberColumn(format="$%d"),
+                    "Change %": st.column_config.NumberColumn(format="%.1f%%"),
+                },
+            )
+
+    # TAB 1: Listings by Date
+    with tab1:
+        st.subheader("📆 View Listings by Date")
+
+        # Dropdown to select a date
+        available_dates = get_available_dates(region_id)
+        selected_date = st.selectbox("Select Date", available_dates)
+
+        # Load selected day's data
+        df = load_data(selected_date, region_id)
+
+        if df.empty:
+            st.warning("⚠️ No data available for the selected date.")
+            st.stop()
+
+        # Sidebar Filters
+        st.sidebar.header("🔍 Filter Listings")
+
+        show_all = st.sidebar.checkbox("Show All Properties", value=False)
+
+        # Filtered rows come back already sorted by price (descending)
+        listing_index = load_listing_index(df, selected_date, region_id)
+
+        if show_all:
+            filters = None
+        else:
+            ranges = filter_ranges(df)
+            min_price_value, max_price_value, initial_price = ranges["Price"]
+
+            min_price, max_price = st.sidebar.slider(
+                "Select Price Range ($)", 
+                min_value=min_price_value, 
+                max_value=max_price_value, 
+                value=initial_price,
+                format="$%d",
+                key="main_slider"
+            )
+
+            selected_beds = st.sidebar.slider("Bedrooms", *ranges["Beds"])
+            selected_baths = st.sidebar.slider("Bathrooms", *ranges["Baths"])
+            selected_sqft = st.sidebar.slider("Square Footage", *ranges["SqFt"])
+
+            filters = {
+                "Price": (min_price, max_price),
+                "Beds": selected_beds,
+                "Baths": selected_baths,
+                "SqFt": selected_sqft,
+            }
+        filtered_df = listing_index.query(filters)
+
+        # Link and Image URL are joined back by Listing ID for the rows on screen
+        urls = load_listing_urls(selected_date, region_id)
+
+        st.subheader(f"📊 {len(filtered_df)} Listings Found")
+        # Create an interactive table where users can select a row
+        table = with_urls(filtered_df, urls)[["Price", "Beds", "Baths", "SqFt", "Address", "Link"]].reset_index(drop=True)
+        event = st.dataframe(
+            table,
+            width="stretch",  # Makes the table responsive
+            height=400,
+            hide_index=True,  # Hides the index column
+            column_config={"Link": st.column_config.LinkColumn()},  # Make links clickable
+            key="table_selection",
+            on_select="rerun",
+            selection_mode="single-row",
         )
 
-        # Convert selected_range back to Pandas Timestamp before filtering
-        filtered_historical_df = historical_df[
-            (historical_df["Date"] >= pd.to_datetime(selected_range[0])) &
-            (historical_df["Date"] <= pd.to_datetime(selected_range[1]))
-        ]
-
-    # Summary Statistics
-    st.subheader(f"📊 Summary for {selected_range[0]} to {selected_range[1]}")
-    st.write(filtered_historical_df.describe())
-
-st.write("Data Source: Redfin Scraper")
+        # Get selected address (if any); nothing selected means no comparables section
+        selected_rows = event.selection.rows
+        selected_address = table.iloc[selected_rows[0]]["Address"] if selected_rows else None
+
+        # Comparables of the selected listing among all of the day's listings (not only the filtered ones)
+        if selected_address:
+            comps_index = load_comps_index(df, selected_date, region_id)
+            position = comps_index.position_of(selected_address)
+            if position is not None:
+                st.subheader(f"🏘 Comparable Listings for {selected_address}")
+                # Thumbnail from the local photo cache (scheduler.py --photos / photos.py), when downloaded
+                image_urls = with_urls(comps_index.frame.iloc[[position]], urls).get("Image URL")
+                thumbnail = cached_thumbnail(image_urls.iloc[0]) if image_urls is not None else None
+                if thumbnail:
+                    st.image(thumbnail, width=320)
+                comps, median_price_per_sqft = comps_index.comparables(position)
+                if comps.empty:
+                    st.info("ℹ️ No similar listings found (beds and baths within 1, square footage within 25%).")
+                else:
+                    subject = comps_index.frame.iloc[position]
+                    column1, column2 = st.columns(2)
+                    column1.metric("Median comps price per sqft", f"${median_price_per_sqft:,.0f}")
+                    column2.metric("This listing", f"${subject['Price'] / subject['SqFt']:,.0f}",
+                                   f"{subject['Price'] / subject['SqFt'] / median_price_per_sqft - 1:+.1%}",
+                                   delta_color="inverse")
+                    st.dataframe(
+                        with_urls(comps, urls)[["Address", "Price", "Beds", "Baths", "SqFt", "Price per SqFt",
+                                                "Distance (mi)", "Link"]],
+                        hide_index=True,
+                        column_config={
+                            "Price": st.column_config.NumberColumn(format="$%d"),
+                            "Price per SqFt": st.column_config.NumberColumn(format="$%d"),
+                            "Distance (mi)": st.column_config.NumberColumn(format="%.2f"),
+                            "Link": st.column_config.LinkColumn(),
+                        },
+                    )
+
+        # Charts are drawn once per set of filtered rows, then served from the chart cache
+        # Price Distribution
+        st.subheader("💰 Price Distribution")
+        with st.container():
+            st.image(price_chart(filtered_df), width="stretch")
+
+        # Beds/Baths Analysis
+        st.subheader("🛏️ Bedrooms & 🛁 Bathrooms Distribution")
+        with st.container():
+            st.image(beds_baths_chart(filtered_df), width="stretch")
+
+        import folium
+        from streamlit_folium import st_folium
+
+        st.subheader("📍 Property Locations")
+        # Only the listings in the last reported viewport are sent, clustered when zoomed out
+        center, zoom, bounds = view_from_state(st.session_state.get("listings_map"))
+        layer = map_layer(filtered_df, zoom, bounds, selected_address, urls=urls,
+                          index=load_map_index(listing_index, selected_date, region_id), ranges=filters)
+        if layer["mode"] == "clusters":
+            st.caption(f"{layer['points']:,} listings in view, grouped into {len(layer['features']):,} clusters; "
+                       "zoom in to see individual listings.")
+
+        m = folium.Map(location=DEFAULT_CENTER, zoom_start=DEFAULT_ZOOM)
+
+        # Display map with full width; the listings layer is updated in place on pan/zoom
+        st_folium(m, width=800, height=500, key="listings_map", center=center, zoom=zoom,
+                  feature_group_to_add=layer_group(layer), returned_objects=["bounds", "zoom", "center"])
+
+    # TAB 2: Historical Trends
+    with tab2:
+        st.subheader("📈 Historical Trends")
+
+        bounds = history_bounds(region_id)
+        if bounds is None:
+            st.warning("⚠️ No historical data available.")
+            st.stop()
+
+        # Python dates for the Streamlit slider
+        min_date, max_date = bounds
+
+        if min_date == max_date:
+            st.warning(f"⚠️ Only one date available: {min_date}. No range to select.")
+            selected_range = (min_date, max_date)
+        else:
+            selected_range = st.sidebar.slider(
+                "Select Date Range",
+                min_value=min_date,
+                max_value=max_date,
+                value=(min_date, max_date),
+                format="YYYY-MM-DD",
+                key="historical_slider"
+            )
+
+        daily_trend = history_daily(region_id, *selected_range)
+
+        # Average Price Over Time
+        st.subheader("📊 Average Price Over Time")
+        st.image(price_trend_chart(daily_trend), width="stretch")
+
+        # Number of Listings Over Time
+        st.subheader("🏠 Number of Listings Over Time")
+        st.image(listings_trend_chart(daily_trend), width="stretch")
+
+        # Filter Historical Trends
+        st.sidebar.subheader("📊 Filter Historical Trends")
+
+        if min_date == max_date:
+            st.warning(f"⚠️ Only one date available: {min_date}. No range to select.")
+        else:
+            selected_range = st.sidebar.slider(
+                "Select Date Range",
+                min_value=min_date,
+                max_value=max_date,
+                value=(min_date, max_date),
+                format="YYYY-MM-DD"
+            )
+
+        # Summary Statistics
+        st.subheader(f"📊 Summary for {selected_range[0]} to {selected_range[1]}")
+        st.write(history_summary(region_id, *selected_range))
+
+    st.write("Data Source: Redfin Scraper")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        # Also on st.stop(), which ends a rerun early
+        loader_metrics.count("reruns")
+        flush_due(loader_metrics)
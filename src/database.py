@@ -0,0 +1,270 @@
+# Import libraries
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from regions import cleaned_master_path, data_dir, load_regions, raw_master_path
+
+# --- Embedded SQL store (optional) ---
+# One SQLite file per data directory ("data/property_pulse.sqlite"). It is used
+# once it exists (create it with `python src/database.py --migrate`): the scraper
+# and the cleanser upsert every run into it, and the dashboard answers the date
+# list, the per-date load and the historical aggregates with indexed queries
+# instead of globbing folders and reading whole files. The CSV files are still
+# written alongside, as before.
+#
+#   raw_listings  scraper output, values as scraped (text)
+#   listings      cleaned listings, typed
+#
+# Both are keyed on (region, Listing ID, Date) and indexed on (region, Date); rows
+# without a Listing ID are keyed on (region, Address, Date) instead (a partial
+# unique index). A row written again for the same listing and day replaces the
+# stored one (upsert), which is what the drop_duplicates on (Address, Date) did for
+# the CSV masters, so re-running or re-migrating a day never adds rows. Each write
+# is a single transaction. The two conflict targets need SQLite 3.35 or later.
+
+DATABASE_NAME = "property_pulse.sqlite"
+
+# DataFrame column -> (SQL column, type in `listings`)
+COLUMNS = {
+    "Listing ID": ("listing_id", "TEXT"),
+    "Price": ("price", "REAL"),
+    "Address": ("address", "TEXT"),
+    "Beds": ("beds", "REAL"),
+    "Baths": ("baths", "REAL"),
+    "SqFt": ("sqft", "REAL"),
+    "Link": ("link", "TEXT"),
+    "Image URL": ("image_url", "TEXT"),
+    "Latitude": ("latitude", "REAL"),
+    "Longitude": ("longitude", "REAL"),
+    "Date": ("date", "TEXT"),   # YYYY-MM-DD, so text order is date order
+}
+TABLES = ("raw_listings", "listings")
+SUMMARY_METRICS = ["Price", "Price per SqFt", "Beds", "Baths", "SqFt"]
+
+
+def database_path(data_root=None):
+    return os.path.join(os.path.dirname(data_dir("raw", data_root)), DATABASE_NAME)
+
+
+def database_enabled(data_root=None):
+    return os.path.exists(database_path(data_root))
+
+
+# Files a query result depends on (the write-ahead log holds the latest commits),
+# e.g. for cache invalidation
+def database_sources(data_root=None):
+    path = database_path(data_root)
+    return [path, path + "-wal"]
+
+
+def _schema(table):
+    types = "TEXT" if table == "raw_listings" else None
+    columns = ",\n    ".join(f"{name} {types or sql_type}" for name, sql_type in COLUMNS.values())
+    return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    region TEXT NOT NULL,
+    {columns},
+    UNIQUE (region, listing_id, date)
+);
+CREATE INDEX IF NOT EXISTS {table}_by_date ON {table} (region, date);
+"""
+
+
+# Key of the rows without a Listing ID (NULLs never conflict in the UNIQUE above)
+ADDRESS_KEY = "(region, IFNULL(address, ''), date) WHERE listing_id IS NULL"
+
+
+# Unique address key of a table; id-less duplicates written before it existed are
+# dropped first, keeping the last one written
+def _add_address_key(connection, table):
+    exists = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                                (f"{table}_by_address",)).fetchone()
+    if exists:
+        return
+    with connection:
+        connection.execute(f"""
+            DELETE FROM {table} WHERE listing_id IS NULL AND rowid NOT IN (
+                SELECT MAX(rowid) FROM {table} WHERE listing_id IS NULL
+                GROUP BY region, IFNULL(address, ''), date)""")
+        connection.execute(f"CREATE UNIQUE INDEX {table}_by_address ON {table} {ADDRESS_KEY}")
+
+
+# One connection per thread and database file (sqlite3 connections are not shared
+# across threads); the schema is created on first use
+_connections = threading.local()
+
+
+def connect(data_root=None, path=None):
+    path = path or database_path(data_root)
+    cache = _connections.__dict__.setdefault("by_path", {})
+    connection = cache.get(path)
+    if connection is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30)   # region processes may write concurrently
+        connection.execute("PRAGMA journal_mode=WAL")     # readers never block the writer
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript("".join(_schema(table) for table in TABLES))
+        for table in TABLES:
+            _add_address_key(connection, table)
+        cache[path] = connection
+    return connection
+
+
+def close_all():
+    for connection in _connections.__dict__.pop("by_path", {}).values():
+        connection.close()
+
+
+# --- Writes ---
+
+# Calendar day of each row as "YYYY-MM-DD" ("2025-08-21 00:00:00" occurs in older files)
+def _day_keys(dates):
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce", format="mixed")
+    return dates.dt.strftime("%Y-%m-%d")
+
+
+def _rows(df, region_id, table):
+    frame = pd.DataFrame({"region": region_id}, index=df.index)
+    for column, (name, sql_type) in COLUMNS.items():
+        values = df[column] if column in df else pd.Series(np.nan, index=df.index)
+        if column == "Date":
+            values = _day_keys(values)
+        elif column == "Listing ID":
+            if pd.api.types.is_float_dtype(values):
+                values = values.astype("Int64")   # 7131831.0 -> "7131831"
+            values = values.where(values.isna(), values.astype(str))
+            values = values.mask(values.isin(["N/A", ""]))   # no id: keyed on the address (ADDRESS_KEY)
+        elif table == "raw_listings" or sql_type == "TEXT":
+            values = values.where(values.isna(), values.astype(str))
+        frame[name] = values
+    frame = frame.astype(object).where(frame.notna(), None)
+    return list(frame.itertuples(index=False, name=None))
+
+
+# Insert or replace rows of one region in a single transaction; returns rows written
+def upsert_listings(df, region_id, table="listings", data_root=None, path=None):
+    if df.empty:
+        return 0
+    names = ["region", *(name for name, _ in COLUMNS.values())]
+    updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+    statement = (f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+                 f"ON CONFLICT (region, listing_id, date) DO UPDATE SET {updates} "
+                 f"ON CONFLICT {ADDRESS_KEY} DO UPDATE SET {updates}")
+
+    rows = _rows(df, region_id, table)
+    connection = connect(data_root, path)
+    with connection:
+        connection.executemany(statement, rows)
+    return len(rows)
+
+
+# --- Queries ---
+
+def _range(start_date=None, end_date=None):
+    clauses, params = [], []
+    if start_date is not None:
+        clauses.append("date >= ?")
+        params.append(pd.Timestamp(start_date).strftime("%Y-%m-%d"))
+    if end_date is not None:
+        clauses.append("date <= ?")
+        params.append(pd.Timestamp(end_date).strftime("%Y-%m-%d"))
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+# Dates with listings for the region, newest first. Skip-scan of the date index:
+# one seek per distinct date (the next smaller one), not one step per row.
+def stored_dates(region_id, table="listings", data_root=None, path=None):
+    cursor = connect(data_root, path).execute(f"""
+        WITH RECURSIVE dates(date) AS (
+            SELECT MAX(date) FROM {table} WHERE region = :region
+            UNION ALL
+            SELECT (SELECT MAX(date) FROM {table} WHERE region = :region AND date < dates.date)
+            FROM dates WHERE dates.date IS NOT NULL
+        )
+        SELECT date FROM dates WHERE date IS NOT NULL""", {"region": region_id})
+    return [row[0] for row in cursor]
+
+
+# One day of listings, with the DataFrame column names
+def load_day(region_id, date, table="listings", data_root=None, path=None):
+    names = ", ".join(f'{name} AS "{column}"' for column, (name, _) in COLUMNS.items())
+    df = pd.read_sql_query(f"SELECT {names} FROM {table} WHERE region = ? AND date = ?",
+                           connect(data_root, path), params=(region_id, pd.Timestamp(date).strftime("%Y-%m-%d")))
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+# (first date, last date) stored for the region, or None
+def date_bounds(region_id, table="listings", data_root=None, path=None):
+    first, last = connect(data_root, path).execute(
+        f"SELECT MIN(date), MAX(date) FROM {table} WHERE region = ?", (region_id,)).fetchone()
+    if first is None:
+        return None
+    return pd.Timestamp(first).date(), pd.Timestamp(last).date()
+
+
+# Average price and number of listings per date (as rollups.daily_series)
+def daily_aggregates(region_id, start_date=None, end_date=None, data_root=None, path=None):
+    where, params = _range(start_date, end_date)
+    df = pd.read_sql_query(
+        f"SELECT date AS Date, AVG(price) AS Price, COUNT(address) AS Listings FROM listings "
+        f"WHERE region = ?{where} GROUP BY date ORDER BY date",
+        connect(data_root, path), params=(region_id, *params))
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df.set_index("Date")
+
+
+# describe()-style summary of the listing metrics in a date range; only the metric
+# columns of the rows in range are read
+def metric_summary(region_id, start_date=None, end_date=None, data_root=None, path=None):
+    where, params = _range(start_date, end_date)
+    df = pd.read_sql_query(
+        f'SELECT price AS "Price", beds AS "Beds", baths AS "Baths", sqft AS "SqFt" FROM listings '
+        f"WHERE region = ?{where}",
+        connect(data_root, path), params=(region_id, *params))
+    df["Price per SqFt"] = df["Price"] / df["SqFt"].where(df["SqFt"] > 0)
+    return df[SUMMARY_METRICS].describe()
+
+
+# --- Migration ---
+
+# Load the existing raw and cleaned masters of every region into the database
+def migrate(data_root=None, registry=None):
+    from storage import load_master, master_exists
+
+    connect(data_root)   # creates the file: from now on the pipeline writes to it
+    for region_id, region in load_regions(registry).items():
+        for table, master_file, dtype in (("raw_listings", raw_master_path(region, data_root), str),
+                                          ("listings", cleaned_master_path(region, data_root), None)):
+            if not master_exists(master_file):
+                continue
+            df = load_master(master_file, dtype=dtype)
+            written = upsert_listings(df, region_id, table, data_root)
+            logging.info(f"🗄 {region_id}: {written} rows from {master_file} into {table}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--migrate", action="store_true",
+                        help="Create the database and load the existing CSV masters into it")
+    parser.add_argument("--registry", default=None, help="Alternative region registry file")
+    parser.add_argument("--data-root", default=None, help="Alternative data directory (default: data/)")
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrate(args.data_root, args.registry)
+    path = database_path(args.data_root)
+    if os.path.exists(path):
+        for table in TABLES:
+            count = connect(args.data_root).execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"{table}: {count} rows ({path})")
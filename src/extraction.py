@@ -0,0 +1,261 @@
+# Import libraries
+import json
+import re
+from html.parser import HTMLParser
+
+import metrics
+
+# --- Single-pass HomeCard extraction ---
+# Parses every listing card out of one page's HTML (driver.page_source) in a
+# single pass, instead of one WebDriver round-trip per field per card.
+
+# (tag, CSS class) of each card field -> (field name, attribute to read or None for text)
+CARD_FIELDS = {
+    ("span", "bp-Homecard__Price--value"): ("price", None),
+    ("div", "bp-Homecard__Address"): ("address", None),
+    ("span", "bp-Homecard__Stats--beds"): ("beds", None),
+    ("span", "bp-Homecard__Stats--baths"): ("baths", None),
+    ("span", "bp-Homecard__LockedStat--value"): ("sqft", None),
+    ("a", "bp-Homecard"): ("link", "href"),
+    ("img", "bp-Homecard__Photo--image"): ("image_url", "src"),
+}
+
+# Tags that never get a closing tag in HTML
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+LISTING_ID_PATTERN = re.compile(r"/home/(\d+)")
+PAGE_LABEL_PATTERN = re.compile(r"page (\d+)")
+
+# Same extraction done in the browser: one execute_script call returns every card as JSON
+CARDS_SCRIPT = """
+const pick = (card, sel, prop) => {
+  const el = card.querySelector(sel);
+  if (!el) return null;
+  return prop ? el[prop] : el.innerText;
+};
+return Array.from(document.querySelectorAll("div.HomeCardsContainer div.HomeCardContainer")).map(card => ({
+  price: pick(card, "span.bp-Homecard__Price--value"),
+  address: pick(card, "div.bp-Homecard__Address"),
+  beds: pick(card, "span.bp-Homecard__Stats--beds"),
+  baths: pick(card, "span.bp-Homecard__Stats--baths"),
+  sqft: pick(card, "span.bp-Homecard__LockedStat--value"),
+  link: pick(card, "a.bp-Homecard", "href"),
+  image_url: pick(card, "img.bp-Homecard__Photo--image", "src"),
+  ld_json: pick(card, "script[type='application/ld+json']", "innerHTML"),
+}));
+"""
+
+# Page numbers linked from the pager, in one execute_script call
+PAGES_SCRIPT = """
+return Array.from(document.querySelectorAll("a[aria-label^='page ']")).map(a => a.getAttribute("aria-label"));
+"""
+
+
+class HomeCardParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found_container = False
+        self.cards = []
+        self.pages = set()
+        self._card = None
+        self._card_depth = 0
+        self._stack = []         # open elements inside the current card: (tag, field)
+        self._in_ld_json = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+
+        # Pagination anchors: <a aria-label="page N">
+        if tag == "a" and attrs.get("aria-label"):
+            match = PAGE_LABEL_PATTERN.fullmatch(attrs["aria-label"])
+            if match:
+                self.pages.add(int(match.group(1)))
+
+        if tag == "div" and "HomeCardsContainer" in classes:
+            self.found_container = True
+
+        if self._card is None:
+            if tag == "div" and "HomeCardContainer" in classes and self.found_container:
+                self._card = {"text": {}}
+                self._card_depth = 1
+                self._stack = []
+            return
+
+        if tag == "div":
+            self._card_depth += 1
+
+        if tag == "script" and attrs.get("type") == "application/ld+json" and "ld_json" not in self._card:
+            self._card["ld_json"] = ""
+            self._in_ld_json = True
+
+        field = None
+        for css_class in classes:
+            if (tag, css_class) in CARD_FIELDS:
+                name, attr = CARD_FIELDS[(tag, css_class)]
+                # Selenium's find_element returns the first match only
+                if name in self._card or name in self._card["text"]:
+                    continue
+                if attr:
+                    self._card[name] = attrs.get(attr)
+                else:
+                    self._card["text"][name] = []
+                    field = name
+
+        if tag not in VOID_TAGS:
+            self._stack.append((tag, field))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._card is None:
+            return
+
+        if tag == "script":
+            self._in_ld_json = False
+
+        # Pop back to the matching open element (tolerates unclosed children)
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                del self._stack[i:]
+                break
+
+        if tag == "div":
+            self._card_depth -= 1
+            if self._card_depth == 0:
+                self.cards.append(self._card)
+                self._card = None
+
+    def handle_data(self, data):
+        if self._card is None:
+            return
+        if self._in_ld_json:
+            self._card["ld_json"] += data
+            return
+        for _, field in self._stack:
+            if field:
+                self._card["text"][field].append(data)
+
+
+# Parse geo-coordinates out of a card's ld+json payload
+def parse_geo(json_script):
+    json_data = json.loads(json_script)
+
+    # Sometimes it's a dict, sometimes a list of dicts
+    if isinstance(json_data, list):
+        geo_data = next((item.get("geo") for item in json_data if item.get("geo")), None)
+    else:
+        geo_data = json_data.get("geo")
+
+    if geo_data:
+        return geo_data.get("latitude", "N/A"), geo_data.get("longitude", "N/A")
+    return "N/A", "N/A"
+
+
+# Card fields a record is built from (missing ones are counted in the run metrics)
+RECORD_FIELDS = ("price", "address", "beds", "baths", "sqft", "link", "image_url", "ld_json")
+
+
+# Missing elements become "N/A", like the except-branches in the scraper
+def _or_na(value):
+    return "N/A" if value is None else value
+
+
+# Turn the raw strings pulled from one card into the scraper's record dict
+# (returns None when the card has to be skipped)
+def build_record(raw):
+    for name in RECORD_FIELDS:
+        if raw.get(name) is None:
+            metrics.count(f"missing_field.{name}")
+
+    price = _or_na(raw.get("price"))
+
+    address = raw.get("address")
+    if address is None:
+        print("Skipping a listing due to missing address data")
+        metrics.count("skipped_cards")
+        return None
+
+    beds = _or_na(raw.get("beds"))
+    baths = _or_na(raw.get("baths"))
+    sqft = _or_na(raw.get("sqft"))
+
+    link = raw.get("link")
+    if link is None:
+        print("Skipping a listing due to missing link data")
+        metrics.count("skipped_cards")
+        return None
+    link = f"https://www.redfin.com{link}" if link.startswith("/") else link
+
+    # Extract ID after /home/
+    match = LISTING_ID_PATTERN.search(link)
+    listing_id = match.group(1) if match else "N/A"
+
+    image_url = _or_na(raw.get("image_url"))
+
+    try:
+        latitude, longitude = parse_geo(raw["ld_json"])
+    except Exception as e:
+        print(f"⚠️ Failed to extract geo-coordinates: {e}")
+        metrics.count("missing_field.geo")
+        latitude, longitude = "N/A", "N/A"
+
+    return {
+        "Listing ID": listing_id,
+        "Price": price,
+        "Address": address,
+        "Beds": beds,
+        "Baths": baths,
+        "SqFt": sqft,
+        "Link": link,
+        "Image URL": image_url,
+        "Latitude": latitude,
+        "Longitude": longitude
+    }
+
+
+# Collapse whitespace the way WebElement.text renders it
+def _normalize_text(chunks):
+    return " ".join("".join(chunks).split())
+
+
+# Parse one page of HTML into (records, found_container, page numbers linked from the pager)
+def parse_page(html):
+    parser = HomeCardParser()
+    parser.feed(html)
+    parser.close()
+
+    records = []
+    for card in parser.cards:
+        raw = {name: _normalize_text(chunks) for name, chunks in card.pop("text").items()}
+        raw.update(card)
+        record = build_record(raw)
+        if record:
+            records.append(record)
+
+    return records, parser.found_container, parser.pages
+
+
+# Page numbers from the result of driver.execute_script(PAGES_SCRIPT)
+def parse_page_labels(labels):
+    pages = set()
+    for label in labels or []:
+        match = PAGE_LABEL_PATTERN.fullmatch(label or "")
+        if match:
+            pages.add(int(match.group(1)))
+    return pages
+
+
+# Records from the result of driver.execute_script(CARDS_SCRIPT)
+# (None when the script returns nothing, e.g. on a page without cards)
+def parse_script_result(cards):
+    records = []
+    for card in cards or []:
+        raw = {k: (v.strip() if isinstance(v, str) and k != "ld_json" else v) for k, v in card.items()}
+        record = build_record(raw)
+        if record:
+            records.append(record)
+    return records
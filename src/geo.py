@@ -0,0 +1,223 @@
+# Import libraries
+import html
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from compact import with_urls
+
+# --- Map layer for the Property Locations section ---
+# Listings are indexed on a Web Mercator pixel grid (the tile grid Leaflet uses)
+# at INDEX_ZOOM, so clustering at any view zoom is an integer shift of the same
+# cell coordinates: one vectorized pass, no per-row Python. Only points inside
+# the current viewport are sent; when there are more than MAX_DETAIL_POINTS of
+# them (and the map is zoomed out) they are sent as one marker per grid cell
+# with a count. The layer is a single GeoJSON FeatureCollection. Popups link to
+# the listing: compact frames get their Link from a listing_urls() table (urls).
+#
+# MapIndex is built once per loaded dataset (see get_map_index), on top of its
+# sidebar ListingIndex: the pixel coordinates of every listing, sorted by x. A
+# viewport is a binary search on x plus an exact check of the slice it brackets;
+# the sidebar ranges are then checked on the listings in view only (with the
+# ListingIndex's values), and clustering reuses the stored coordinates.
+
+INDEX_ZOOM = 20             # 256 * 2**20 px per axis: coordinates fit in 28 bits
+CLUSTER_CELL_PX = 64        # on-screen size of a cluster cell (4 x 4 cells per 256 px tile)
+DETAIL_ZOOM = 16            # from this zoom on, listings are always shown one by one
+MAX_DETAIL_POINTS = 1000    # below DETAIL_ZOOM, more points than this in view are clustered
+DEFAULT_CENTER = [34.1, -118.3]
+DEFAULT_ZOOM = 12
+
+_CELL_BITS = int(np.log2(CLUSTER_CELL_PX))
+
+
+# (x, y) pixel coordinates of each point at INDEX_ZOOM (Web Mercator)
+def spatial_index(lat, lon):
+    lat = np.clip(np.asarray(lat, dtype=float), -85.05112878, 85.05112878)
+    lon = np.asarray(lon, dtype=float)
+    scale = 256 * 2.0 ** INDEX_ZOOM
+    x = (lon + 180.0) / 360.0 * scale
+    y = (1.0 - np.log(np.tan(np.radians(lat)) + 1.0 / np.cos(np.radians(lat))) / np.pi) / 2.0 * scale
+    return x.astype(np.int64), y.astype(np.int64)
+
+
+# Points inside bounds = (south, west, north, east); None means everything
+def viewport_mask(lat, lon, bounds):
+    lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    if bounds is None:
+        return np.isfinite(lat) & np.isfinite(lon)
+    south, west, north, east = bounds
+    return (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+
+
+class MapIndex:
+    def __init__(self, listing_index):
+        self.frame = df = listing_index.frame   # table order, as the ListingIndex query results
+        self.values = listing_index.values      # filter column -> values in table order
+        lat, lon = df["Latitude"].to_numpy(dtype=float), df["Longitude"].to_numpy(dtype=float)
+        located = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        x, y = spatial_index(lat[located], lon[located])
+        order = np.argsort(x, kind="stable")
+        self.positions = located[order]   # table positions, by x
+        self.x, self.y = x[order], y[order]
+        self.lat, self.lon = lat[self.positions], lon[self.positions]
+
+    # Listings inside bounds = (south, west, north, east) that match the {column: (lo, hi)}
+    # ranges, as indexes into the x-sorted arrays (positions, x, y, lat, lon)
+    def viewport(self, bounds=None, ranges=None):
+        inside = np.arange(len(self.positions)) if bounds is None else self._inside(bounds)
+        positions = self.positions[inside]
+        for column, (lo, hi) in (ranges or {}).items():
+            values = self.values[column][positions]
+            keep = (values >= (-np.inf if lo is None else lo)) & (values <= (np.inf if hi is None else hi))
+            inside, positions = inside[keep], positions[keep]
+        return inside
+
+    # Rows of viewport() indexes, in table order
+    def rows(self, inside):
+        return self.frame.iloc[np.sort(self.positions[inside])]
+
+    # One cluster per grid cell at `zoom` of viewport() indexes
+    def clusters(self, inside, zoom):
+        return cluster_points(self.lat[inside], self.lon[inside], zoom, index=(self.x[inside], self.y[inside]))
+
+    # Indexes (into the x-sorted arrays) of the listings inside bounds
+    def _inside(self, bounds):
+        south, west, north, east = bounds
+        # Pixel x brackets the candidates; their coordinates decide exactly
+        (x_west, x_east), _ = spatial_index([south, south], [west, east])
+        start = np.searchsorted(self.x, x_west, side="left")
+        stop = np.searchsorted(self.x, x_east, side="right")
+        return start + np.flatnonzero(viewport_mask(self.lat[start:stop], self.lon[start:stop], bounds))
+
+
+# Indexes of the most recently used datasets, keyed by the caller (e.g. a frame
+# cache key, which changes when the source files do)
+MAX_INDEXES = 8
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_map_index(key, listing_index):
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    index = MapIndex(listing_index)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+# One cluster per grid cell at `zoom`: mean position and number of points
+def cluster_points(lat, lon, zoom, index=None):
+    lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    x, y = index if index is not None else spatial_index(lat, lon)
+    shift = max(INDEX_ZOOM - int(zoom), 0) + _CELL_BITS
+    cells = ((x >> shift) << 32) | (y >> shift)
+    _, cell_of_point, counts = np.unique(cells, return_inverse=True, return_counts=True)
+    return pd.DataFrame({
+        "Latitude": np.bincount(cell_of_point, weights=lat) / counts,
+        "Longitude": np.bincount(cell_of_point, weights=lon) / counts,
+        "count": counts,
+    })
+
+
+def _feature(lat, lon, properties):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [round(float(lon), 6), round(float(lat), 6)]},
+            "properties": properties}
+
+
+# Listing markers with their popup HTML (built column-wise)
+def point_features(df, selected_address=None):
+    addresses = df["Address"].astype(str)
+    popups = ("<b>" + addresses.map(html.escape) + "</b><br>"
+              + "Price: $" + df["Price"].map("{:,.0f}".format) + "<br>"
+              + "Beds: " + df["Beds"].astype(str) + ", Baths: " + df["Baths"].astype(str) + "<br>"
+              + "SqFt: " + df["SqFt"].map("{:,}".format) + "<br>"
+              + '<a href="' + df["Link"].astype(str).map(html.escape) + '" target="_blank">View Listing</a>')
+    selected = (addresses == selected_address).to_numpy() if selected_address else np.zeros(len(df), dtype=bool)
+    return [_feature(lat, lon, {"popup": popup, "selected": bool(is_selected)})
+            for lat, lon, popup, is_selected in zip(df["Latitude"].to_numpy(float), df["Longitude"].to_numpy(float),
+                                                    popups, selected)]
+
+
+# GeoJSON FeatureCollection for the listings visible at (zoom, bounds).
+# "mode" is "points" (one feature per listing) or "clusters" (one per grid cell).
+# With the day's MapIndex and the sidebar ranges that selected df from it
+# (ListingIndex.query(ranges)), the listings in view come from the index instead
+# of a pass over df.
+def map_layer(df, zoom=DEFAULT_ZOOM, bounds=None, selected_address=None, max_points=MAX_DETAIL_POINTS, urls=None,
+              index=None, ranges=None):
+    if df.empty:
+        return {"type": "FeatureCollection", "features": [], "mode": "points", "points": 0}
+
+    if index is not None:
+        inside = index.viewport(bounds, ranges)
+        points = len(inside)
+    else:
+        visible = df[viewport_mask(df["Latitude"], df["Longitude"], bounds)]
+        points = len(visible)
+
+    if zoom >= DETAIL_ZOOM or points <= max_points:
+        if index is not None:
+            visible = index.rows(inside)
+        features = point_features(visible if urls is None else with_urls(visible, urls), selected_address)
+        mode = "points"
+    else:
+        if index is not None:
+            clusters = index.clusters(inside, zoom)
+        else:
+            clusters = cluster_points(visible["Latitude"], visible["Longitude"], zoom)
+        features = [_feature(lat, lon, {"count": int(count), "label": f"{count:,} listings"})
+                    for lat, lon, count in zip(clusters["Latitude"], clusters["Longitude"], clusters["count"])]
+        mode = "clusters"
+    return {"type": "FeatureCollection", "features": features, "mode": mode, "points": int(points)}
+
+
+# Radius in px of a cluster marker (grows with the log of its count)
+def cluster_radius(count):
+    return 8 + 4 * np.log10(max(count, 1))
+
+
+# folium FeatureGroup drawing a map_layer() collection
+def layer_group(layer, name="Listings"):
+    import folium
+
+    group = folium.FeatureGroup(name=name)
+    collection = {"type": "FeatureCollection", "features": layer["features"]}
+    if not layer["features"]:
+        return group
+
+    if layer["mode"] == "clusters":
+        folium.GeoJson(
+            collection,
+            marker=folium.CircleMarker(fill=True, fill_opacity=0.6, weight=1),
+            style_function=lambda feature: {"radius": cluster_radius(feature["properties"]["count"]),
+                                            "color": "#1f77b4", "fillColor": "#1f77b4"},
+            tooltip=folium.GeoJsonTooltip(fields=["label"], labels=False),
+        ).add_to(group)
+    else:
+        folium.GeoJson(
+            collection,
+            marker=folium.CircleMarker(radius=6, fill=True, fill_opacity=0.8, weight=1),
+            style_function=lambda feature: {"color": "red" if feature["properties"]["selected"] else "blue",
+                                            "fillColor": "red" if feature["properties"]["selected"] else "blue"},
+            popup=folium.GeoJsonPopup(fields=["popup"], labels=False),
+        ).add_to(group)
+    return group
+
+
+# (center, zoom, bounds) from the st_folium value of the previous run, else the defaults
+def view_from_state(state):
+    if not state or not state.get("bounds") or not state["bounds"].get("_southWest"):
+        return DEFAULT_CENTER, DEFAULT_ZOOM, None
+    south_west, north_east = state["bounds"]["_southWest"], state["bounds"]["_northEast"]
+    bounds = (south_west["lat"], south_west["lng"], north_east["lat"], north_east["lng"])
+    center = state.get("center") or {}
+    center = [center["lat"], center["lng"]] if "lat" in center else DEFAULT_CENTER
+    return center, state.get("zoom") or DEFAULT_ZOOM, bounds
@@ -0,0 +1,125 @@
+# Import libraries
+import json
+import logging
+import os
+
+# --- Scrape checkpoints ---
+# Each run appends one JSON line per completed results page to a journal next to
+# the raw daily file ("data/raw/<slug>_<date>.journal.jsonl"):
+#
+#   {"page": 7, "linked_pages": [1, 2, ..., 9], "records": [{...}, ...]}
+#
+# Lines are flushed and fsynced as soon as the page is extracted, so a crash or a
+# kill loses at most the pages in flight. A restarted run for the same date loads
+# the journal, fetches only the pages it has not completed yet and skips Listing
+# IDs it already captured (listings shift between pages while a run is going).
+# The journal is removed once the daily file and the master are written; until
+# then the pages captured so far can be materialized on their own.
+
+
+# "<slug>_<date>.csv" -> "<slug>_<date>.journal.jsonl"
+def journal_path(daily_file):
+    return os.path.splitext(daily_file)[0] + ".journal.jsonl"
+
+
+class ScrapeJournal:
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}          # page number -> page numbers linked from its pager
+        self.page_records = {}   # page number -> records first captured on that page
+        self.listing_ids = set()
+        self.file = None         # opened on the first completed page
+        self._load()
+        self.resumed_pages = len(self.pages)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a killed run: that page was not completed
+                    logging.warning(f"⚠️ Ignoring an incomplete journal line in {self.path}")
+                    continue
+                self.pages[entry["page"]] = set(entry["linked_pages"])
+                self.page_records[entry["page"]] = entry["records"]
+                self.listing_ids.update(r["Listing ID"] for r in entry["records"] if _has_id(r))
+        if self.pages:
+            logging.info(f"📒 {self.path}: {len(self.pages)} pages and {len(self.listing_ids)} listings "
+                         f"already captured")
+
+    # Every captured record, in page order (like a run that never stopped)
+    @property
+    def records(self):
+        return [record for n in sorted(self.page_records) for record in self.page_records[n]]
+
+    # Journal a completed page; returns its records minus already-captured listings
+    def record(self, page_number, records, linked_pages):
+        new = []
+        for record in records:
+            if _has_id(record):
+                if record["Listing ID"] in self.listing_ids:
+                    continue
+                self.listing_ids.add(record["Listing ID"])
+            new.append(record)
+
+        if self.file is None:
+            self._open()
+        line = json.dumps({"page": page_number, "linked_pages": sorted(linked_pages), "records": new})
+        self.file.write((line + "\n").encode("utf-8"))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        self.pages[page_number] = set(linked_pages)
+        self.page_records[page_number] = new
+        return new
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "a+b")
+        # Start on a fresh line after a torn one, so the next entry stays readable
+        if self.file.tell() > 0:
+            self.file.seek(-1, os.SEEK_END)
+            if self.file.read(1) != b"\n":
+                self.file.write(b"\n")
+
+    def done(self, page_number):
+        return page_number in self.pages
+
+    # Pages linked from a completed page but not completed themselves (page 1 on a fresh run)
+    def pending_pages(self):
+        if not self.pages:
+            return {1}
+        linked = set().union(*self.pages.values())
+        return {n for n in linked if n >= 1} - set(self.pages)
+
+    def next_page(self):
+        pending = self.pending_pages()
+        return min(pending) if pending else None
+
+    def close(self):
+        if self.file is not None and not self.file.closed:
+            self.file.close()
+
+    # The run's output is saved: the journal is no longer needed
+    def finish(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _has_id(record):
+    return record.get("Listing ID") not in (None, "N/A")
+
+
+# Records captured by a (possibly partial) run, without fetching anything
+def load_journal(path):
+    return ScrapeJournal(path)
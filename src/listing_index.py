@@ -0,0 +1,98 @@
+# Import libraries
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# --- Listing index for the sidebar filters ---
+# Built once per loaded dataset: the rows are stored in table order (Price,
+# descending) and every filter column gets a sorted copy of its values with
+# their row positions. A range filter is two binary searches (searchsorted) on
+# that copy; the most selective range gives the candidate rows and the other
+# ranges are checked on those candidates only. Positions are row numbers in
+# table order, so sorting the matches yields the price-sorted table directly.
+
+FILTER_COLUMNS = ["Price", "Beds", "Baths", "SqFt"]
+
+# Above this share of the rows, one pass over the columns beats gathering candidates
+BROAD_QUERY_SHARE = 0.5
+
+
+class ListingIndex:
+    def __init__(self, df, columns=FILTER_COLUMNS, sort_by="Price"):
+        order = np.argsort(-df[sort_by].to_numpy(dtype=float), kind="stable")
+        self.frame = df.take(order)
+        self.rows = len(df)
+        position_dtype = np.int32 if self.rows < 2**31 else np.int64
+
+        self.values = {}   # column -> values in table order
+        self.sorted = {}   # column -> (sorted values, their positions in table order)
+        for column in columns:
+            values = self.frame[column].to_numpy(dtype=float)
+            by_value = np.argsort(values, kind="stable").astype(position_dtype)
+            self.values[column] = values
+            self.sorted[column] = (values[by_value], by_value)
+
+    def __len__(self):
+        return self.rows
+
+    # [start, stop) of the rows with lo <= value <= hi in the column's sorted copy
+    def span(self, column, lo=None, hi=None):
+        keys = self.sorted[column][0]
+        start = np.searchsorted(keys, -np.inf if lo is None else lo, side="left")
+        stop = np.searchsorted(keys, np.inf if hi is None else hi, side="right")
+        return int(start), int(max(stop, start))
+
+    # Sorted positions (table order) of the rows matching every {column: (lo, hi)} range
+    def positions(self, ranges=None):
+        ranges = ranges or {}
+        if not ranges:
+            return np.arange(self.rows)
+
+        spans = {column: self.span(column, lo, hi) for column, (lo, hi) in ranges.items()}
+        column, (start, stop) = min(spans.items(), key=lambda item: item[1][1] - item[1][0])
+
+        if stop - start > self.rows * BROAD_QUERY_SHARE:
+            mask = np.ones(self.rows, dtype=bool)
+            for name, (lo, hi) in ranges.items():
+                mask &= self._in_range(self.values[name], lo, hi)
+            return np.flatnonzero(mask)
+
+        candidates = self.sorted[column][1][start:stop]
+        mask = np.ones(len(candidates), dtype=bool)
+        for name, (lo, hi) in ranges.items():
+            if name != column:
+                mask &= self._in_range(self.values[name][candidates], lo, hi)
+        return np.sort(candidates[mask])
+
+    @staticmethod
+    def _in_range(values, lo, hi):
+        return (values >= (-np.inf if lo is None else lo)) & (values <= (np.inf if hi is None else hi))
+
+    def count(self, ranges=None):
+        return len(self.positions(ranges))
+
+    # Matching rows, sorted by price (descending), with their original index
+    def query(self, ranges=None, columns=None):
+        frame = self.frame if not ranges else self.frame.iloc[self.positions(ranges)]
+        return frame if columns is None else frame[columns]
+
+
+# Indexes of the most recently used datasets, keyed by the caller (e.g. a frame
+# cache key, which changes when the source files do)
+MAX_INDEXES = 8
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_listing_index(key, df):
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    index = ListingIndex(df)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
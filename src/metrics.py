@@ -0,0 +1,402 @@
+# Import libraries
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- Run metrics ---
+# Every pipeline stage run (scrape, clean, pipeline) records named timers and
+# counters and, when it ends, appends one JSON line to logs/metrics.jsonl:
+#
+#   {"run_id": ..., "stage": "scrape", "started": ..., "seconds": 12.3, "status": "ok",
+#    "labels": {"region": ...}, "counters": {"listings": 257, ...},
+#    "timers": {"page_load": {"count": 7, "total_s": 2.1, "p50_ms": ..., "p95_ms": ..., "max_ms": ...}}}
+#
+# timer() / count() record into the innermost active run of the calling context,
+# else of the process (worker threads started without the context), and do
+# nothing outside a run, so instrumented code can be called from anywhere. Runs
+# started concurrently in separate contexts (the scheduler's DAG stages) keep
+# their metrics apart. The dashboard, whose reruns overlap across sessions, keeps
+# its own long-lived Run and flushes it periodically instead.
+#
+# Optional profiling of a whole run (enable_profiling()): "cprofile" writes a
+# .prof file for pstats/snakeviz, "sample" a collapsed-stack .folded file
+# (flamegraph.pl / speedscope) from a sampling thread. Both go to logs/profiles/.
+#
+# `scheduler.py --report` summarizes the recorded runs (report() below).
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, ".."))
+
+# PROPERTY_PULSE_METRICS_FILE points the records elsewhere (the benchmarks use a temp file)
+METRICS_FILE = os.environ.get("PROPERTY_PULSE_METRICS_FILE") or os.path.join(project_root, "logs", "metrics.jsonl")
+PROFILE_DIR = os.path.join(project_root, "logs", "profiles")
+MAX_METRICS_BYTES = 5 * 1024 * 1024   # then rotated to metrics.jsonl.1 (one backup, like the log files)
+
+MAX_SAMPLES = 2048        # per-call durations kept per timer for percentiles (reservoir)
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples of the sampling profiler
+PROFILERS = ("cprofile", "sample")
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+class Timer:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling: every call has the same chance to be kept
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def summary(self):
+        return {"count": self.count, "total_s": round(self.total, 6),
+                "p50_ms": round(_percentile(self.samples, 50) * 1000, 3),
+                "p95_ms": round(_percentile(self.samples, 95) * 1000, 3),
+                "max_ms": round(self.max * 1000, 3)}
+
+
+class Run:
+    def __init__(self, stage, **labels):
+        self.stage = stage
+        self.labels = labels
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.start = time.perf_counter()
+        self.timers = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = Timer()
+            timer.add(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    # Decorator form of timer()
+    def timed(self, name):
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def label(self, **labels):
+        self.labels.update(labels)
+
+    def record(self, status="ok", **extra):
+        with self.lock:
+            return {"run_id": self.run_id, "stage": self.stage, "started": self.started,
+                    "seconds": round(time.perf_counter() - self.start, 6), "status": status,
+                    "labels": self.labels, "counters": dict(self.counters),
+                    "timers": {name: timer.summary() for name, timer in sorted(self.timers.items())}, **extra}
+
+    # Append the record and start afresh (for long-lived runs such as the dashboard's)
+    def flush(self, path=None):
+        with self.lock:
+            if not self.timers and not self.counters:
+                return
+        write_record(self.record(), path)
+        with self.lock:
+            self.timers, self.counters = {}, {}
+            self.start = time.perf_counter()
+            self.started = datetime.now().isoformat(timespec="seconds")
+            self.run_id = uuid.uuid4().hex[:12]
+
+
+# --- Active runs of this process ---
+
+_runs = []
+_runs_lock = threading.Lock()
+_context_runs = contextvars.ContextVar("metrics_runs", default=())
+_profiler = None   # one of PROFILERS, or None
+
+
+def current_run():
+    runs = _context_runs.get()
+    if runs:
+        return runs[-1]
+    return _runs[-1] if _runs else None
+
+
+# `fn` bound to a copy of the caller's context, so its metrics go to the caller's
+# run; one per executor.submit() (a context cannot be entered by two threads at once)
+def in_context(fn):
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+@contextmanager
+def timer(name):
+    run = current_run()
+    if run is None:
+        yield
+        return
+    with run.timer(name):
+        yield
+
+
+def add_time(name, seconds):
+    run = current_run()
+    if run is not None:
+        run.add_time(name, seconds)
+
+
+def count(name, n=1):
+    run = current_run()
+    if run is not None:
+        run.count(name, n)
+
+
+def label(**labels):
+    run = current_run()
+    if run is not None:
+        run.label(**labels)
+
+
+# One long-lived run per stage name for this process (e.g. the dashboard's loaders),
+# flushed by flush_due() at most every `interval` seconds
+_shared_runs = {}
+
+
+def shared_run(stage):
+    with _runs_lock:
+        run = _shared_runs.get(stage)
+        if run is None:
+            run = _shared_runs[stage] = Run(stage)
+        return run
+
+
+def flush_due(run, interval=60):
+    if time.perf_counter() - run.start >= interval:
+        try:
+            run.flush()
+        except OSError as e:
+            logging.warning(f"⚠️ Could not write run metrics: {e}")
+
+
+def enable_profiling(profiler):
+    global _profiler
+    if profiler not in (None, *PROFILERS):
+        raise ValueError(f"Unknown profiler {profiler}; choose from {', '.join(PROFILERS)}")
+    _profiler = profiler
+
+
+def write_record(record, path=None):
+    path = path or METRICS_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path) and os.path.getsize(path) > MAX_METRICS_BYTES:
+        os.replace(path, path + ".1")
+    # One write() on an O_APPEND file: lines from concurrent processes do not interleave
+    line = (json.dumps(record) + "\n").encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+# Run `fn` as a recorded run of `stage`. The status is "error" when it raises,
+# "failed" when it returns False, "ok" otherwise.
+def recorded_run(stage):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            run = Run(stage)
+            with _runs_lock:
+                _runs.append(run)
+                outermost = len(_runs) == 1
+            token = _context_runs.set(_context_runs.get() + (run,))
+            profiler = _start_profiler() if outermost and _profiler else None
+            status = "error"
+            try:
+                result = fn(*args, **kwargs)
+                status = "failed" if result is False else "ok"
+                return result
+            finally:
+                extra = {"profile": _stop_profiler(profiler, run)} if profiler else {}
+                _context_runs.reset(token)
+                with _runs_lock:
+                    _runs.remove(run)
+                try:
+                    write_record(run.record(status, **extra))
+                except OSError as e:
+                    logging.warning(f"⚠️ Could not write run metrics: {e}")
+        return wrapper
+    return decorate
+
+
+# --- Profilers ---
+
+class SamplingProfiler:
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self, path):
+        self.stopped.set()
+        self.thread.join()
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, samples in sorted(self.stacks.items()):
+                f.write(f"{stack} {samples}\n")
+
+
+def _start_profiler():
+    if _profiler == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        profiler = SamplingProfiler()
+        profiler.start()
+    return profiler
+
+
+def _stop_profiler(profiler, run):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    if isinstance(profiler, SamplingProfiler):
+        path = os.path.join(PROFILE_DIR, f"{run.stage}-{run.run_id}.folded")
+        profiler.stop(path)
+    else:
+        import pstats
+
+        profiler.disable()
+        path = os.path.join(PROFILE_DIR, f"{run.stage}-{run.run_id}.prof")
+        profiler.dump_stats(path)
+        stats = pstats.Stats(profiler)
+        logging.info(f"🔬 {stats.total_calls} calls in {stats.total_tt:.2f}s")
+    logging.info(f"🔬 Wrote {_profiler} profile of {run.stage}: {path}")
+    return path
+
+
+# --- Report ---
+
+# Labels that change a run's workload: runs are compared only with runs that share them
+VARIANT_LABELS = ("region", "mode", "backend", "workers", "isolated")
+
+
+def variant(record):
+    labels = record.get("labels", {})
+    parts = [f"{name}={labels[name]}" for name in VARIANT_LABELS if labels.get(name) is not None]
+    return f"{record['stage']} [{', '.join(parts)}]" if parts else record["stage"]
+
+
+def load_records(path=None, last=None):
+    path = path or METRICS_FILE
+    records = []
+    for file in (path + ".1", path):
+        if not os.path.exists(file):
+            continue
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    if last:
+        by_variant = {}
+        for record in records:
+            by_variant.setdefault(variant(record), []).append(record)
+        records = [r for variant_records in by_variant.values() for r in variant_records[-last:]]
+    return records
+
+
+# Latency percentiles per stage variant and per timer across recorded runs. The
+# newest run is flagged when it is slower than `threshold` x the median of the
+# runs before it.
+def report(path=None, last=20, threshold=1.5):
+    records = load_records(path, last)
+    if not records:
+        return "No runs recorded yet."
+
+    lines = []
+    by_stage = {}
+    for record in records:
+        by_stage.setdefault(variant(record), []).append(record)
+
+    header = f"{'':28s} {'runs':>5s} {'p50':>9s} {'p95':>9s} {'max':>9s} {'latest':>9s}"
+    for stage, runs in sorted(by_stage.items()):
+        failed = sum(run["status"] != "ok" for run in runs)
+        lines.append(f"\n{stage} — last {len(runs)} runs, {failed} not ok (seconds; timers: total per run)")
+        lines.append(header)
+        lines.append(_row("run", [run["seconds"] for run in runs], threshold))
+        names = sorted({name for run in runs for name in run["timers"]})
+        for name in names:
+            totals = [run["timers"][name]["total_s"] for run in runs if name in run["timers"]]
+            lines.append(_row(f"  {name}", totals, threshold))
+        counters = sorted({name for run in runs for name in run["counters"]})
+        if counters:
+            latest = runs[-1]["counters"]
+            lines.append("  latest counters: " + ", ".join(f"{name}={latest.get(name, 0)}" for name in counters))
+    return "\n".join(lines)
+
+
+def _row(name, values, threshold):
+    latest = values[-1]
+    previous = values[:-1]
+    median = _percentile(previous, 50)
+    flag = ""
+    if len(previous) >= 3 and median > 0 and latest > threshold * median:
+        flag = f"  ⚠️ {latest / median:.1f}x the median"
+    return (f"{name[:28]:28s} {len(values):5d} {_percentile(values, 50):9.3f} {_percentile(values, 95):9.3f} "
+            f"{max(values):9.3f} {latest:9.3f}{flag}")
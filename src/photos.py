@@ -0,0 +1,268 @@
+# Import libraries
+import hashlib
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import metrics
+from regions import DEFAULT_REGION, cleaned_daily_path, data_dir, get_region, raw_daily_path
+
+# --- Listing photos (optional pipeline stage) ---
+# Downloads the `Image URL` of every listing of a day into a local cache, with a
+# bounded pool of threads sharing one keep-alive HTTP client, and writes a small
+# JPEG thumbnail of each new photo in a process pool (decoding and resizing are
+# CPU-bound). Thumbnails are made as downloads complete, not after the batch.
+#
+# The cache is addressed by the SHA-1 of the URL (Redfin photo URLs are stable,
+# so the same photo keeps its file across daily snapshots):
+#
+#   data/photos/<h[:2]>/<h>.jpg         original
+#   data/photos/<h[:2]>/<h>.thumb.jpg   thumbnail
+#
+# A URL already cached is not fetched again. Cache hits refresh the file's mtime,
+# and after each run the least recently used photos are evicted until the cache
+# fits its size budget.
+
+DEFAULT_WORKERS = 8
+DEFAULT_BUDGET_MB = 2048
+THUMBNAIL_SIZE = (320, 240)
+THUMBNAIL_QUALITY = 80
+MAX_PHOTO_BYTES = 20 * 2**20
+REQUEST_TIMEOUT = 30
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def photo_dir(data_root=None):
+    return data_dir("photos", data_root)
+
+
+class PhotoCache:
+    def __init__(self, directory, budget_mb=DEFAULT_BUDGET_MB):
+        self.directory = directory
+        self.budget = budget_mb * 2**20
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def path(self, url):
+        extension = os.path.splitext(url.split("?")[0])[1].lower()
+        key = self.key(url)
+        return os.path.join(self.directory, key[:2], key + (extension if extension in PHOTO_EXTENSIONS else ".img"))
+
+    def thumbnail_path(self, url):
+        key = self.key(url)
+        return os.path.join(self.directory, key[:2], f"{key}.thumb.jpg")
+
+    # True (and marked as recently used) when the photo is cached
+    def has(self, url):
+        try:
+            os.utime(self.path(url))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def put(self, url, content):
+        path = self.path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        return path
+
+    # {key: (last used, bytes, [files])} for every cached photo and its thumbnail
+    def _entries(self):
+        entries = {}
+        if not os.path.isdir(self.directory):
+            return entries
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                st = entry.stat()
+                key = entry.name.split(".", 1)[0]
+                used, size, files = entries.get(key, (0.0, 0, []))
+                entries[key] = (max(used, st.st_mtime), size + st.st_size, files + [entry.path])
+        return entries
+
+    def usage(self):
+        entries = self._entries()
+        return {"photos": len(entries), "bytes": sum(size for _, size, _ in entries.values())}
+
+    # Drop least recently used photos (with their thumbnails) until the cache fits
+    # the budget; returns the number of photos removed
+    def evict(self):
+        entries = self._entries()
+        used = sum(size for _, size, _ in entries.values())
+        removed = 0
+        for _, size, files in sorted(entries.values()):
+            if used <= self.budget:
+                break
+            for path in files:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            used -= size
+            removed += 1
+        return removed
+
+
+# Resize one photo into a JPEG thumbnail (runs in a worker process)
+def make_thumbnail(source, target, size=THUMBNAIL_SIZE):
+    from PIL import Image
+
+    try:
+        with Image.open(source) as image:
+            image.draft("RGB", size)   # JPEG: decode at a reduced scale straight away
+            image = image.convert("RGB")
+            image.thumbnail(size)
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            image.save(tmp_path, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+        os.replace(tmp_path, target)
+        return True
+    except OSError as e:
+        logging.warning(f"⚠️ Could not make a thumbnail of {source}: {e}")
+        return False
+
+
+# Fetch one photo into the cache; returns the bytes downloaded (0 when already cached)
+def fetch_photo(client, url, cache, limiter=None):
+    if cache.has(url):
+        return 0
+    if limiter is not None:
+        metrics.add_time("photos.rate_limit_wait", limiter.wait(url))
+    with metrics.timer("photos.fetch"):
+        response = client.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+    content_type = response.headers.get("Content-Type", "")
+    if not content_type.startswith("image/"):
+        raise ValueError(f"not an image ({content_type or 'no content type'})")
+    if len(response.content) > MAX_PHOTO_BYTES:
+        raise ValueError(f"larger than {MAX_PHOTO_BYTES // 2**20} MB")
+    cache.put(url, response.content)
+    return len(response.content)
+
+
+# Download every photo not cached yet and thumbnail it. Returns run stats.
+def download_photos(urls, cache, workers=DEFAULT_WORKERS, thumbnail_workers=None, thumbnail_size=THUMBNAIL_SIZE,
+                    rate=None, client=None):
+    from backends import create_http_client
+    from pool import HostRateLimiter
+
+    start = time.perf_counter()
+    unique = list(dict.fromkeys(url for url in urls if isinstance(url, str) and url.startswith("http")))
+    stats = {"urls": len(unique), "cached": 0, "downloaded": 0, "failed": 0, "bytes_downloaded": 0,
+             "thumbnails": 0}
+
+    client = client or create_http_client(pool_size=workers)
+    limiter = HostRateLimiter(rate) if rate else None
+    thumbnail_workers = thumbnail_workers or os.cpu_count() or 1
+    # "spawn": the worker processes do not inherit the download threads or the HTTP client
+    thumbnailer = ProcessPoolExecutor(thumbnail_workers, mp_context=multiprocessing.get_context("spawn"))
+    thumbnail_jobs = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as downloader:
+            futures = {downloader.submit(metrics.in_context(fetch_photo), client, url, cache, limiter): url
+                       for url in unique}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    downloaded = future.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    logging.warning(f"⚠️ Could not download {url}: {e}")
+                    continue
+                if downloaded:
+                    stats["downloaded"] += 1
+                    stats["bytes_downloaded"] += downloaded
+                else:
+                    stats["cached"] += 1
+                thumbnail = cache.thumbnail_path(url)
+                if not os.path.exists(thumbnail):
+                    thumbnail_jobs.append(thumbnailer.submit(make_thumbnail, cache.path(url), thumbnail,
+                                                             thumbnail_size))
+        stats["download_seconds"] = round(time.perf_counter() - start, 3)
+        with metrics.timer("photos.thumbnails_wait"):
+            stats["thumbnails"] = sum(job.result() for job in thumbnail_jobs)
+    finally:
+        thumbnailer.shutdown(cancel_futures=True)
+
+    stats["evicted"] = cache.evict()
+    stats.update({f"cache_{name}": value for name, value in cache.usage().items()})
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    for name in ("urls", "cached", "downloaded", "failed", "bytes_downloaded", "thumbnails", "evicted"):
+        metrics.count(name, stats[name])
+    return stats
+
+
+# Image URLs of a day's listings (cleaned file, else the raw scrape)
+def photo_urls(region, date, data_root=None):
+    import pandas as pd
+
+    for path in (cleaned_daily_path(region, date, data_root), raw_daily_path(region, date, data_root)):
+        if os.path.exists(path):
+            return pd.read_csv(path, usecols=["Image URL"], dtype=str)["Image URL"].dropna().tolist()
+    return []
+
+
+# Thumbnail of a listing photo if it has been downloaded, else None
+def cached_thumbnail(url, data_root=None):
+    if not isinstance(url, str) or not url.startswith("http"):
+        return None
+    path = PhotoCache(photo_dir(data_root)).thumbnail_path(url)
+    return path if os.path.exists(path) else None
+
+
+@metrics.recorded_run("photos")
+def run_photos(date=None, region=None, data_root=None, workers=DEFAULT_WORKERS, budget_mb=DEFAULT_BUDGET_MB,
+               thumbnail_workers=None, rate=None):
+    region = get_region(region)
+    date = date or datetime.today().strftime("%Y-%m-%d")
+    metrics.label(region=region["id"], date=date, workers=workers)
+
+    urls = photo_urls(region, date, data_root)
+    if not urls:
+        logging.warning(f"⚠️ No listings with photos for {region['id']} on {date}.")
+        return False
+
+    logging.info(f"📷 Fetching {len(urls)} listing photos for {region['id']} on {date}...")
+    cache = PhotoCache(photo_dir(data_root), budget_mb)
+    stats = download_photos(urls, cache, workers, thumbnail_workers, rate=rate)
+    logging.info(f"✅ Photos: {stats['downloaded']} downloaded ({stats['bytes_downloaded'] / 2**20:.1f} MB), "
+                 f"{stats['cached']} already cached, {stats['failed']} failed, {stats['thumbnails']} thumbnails, "
+                 f"{stats['evicted']} evicted in {stats['seconds']:.1f}s; cache holds {stats['cache_photos']} "
+                 f"photos ({stats['cache_bytes'] / 2**20:.1f} MB)")
+    return stats["failed"] < stats["urls"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--date", default=None, help="Day whose listing photos to fetch (default: today)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent downloads")
+    parser.add_argument("--thumbnail-workers", type=int, default=None, help="Thumbnail processes (default: CPUs)")
+    parser.add_argument("--budget-mb", type=int, default=DEFAULT_BUDGET_MB, help="Photo cache size limit")
+    parser.add_argument("--rate", type=float, default=None, help="Max requests per second to the image host")
+    parser.add_argument("--region", default=DEFAULT_REGION, help="Region id from config/regions.json")
+    parser.add_argument("--registry", default=None, help="Alternative region registry file")
+    parser.add_argument("--data-root", default=None, help="Alternative data directory (default: data/)")
+    parser.add_argument("--profile", choices=metrics.PROFILERS, default=None,
+                        help="Profile the run (cProfile, or a sampling profiler) into logs/profiles/")
+    args = parser.parse_args()
+
+    metrics.enable_profiling(args.profile)
+    region = get_region(args.region, args.registry)
+    success = run_photos(args.date, region, args.data_root, args.workers, args.budget_mb, args.thumbnail_workers,
+                         args.rate)
+    sys.exit(0 if success else 1)
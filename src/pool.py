@@ -0,0 +1,183 @@
+# Import libraries
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import metrics
+
+# --- Concurrent multi-page scraping ---
+# A bounded pool of warm browser sessions fetches /page-N in parallel, a per-host
+# token bucket paces the requests, and results are merged back in page order.
+
+
+# Classic token bucket: `rate` tokens per second, at most `capacity` banked
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Block until a token is available; returns the seconds spent waiting
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# One token bucket per host, created on first use
+class HostRateLimiter:
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.capacity)
+        return bucket.acquire()
+
+
+# Bounded pool of reusable sessions (WebDriver instances or anything with .quit())
+# Sessions are started lazily by `factory` and kept warm between pages.
+class SessionPool:
+    def __init__(self, factory, size):
+        self.factory = factory
+        self.size = size
+        self.idle = queue.LifoQueue()
+        self.sessions = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def session(self):
+        self.slots.acquire()
+        try:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                driver = self.factory()
+                with self.lock:
+                    self.sessions.append(driver)
+            try:
+                yield driver
+            finally:
+                self.idle.put(driver)
+        finally:
+            self.slots.release()
+
+    def close(self):
+        with self.lock:
+            sessions, self.sessions = self.sessions, []
+        for driver in sessions:
+            try:
+                driver.quit()
+            except Exception as e:
+                logging.warning(f"⚠️ Failed to close session: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def page_url(base_url, page_number):
+    return base_url if page_number == 1 else f"{base_url}/page-{page_number}"
+
+
+# Default page load: navigate and let the caller extract
+def _get(driver, url):
+    driver.get(url)
+
+
+# Scrape every results page reachable from base_url using the session pool.
+#
+# `extract(driver, page_number)` returns (records, found_container, linked_pages);
+# pages linked from any fetched page's pager are scheduled as they are discovered.
+# With a `journal` (journal.ScrapeJournal), every completed page is checkpointed
+# and the pages it already holds are not fetched again.
+# Returns (records in page order, stats dict).
+def scrape_pages(base_url, pool, limiter, extract, fetch=_get, max_workers=None, journal=None):
+    max_workers = max_workers or pool.size
+    results = {}
+    stats = {"pages": 0, "listings": 0, "wait_seconds": 0.0}
+    stats_lock = threading.Lock()
+
+    def fetch_page(page_number):
+        url = page_url(base_url, page_number)
+        with pool.session() as driver:
+            waited = limiter.wait(url)
+            metrics.add_time("rate_limit_wait", waited)
+            print(f"Scraping page {page_number}...")
+            with metrics.timer("page_load"):
+                fetch(driver, url)
+            with metrics.timer("extract"):
+                records, found_container, linked_pages = extract(driver, page_number)
+            metrics.count("pages")
+        with stats_lock:
+            stats["wait_seconds"] += waited
+        if not found_container:
+            print(f"Failed to locate the property list container on page {page_number}.")
+        else:
+            print(f"Found {len(records)} listings on page {page_number}")
+        return records, found_container, linked_pages
+
+    start = time.perf_counter()
+    first_pages = journal.pending_pages() if journal else {1}
+    scheduled = set(journal.pages) | first_pages if journal else set(first_pages)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(metrics.in_context(fetch_page), n): n for n in sorted(first_pages)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_number = pending.pop(future)
+                records, found_container, linked_pages = future.result()
+                if journal and found_container:   # a page without listings is retried on resume
+                    records = journal.record(page_number, records, linked_pages)
+                results[page_number] = records
+
+                # Schedule pages discovered in this page's pager
+                for n in sorted(linked_pages - scheduled):
+                    if n > 1:
+                        scheduled.add(n)
+                        pending[executor.submit(metrics.in_context(fetch_page), n)] = n
+
+    # Deterministic merge: page order, regardless of completion order
+    if journal:
+        scraped_data = journal.records
+    else:
+        scraped_data = [record for n in sorted(results) for record in results[n]]
+
+    elapsed = time.perf_counter() - start
+    stats.update(
+        pages=len(results),
+        resumed_pages=journal.resumed_pages if journal else 0,
+        listings=len(scraped_data),
+        seconds=elapsed,
+        pages_per_second=len(results) / elapsed if elapsed else 0.0,
+        sessions=len(pool.sessions),
+    )
+    logging.info(
+        f"⏱ Scraped {stats['pages']} pages ({stats['listings']} listings) in {elapsed:.1f}s "
+        f"— {stats['pages_per_second']:.2f} pages/s with {max_workers} workers"
+    )
+    return scraped_data, stats
@@ -0,0 +1,80 @@
+# Import libraries
+import glob
+import json
+import os
+import re
+
+# --- Region registry ---
+# Every market the pipeline covers is listed in config/regions.json:
+#   id          short name used on the command line ("hollywood_hills")
+#   name        display name for the dashboard
+#   url         Redfin search URL (page 1)
+#   slug        file prefix; every CSV the region produces starts with it
+#   max_workers optional cap on concurrent page fetches for the region
+# Output is namespaced by slug, e.g. data/raw/<slug>_2025-08-20.csv and
+# data/cleaned/<slug>_master_cleaned.csv, so regions never share a file.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, ".."))
+
+REGISTRY_FILE = os.path.join(project_root, "config", "regions.json")
+DEFAULT_REGION = "hollywood_hills"
+REQUIRED_FIELDS = ("id", "name", "url", "slug")
+
+
+# {region id: region} in registry order
+def load_regions(path=None):
+    with open(path or REGISTRY_FILE, encoding="utf-8") as f:
+        entries = json.load(f)["regions"]
+
+    regions = {}
+    for entry in entries:
+        missing = [field for field in REQUIRED_FIELDS if not entry.get(field)]
+        if missing:
+            raise ValueError(f"Region {entry.get('id', '?')} is missing {', '.join(missing)}")
+        if entry["id"] in regions:
+            raise ValueError(f"Duplicate region id {entry['id']}")
+        regions[entry["id"]] = entry
+    return regions
+
+
+# A region dict, looked up by id (None = the default region); dicts pass through
+def get_region(region=None, path=None):
+    if isinstance(region, dict):
+        return region
+    regions = load_regions(path)
+    region = region or DEFAULT_REGION
+    if region not in regions:
+        raise KeyError(f"Unknown region {region}; known regions: {', '.join(regions)}")
+    return regions[region]
+
+
+# --- Per-region data paths ---
+
+def data_dir(kind, data_root=None):
+    return os.path.join(data_root or os.path.join(project_root, "data"), kind)
+
+
+def raw_daily_path(region, date, data_root=None):
+    return os.path.join(data_dir("raw", data_root), f"{get_region(region)['slug']}_{date}.csv")
+
+
+def raw_master_path(region, data_root=None):
+    return os.path.join(data_dir("raw", data_root), f"{get_region(region)['slug']}_master.csv")
+
+
+def cleaned_daily_path(region, date, data_root=None):
+    return os.path.join(data_dir("cleaned", data_root), f"{get_region(region)['slug']}_cleaned_{date}.csv")
+
+
+def cleaned_master_path(region, data_root=None):
+    return os.path.join(data_dir("cleaned", data_root), f"{get_region(region)['slug']}_master_cleaned.csv")
+
+
+# Dates with a raw daily file for the region, newest first
+def available_dates(region, data_root=None):
+    slug = get_region(region)["slug"]
+    date_pattern = re.compile(rf"^{re.escape(slug)}_(\d{{4}}-\d{{2}}-\d{{2}})\.csv$")
+    files = glob.glob(os.path.join(data_dir("raw", data_root), f"{glob.escape(slug)}_*.csv"))
+    matches = (date_pattern.match(os.path.basename(f)) for f in files)
+    return sorted({m.group(1) for m in matches if m}, reverse=True)
@@ -0,0 +1,257 @@
+# Import libraries
+import glob
+import logging
+import math
+import os
+
+# NumPy, pandas and pyarrow are imported by the functions that use them, so
+# importing this module (e.g. via the cleanser) stays cheap
+
+from storage import list_partitions, load_master, partition_path
+
+# --- Daily rollups ---
+# One row per Date with, for each metric, count / sum / sum of squares / min / max
+# and a mergeable quantile sketch. Any date range is answered by merging its rows
+# (sums add up, sketches merge by adding bucket counts) instead of scanning the
+# listings. The cleanser refreshes the rows of the dates it writes.
+#
+# Sketch: log-spaced buckets (as in DDSketch). A positive value x lands in bucket
+# ceil(log_gamma(x)); every quantile read back is within ALPHA (1%) of a value
+# of that rank. Non-positive values are counted separately as zeros.
+
+ALPHA = 0.01
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+LOG_GAMMA = math.log(GAMMA)
+
+# Metric name -> how to compute it from a cleaned frame
+METRICS = {
+    "Price": lambda df: df["Price"],
+    "Price per SqFt": lambda df: df["Price"] / df["SqFt"].where(df["SqFt"] > 0),
+    "Beds": lambda df: df["Beds"],
+    "Baths": lambda df: df["Baths"],
+    "SqFt": lambda df: df["SqFt"],
+}
+
+SUMMARY_INDEX = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+# "<name>_master_cleaned.csv" -> "<name>_master_cleaned_rollups.parquet"
+def rollup_path(master_file):
+    return os.path.splitext(master_file)[0] + "_rollups.parquet"
+
+
+def _column(metric, stat):
+    return f"{metric}|{stat}"
+
+
+# Sketch of one array of values: (bucket indices, counts, zero count)
+def sketch(values):
+    import numpy as np
+
+    positive = values[values > 0]
+    buckets, counts = np.unique(np.ceil(np.log(positive) / LOG_GAMMA).astype(np.int32), return_counts=True)
+    return buckets, counts.astype(np.int64), int((values <= 0).sum())
+
+
+# Rollup rows (one per Date) for a cleaned frame
+def rollup_frame(df):
+    import numpy as np
+    import pandas as pd
+
+    dates = pd.to_datetime(df["Date"], errors="coerce", format="ISO8601").dt.normalize()
+    rows = []
+    for date, day_df in df.groupby(dates, sort=True):
+        row = {"Date": date.date(), "listings": len(day_df)}
+        for metric, compute in METRICS.items():
+            values = pd.to_numeric(compute(day_df), errors="coerce").dropna().to_numpy(dtype=float)
+            buckets, counts, zeros = sketch(values)
+            row.update({
+                _column(metric, "count"): len(values),
+                _column(metric, "sum"): values.sum(),
+                _column(metric, "sumsq"): np.square(values).sum(),
+                _column(metric, "min"): values.min() if len(values) else np.nan,
+                _column(metric, "max"): values.max() if len(values) else np.nan,
+                _column(metric, "zeros"): zeros,
+                _column(metric, "buckets"): buckets,
+                _column(metric, "counts"): counts,
+            })
+        rows.append(row)
+    return _to_table(rows)
+
+
+def _schema():
+    import pyarrow as pa
+
+    fields = [("Date", pa.date32()), ("listings", pa.int64())]
+    for metric in METRICS:
+        fields += [
+            (_column(metric, "count"), pa.int64()),
+            (_column(metric, "sum"), pa.float64()),
+            (_column(metric, "sumsq"), pa.float64()),
+            (_column(metric, "min"), pa.float64()),
+            (_column(metric, "max"), pa.float64()),
+            (_column(metric, "zeros"), pa.int64()),
+            (_column(metric, "buckets"), pa.list_(pa.int32())),
+            (_column(metric, "counts"), pa.list_(pa.int64())),
+        ]
+    return pa.schema(fields)
+
+
+def _to_table(rows):
+    import pyarrow as pa
+
+    schema = _schema()
+    return pa.table({field.name: pa.array([row[field.name] for row in rows], type=field.type) for field in schema},
+                    schema=schema)
+
+
+def _write(table, rollup_file):
+    import pyarrow.parquet as pq
+
+    tmp_path = rollup_file + ".tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, rollup_file)
+
+
+# Recompute the rollup rows of `dates` from the master's Date partitions
+# (O(those days) to compute; the small rollup file itself is rewritten).
+# Without a rollup file yet, the whole master is rolled up once.
+def update_rollups(master_file, dates, rollup_file=None):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    rollup_file = rollup_file or rollup_path(master_file)
+    if not os.path.exists(rollup_file):
+        rebuild_rollups(master_file, rollup_file)
+        return
+
+    days = sorted(set(pd.to_datetime(pd.Series(list(dates)), errors="coerce", format="ISO8601")
+                      .dropna().dt.strftime("%Y-%m-%d")))
+    if not days:
+        return
+
+    fresh = [rollup_frame(pd.read_csv(partition_path(master_file, day)))
+             for day in days if os.path.exists(partition_path(master_file, day))]
+
+    existing = pq.read_table(rollup_file)
+    replaced = pa.array([pd.Timestamp(day).date() for day in days], type=pa.date32())
+    keep = pc.invert(pc.is_in(existing["Date"], value_set=replaced))
+    _write(pa.concat_tables([existing.filter(keep), *fresh]).sort_by("Date"), rollup_file)
+    logging.info(f"📈 Updated rollups for {len(days)} dates: {rollup_file}")
+
+
+# Build the rollup file from scratch (partition by partition; legacy masters in one read)
+def rebuild_rollups(master_file, rollup_file=None):
+    import pandas as pd
+    import pyarrow as pa
+
+    rollup_file = rollup_file or rollup_path(master_file)
+    partitions = list_partitions(master_file)
+    if partitions:
+        tables = [rollup_frame(pd.read_csv(path)) for path in partitions]
+    else:
+        tables = [rollup_frame(load_master(master_file))] if os.path.exists(master_file) else []
+    _write(pa.concat_tables([_to_table([]), *tables]).sort_by("Date"), rollup_file)
+    logging.info(f"📈 Rebuilt rollups: {rollup_file}")
+
+
+# True when the rollup file is at least as new as every file of the master
+def rollups_ready(master_file, rollup_file=None):
+    rollup_file = rollup_file or rollup_path(master_file)
+    sources = list_partitions(master_file) or [p for p in [master_file] if os.path.exists(p)]
+    if not os.path.exists(rollup_file) or not sources:
+        return False
+    return os.path.getmtime(rollup_file) >= max(os.path.getmtime(p) for p in sources)
+
+
+# Rollup rows in [start_date, end_date] (either bound optional)
+def load_rollups(rollup_file, start_date=None, end_date=None, columns=None):
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    filters = []
+    if start_date is not None:
+        filters.append(("Date", ">=", pd.Timestamp(start_date).date()))
+    if end_date is not None:
+        filters.append(("Date", "<=", pd.Timestamp(end_date).date()))
+    return pq.read_table(rollup_file, columns=columns, filters=filters or None)
+
+
+# Per-date listing count and average price (the trend charts)
+def daily_series(table):
+    import numpy as np
+    import pandas as pd
+
+    dates = pd.to_datetime(table["Date"].to_numpy(zero_copy_only=False))
+    price_sum = table[_column("Price", "sum")].to_numpy()
+    price_count = table[_column("Price", "count")].to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_price = price_sum / price_count
+    return pd.DataFrame({"Price": mean_price, "Listings": table["listings"].to_numpy()},
+                        index=pd.Index(dates, name="Date"))
+
+
+# Quantiles of the merged sketches of every row in the table
+def merged_quantiles(table, metric, quantiles):
+    import numpy as np
+    import pyarrow.compute as pc
+
+    buckets = table[_column(metric, "buckets")].combine_chunks().flatten().to_numpy()
+    counts = table[_column(metric, "counts")].combine_chunks().flatten().to_numpy()
+    zeros = int(pc.sum(table[_column(metric, "zeros")]).as_py() or 0)
+    total = zeros + int(counts.sum())
+    if total == 0:
+        return [np.nan] * len(quantiles)
+
+    offset = buckets.min() if len(buckets) else 0
+    merged = np.bincount(buckets - offset, weights=counts) if len(buckets) else np.zeros(0)
+    cumulative = zeros + np.cumsum(merged)
+
+    results = []
+    for q in quantiles:
+        rank = q * (total - 1)
+        if rank < zeros:
+            results.append(0.0)
+            continue
+        i = int(np.searchsorted(cumulative, rank, side="right")) + offset
+        results.append(2 * GAMMA ** i / (GAMMA + 1))
+    return results
+
+
+# describe()-style summary (count, mean, std, min, quartiles, max) for the merged rows
+def summarize(table):
+    import numpy as np
+    import pandas as pd
+    import pyarrow.compute as pc
+
+    summary = {}
+    for metric in METRICS:
+        count = pc.sum(table[_column(metric, "count")]).as_py() or 0
+        total = pc.sum(table[_column(metric, "sum")]).as_py() or 0.0
+        sumsq = pc.sum(table[_column(metric, "sumsq")]).as_py() or 0.0
+        low = pc.min(table[_column(metric, "min")]).as_py()
+        high = pc.max(table[_column(metric, "max")]).as_py()
+
+        mean = total / count if count else np.nan
+        std = math.sqrt(max(sumsq - count * mean ** 2, 0.0) / (count - 1)) if count > 1 else np.nan
+        quartiles = merged_quantiles(table, metric, [0.25, 0.5, 0.75])
+        # Sketch values are approximate; keep them inside the exact range
+        quartiles = [min(max(q, low), high) if count else np.nan for q in quartiles]
+        summary[metric] = [count, mean, std, low, *quartiles, high]
+    return pd.DataFrame(summary, index=SUMMARY_INDEX)
+
+
+if __name__ == "__main__":
+    # Rebuild the rollups of every cleaned master under data/cleaned
+    project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    # A master is a legacy "<name>_master_cleaned.csv" file and/or its partition folder
+    cleaned_dir = os.path.join(project_root, "data", "cleaned")
+    masters = {os.path.splitext(path)[0] + ".csv"
+               for path in glob.glob(os.path.join(cleaned_dir, "*_master_cleaned*"))
+               if path.endswith("_master_cleaned.csv") or (path.endswith("_master_cleaned") and os.path.isdir(path))}
+    for master_file in sorted(masters):
+        rebuild_rollups(master_file)
@@ -0,0 +1,90 @@
+# Import libraries
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from regions import get_region, load_regions
+
+# --- Multi-region runner ---
+# Scrapes and cleans many regions at once: one worker process per region at a
+# time (up to `processes`), and inside each process a pool of at most
+# `region_workers` sessions (further capped by the region's "max_workers").
+# All regions are on the same host, so the host-wide `rate` is split evenly
+# across the processes to keep the total request rate unchanged.
+
+DEFAULT_PROCESSES = 4
+
+
+# Scrape + clean one region inside a worker process; returns its stats
+def process_region(region, options, data_root=None):
+    from cleanser import run_data_prep
+    from scraper import run_scrape
+
+    start = time.perf_counter()
+    df, stats = run_scrape(region, data_root=data_root, **options)
+    stats["cleaned"] = run_data_prep(stats["date"], region=region, data_root=data_root, df=df)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+# Run every region in `region_ids` (all registry regions when empty);
+# returns (per-region stats in registry order, failures {region id: error})
+def run_regions(region_ids=None, processes=DEFAULT_PROCESSES, region_workers=1, rate=0.5,
+                backend="selenium", extraction="page_source", registry=None, data_root=None):
+    regions = load_regions(registry)
+    selected = [get_region(region_id, registry) for region_id in region_ids] if region_ids else list(regions.values())
+    processes = max(1, min(processes, len(selected)))
+    options = {
+        "extraction": extraction,
+        "workers": region_workers,
+        "rate": rate / processes,
+        "backend": backend,
+    }
+
+    logging.info(f"🗺 Running {len(selected)} regions in {processes} processes "
+                 f"({region_workers} sessions per region)...")
+    start = time.perf_counter()
+    results, failures = {}, {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(process_region, region, options, data_root): region["id"] for region in selected}
+        for future in as_completed(futures):
+            region_id = futures[future]
+            try:
+                results[region_id] = future.result()
+                logging.info(f"✅ {region_id}: {results[region_id]['listings']} listings "
+                             f"in {results[region_id]['seconds']:.1f}s")
+            except Exception as e:
+                failures[region_id] = str(e)
+                logging.error(f"❌ {region_id} failed: {e}")
+
+    elapsed = time.perf_counter() - start
+    listings = sum(stats["listings"] for stats in results.values())
+    logging.info(f"⏱ {len(results)}/{len(selected)} regions, {listings} listings in {elapsed:.1f}s")
+    return [results[region["id"]] for region in selected if region["id"] in results], failures
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from backends import BACKENDS
+
+    logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(sys.stdout)],
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--regions", nargs="*", default=None,
+                        help="Region ids from config/regions.json (default: all)")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES,
+                        help="Regions processed in parallel")
+    parser.add_argument("--region-workers", type=int, default=1,
+                        help="Sessions fetching pages in parallel within one region")
+    parser.add_argument("--rate", type=float, default=0.5,
+                        help="Max page requests per second for the host, shared by all processes")
+    parser.add_argument("--backend", choices=BACKENDS, default="selenium")
+    parser.add_argument("--registry", default=None, help="Alternative region registry file")
+    args = parser.parse_args()
+
+    _, failures = run_regions(args.regions, args.processes, args.region_workers, args.rate,
+                              args.backend, registry=args.registry)
+    sys.exit(1 if failures else 0)
@@ -2,46 +2,251 @@
 import os
 import sys
 import subprocess
+import threading
+import time
 import logging
 from logging.handlers import RotatingFileHandler
-from apscheduler.schedulers.blocking import BlockingScheduler
+
+import metrics
+from regions import DEFAULT_REGION, get_region, load_regions
 
 # --- Resolve project root ---
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(script_dir, ".."))
 
-# --- Log setup with rotation + UTF-8 ---
+# --- Log setup with rotation + UTF-8 (called by the command-line entry point) ---
 log_file = os.path.join(project_root, "logs", "scheduler.log")
-os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-handler = RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[handler, logging.StreamHandler(sys.stdout)]
-)
 
-scheduler = BlockingScheduler()
+def setup_logging():
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    handler = RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[handler, logging.StreamHandler(sys.stdout)]
+    )
 
 # --- Utility: run a script inside the same Python (Poetry env) ---
-def run_script(script_name):
+# Output is logged line by line as the script writes it (stderr as errors);
+# -u keeps the child's stdout unbuffered, so lines are not held until it exits
+def run_script(script_name, *args):
     script_path = os.path.join(script_dir, script_name)
-    result = subprocess.run([sys.executable, script_path], capture_output=True, text=True)
-    if result.stdout:
-        logging.info(result.stdout.strip())
-    if result.stderr:
-        logging.error(result.stderr.strip())
-    return result.returncode == 0
+    process = subprocess.Popen(
+        [sys.executable, "-u", script_path, *args],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8", errors="replace",
+    )
+
+    def pump(stream, log):
+        for line in stream:
+            if line.strip():
+                log(line.rstrip())
+
+    stderr_thread = threading.Thread(target=pump, args=(process.stderr, logging.error), daemon=True)
+    stderr_thread.start()
+    pump(process.stdout, logging.info)
+    stderr_thread.join()
+    return process.wait() == 0
+
+# --- Pipeline ---
+# In-process (default): scrape() and run_data_prep() are called directly and the
+# scraped DataFrame goes straight to cleaning, so a run pays no interpreter start,
+# no re-import of pandas/selenium and no raw CSV re-read.
+# Isolated: each stage runs in its own interpreter (a crash or leak in the scraper
+# cannot take the scheduler down); success is the scripts' exit codes.
+
+# Region selection -> command-line flags shared by scraper.py and cleanser.py
+def _region_args(region=None, registry=None, data_root=None):
+    args = ["--region", region or DEFAULT_REGION]
+    if registry:
+        args += ["--registry", registry]
+    if data_root:
+        args += ["--data-root", data_root]
+    return args
+
+
+# Dashboard cache warm-up (warmup.py) for a region, in its own process. The
+# dashboard serves the default data directory only, so runs into another data
+# root have nothing to warm. A failure is logged but does not fail the run.
+def warm_dashboard(region_id, data_root=None, date=None):
+    if data_root:
+        return True
+    if not run_script("warmup.py", "--region", region_id, *(["--date", date] if date else [])):
+        logging.warning(f"⚠️ Dashboard cache warm-up failed for {region_id} — the first session loads the data.")
+        return False
+    return True
+
+
+# Scrape + clean one region; returns True when both stages succeed.
+# `options` are run_scrape() keyword arguments (extraction, workers, rate, backend).
+# With `photos`, the day's listing photos are then fetched into the photo cache
+# (photos.py); a failure there is logged but does not fail the run. With `warm`,
+# the dashboard cache is then pre-warmed for the new day (warmup.py).
+# The stages record their own run metrics; this records the end-to-end time.
+@metrics.recorded_run("pipeline")
+def run_pipeline(region=None, options=None, isolated=False, registry=None, data_root=None, profile=None,
+                 photos=False, warm=False):
+    metrics.label(region=region or DEFAULT_REGION, isolated=isolated)
+    if isolated:
+        region_args = _region_args(region, registry, data_root)
+        profile_args = ["--profile", profile] if profile else []
+        scraper_args = [f"--{name}={value}" for name, value in (options or {}).items()]
+        if not run_script("scraper.py", *region_args, *scraper_args, *profile_args):
+            logging.error("❌ Scraper failed — skipping cleanser.")
+            return False
+        logging.info("✅ Scraper finished successfully — launching cleanser...")
+        success = run_script("cleanser.py", *region_args, *profile_args)
+        if success and photos and not run_script("photos.py", *region_args, *profile_args):
+            logging.warning("⚠️ Photo download failed — the listings are saved without new photos.")
+        if success and warm:
+            warm_dashboard(region or DEFAULT_REGION, data_root)
+        return success
+
+    from cleanser import run_data_prep
+    from scraper import run_scrape
+
+    try:
+        region = get_region(region, registry)
+        df, stats = run_scrape(region, data_root=data_root, **(options or {}))
+    except Exception as e:
+        logging.error(f"❌ Scraper failed: {e} — skipping cleanser.")
+        return False
+    logging.info("✅ Scraper finished successfully — cleaning the scraped frame...")
+    success = run_data_prep(stats["date"], region=region, data_root=data_root, df=df)
+    if success and photos:
+        from photos import run_photos
+
+        try:
+            if not run_photos(stats["date"], region, data_root):
+                logging.warning("⚠️ No listing photos downloaded.")
+        except Exception as e:
+            logging.warning(f"⚠️ Photo download failed: {e} — the listings are saved without new photos.")
+    if success and warm:
+        warm_dashboard(region["id"], data_root, stats["date"])
+    return success
+
+# --- Pipeline as a stage DAG (--dag) ---
+# Per region:  scrape:<r> -> clean:<r> -> rollups:<r>
+#                                     \-> events:<r>
+#                                     \-> photos:<r>   (with photos=True)
+#              rollups:<r> + events:<r> -> warm:<r>  (with warm=True)
+# Regions are independent, and so are the rollups, events and photos of one
+# region, so up to `max_parallel` stages run at once (dag.py). The host-wide
+# scrape rate is split across the regions scraping concurrently. A failed stage
+# is retried (a scrape resumes from its page journal, a clean re-append skips
+# rows already stored); one that timed out is not, since its attempt may still be
+# writing. The stages after a failure are skipped. Photos and the dashboard cache
+# warm-up are optional: their failure does not fail the run.
+
+DEFAULT_STAGE_RETRIES = 1
+DEFAULT_RETRY_BACKOFF = 30.0
+OPTIONAL_STAGES = ("photos", "warm")
+
+
+# Stage list for `regions` (region dicts); `options` are run_scrape() keyword arguments
+def pipeline_stages(regions, options=None, data_root=None, photos=False, max_parallel=None, timeout=None,
+                    retries=DEFAULT_STAGE_RETRIES, backoff=DEFAULT_RETRY_BACKOFF, warm=False):
+    from cleanser import refresh_events, refresh_rollups, run_data_prep
+    from dag import DEFAULT_PARALLEL, Stage
+    from scraper import DEFAULT_RATE, run_scrape
+
+    options = dict(options or {})
+    concurrent_scrapes = max(1, min(max_parallel or DEFAULT_PARALLEL, len(regions)))
+    options["rate"] = options.get("rate", DEFAULT_RATE) / concurrent_scrapes
+
+    def scrape(region):
+        return lambda inputs: run_scrape(region, data_root=data_root, **options)
+
+    def clean(region):
+        def stage(inputs):
+            df, stats = inputs[f"scrape:{region['id']}"]
+            cleaned = run_data_prep(stats["date"], region=region, data_root=data_root, df=df, aggregate=False)
+            return cleaned and stats["date"]
+        return stage
+
+    def aggregate(refresh, region):
+        return lambda inputs: refresh([inputs[f"clean:{region['id']}"]], region, data_root)
+
+    def fetch_photos(region):
+        from photos import run_photos
+
+        return lambda inputs: run_photos(inputs[f"clean:{region['id']}"], region, data_root)
+
+    def warm_cache(region):
+        return lambda inputs: warm_dashboard(region["id"], data_root, inputs[f"clean:{region['id']}"])
+
+    stages = []
+    for region in regions:
+        name = region["id"]
+        limits = {"timeout": timeout, "retries": retries, "backoff": backoff}
+        stages += [
+            Stage(f"scrape:{name}", scrape(region), **limits),
+            Stage(f"clean:{name}", clean(region), after=[f"scrape:{name}"], **limits),
+            Stage(f"rollups:{name}", aggregate(refresh_rollups, region), after=[f"clean:{name}"], **limits),
+            Stage(f"events:{name}", aggregate(refresh_events, region), after=[f"clean:{name}"], **limits),
+        ]
+        if photos:
+            stages.append(Stage(f"photos:{name}", fetch_photos(region), after=[f"clean:{name}"], timeout=timeout))
+        if warm and not data_root:
+            stages.append(Stage(f"warm:{name}", warm_cache(region),
+                                after=[f"clean:{name}", f"rollups:{name}", f"events:{name}"], timeout=timeout))
+    return stages
+
+
+# Run the stage DAG for `region_ids` (None: the default region, empty: all
+# registry regions); True when every required stage succeeded
+@metrics.recorded_run("pipeline")
+def run_pipeline_dag(region_ids=None, options=None, registry=None, data_root=None, photos=False,
+                     max_parallel=None, timeout=None, retries=DEFAULT_STAGE_RETRIES, backoff=DEFAULT_RETRY_BACKOFF,
+                     warm=False):
+    from dag import DEFAULT_PARALLEL, describe, run_dag
+
+    max_parallel = max_parallel or DEFAULT_PARALLEL
+    if region_ids is None:
+        regions = [get_region(DEFAULT_REGION, registry)]
+    else:
+        regions = ([get_region(region_id, registry) for region_id in region_ids]
+                   or list(load_regions(registry).values()))
+    metrics.label(region=",".join(region["id"] for region in regions), mode="dag", max_parallel=max_parallel)
+    stages = pipeline_stages(regions, options, data_root, photos, max_parallel, timeout, retries, backoff, warm)
+
+    logging.info(f"🧩 Running {len(stages)} stages for {len(regions)} regions ({max_parallel} at a time)...")
+    outcomes = run_dag(stages, max_parallel)
+    logging.info(f"📋 Stage timeline (seconds):\n{describe(outcomes)}")
+    failed = [name for name, outcome in outcomes.items()
+              if outcome["status"] != "ok" and name.split(":")[0] not in OPTIONAL_STAGES]
+    metrics.count("stages_failed", len(failed))
+    return not failed
 
 # --- Jobs ---
-def scrape_job():
-    logging.info("🚀 Starting scraper job...")
-    success = run_script("scraper.py")
-    if not success:
-        logging.error("❌ Scraper failed — skipping cleanser.")
-        return
-    logging.info("✅ Scraper finished successfully — launching cleanser...")
-    run_script("cleanser.py")
+# `dag`: None runs the serial pipeline, else run_pipeline_dag() keyword arguments
+def scrape_job(isolated=False, profile=None, photos=False, dag=None, warm=False):
+    mode = "stage DAG" if dag is not None else ("isolated processes" if isolated else "in-process")
+    logging.info(f"🚀 Starting scraper job ({mode})...")
+    start = time.perf_counter()
+    if dag is not None:
+        success = run_pipeline_dag(photos=photos, warm=warm, **dag)
+    else:
+        success = run_pipeline(isolated=isolated, profile=profile, photos=photos, warm=warm)
+    logging.info(f"{'✅' if success else '❌'} Scraper job finished in {time.perf_counter() - start:.1f}s")
+
+# Every region in the registry (or the given ones): scrape + clean in parallel processes
+def regions_job(regions, processes, isolated=False, warm=False):
+    logging.info(f"🚀 Starting multi-region job ({', '.join(regions) or 'all regions'})...")
+    if isolated:
+        success = run_script("runner.py", "--regions", *regions, "--processes", str(processes))
+    else:
+        from runner import run_regions
+
+        _, failures = run_regions(regions, processes)
+        success = not failures
+    if warm:
+        for region_id in regions or load_regions():
+            warm_dashboard(region_id)
+    if success:
+        logging.info("✅ Multi-region job finished successfully.")
+    else:
+        logging.error("❌ Multi-region job failed for at least one region.")
 
 # --- Main entry ---
 if __name__ == "__main__":
@@ -49,12 +254,63 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--debug", action="store_true", help="Run once (scraper → cleanser) and exit")
+    parser.add_argument("--regions", nargs="*", default=None,
+                        help="Run these region ids (none listed = all regions) through runner.py")
+    parser.add_argument("--processes", type=int, default=4, help="Regions processed in parallel")
+    parser.add_argument("--isolated", action="store_true",
+                        help="Run each stage as a separate Python process (crash containment)")
+    parser.add_argument("--profile", choices=metrics.PROFILERS, default=None,
+                        help="Profile each pipeline run (cProfile, or a sampling profiler) into logs/profiles/")
+    parser.add_argument("--photos", action="store_true",
+                        help="After cleaning, download the day's listing photos and thumbnails (src/photos.py)")
+    parser.add_argument("--no-warm", action="store_true",
+                        help="Skip the dashboard cache warm-up after each run (src/warmup.py)")
+    parser.add_argument("--dag", action="store_true",
+                        help="Run the pipeline as a stage DAG (regions and aggregates in parallel, see src/dag.py); "
+                             "with --regions, one DAG over those regions")
+    parser.add_argument("--max-parallel", type=int, default=None, help="Stages running at once in --dag mode")
+    parser.add_argument("--stage-timeout", type=float, default=None,
+                        help="Seconds before a --dag stage fails (not retried)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_STAGE_RETRIES, help="Retries of a failed --dag stage")
+    parser.add_argument("--retry-backoff", type=float, default=DEFAULT_RETRY_BACKOFF,
+                        help="Seconds before the first retry (doubled for each further one)")
+    parser.add_argument("--max-instances", type=int, default=1,
+                        help="Runs of the job allowed at once (a trigger during a longer run is skipped)")
+    parser.add_argument("--no-coalesce", action="store_true",
+                        help="Run every missed trigger after a stall instead of a single catch-up run")
+    parser.add_argument("--misfire-grace-time", type=int, default=3600,
+                        help="Seconds a late trigger is still run (e.g. after the machine slept)")
+    parser.add_argument("--report", action="store_true",
+                        help="Print latency percentiles of the recorded runs (logs/metrics.jsonl) and exit")
+    parser.add_argument("--last", type=int, default=20, help="Runs per stage covered by --report")
     args = parser.parse_args()
 
+    if args.report:
+        print(metrics.report(last=args.last))
+        sys.exit(0)
+
+    setup_logging()
+    metrics.enable_profiling(args.profile)
+    if args.dag:
+        dag = {"region_ids": args.regions, "max_parallel": args.max_parallel,
+               "timeout": args.stage_timeout, "retries": args.retries, "backoff": args.retry_backoff}
+        job, job_args = scrape_job, [False, None, args.photos, dag, not args.no_warm]
+    elif args.regions is None:
+        job, job_args = scrape_job, [args.isolated, args.profile, args.photos, None, not args.no_warm]
+    else:
+        job, job_args = regions_job, [args.regions, args.processes, args.isolated, not args.no_warm]
+
     if args.debug:
         logging.info("🧪 Debug mode: running once and exiting.")
-        scrape_job()
+        job(*job_args)
     else:
+        from apscheduler.schedulers.blocking import BlockingScheduler
+
         logging.info("🕒 Scheduler started in production mode.")
-        scheduler.add_job(scrape_job, "cron", hour=2)  # runs daily at 2 AM
+        scheduler = BlockingScheduler()
+        # Overlap protection: a run still going at the next trigger makes APScheduler skip
+        # that trigger (max_instances), and triggers missed meanwhile collapse into one run
+        scheduler.add_job(job, "cron", args=job_args, hour=2,  # runs daily at 2 AM
+                          max_instances=args.max_instances, coalesce=not args.no_coalesce,
+                          misfire_grace_time=args.misfire_grace_time)
         scheduler.start()
@@ -1,23 +1,19 @@
 # Import necessary libraries
 import os                          # for directory manipulation
 import time                        # for time computation
-import json
 import random
-import re
 from datetime import datetime
-
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd                # for DataFrame manipulation
 import sys, io, logging
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8")
+# Selenium, webdriver_manager, pandas and pyarrow (via storage) are imported by the
+# functions that use them, so importing this module stays cheap and side-effect free
 
-# Setup logging
+from extraction import CARDS_SCRIPT, PAGES_SCRIPT, build_record, parse_page, parse_page_labels, parse_script_result
+from backends import BACKENDS, USER_AGENTS, session_factory
+from journal import ScrapeJournal, journal_path
+import metrics
+from pool import HostRateLimiter, SessionPool, page_url, scrape_pages
+from regions import DEFAULT_REGION, get_region, raw_daily_path, raw_master_path
 
 # --- Always resolve relative to the project root ---
 # (script_dir = folder containing scraper.py)
@@ -26,25 +22,21 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 # Go up one level to project root
 project_root = os.path.abspath(os.path.join(script_dir, ".."))
 
-# --- Setup logging ---
+# --- Setup logging (called by the command-line entry point) ---
 log_file = os.path.join(project_root, "logs", "scraper.log")
-os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    handlers=[logging.StreamHandler(sys.stdout)],
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    encoding="utf-8",  # Python 3.9+ only
-)
 
+def setup_logging():
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8")
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-# Optional: List of randomized user agents
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Firefox/119.0"
-]
+    logging.basicConfig(
+        level=logging.INFO,
+        handlers=[logging.StreamHandler(sys.stdout)],
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        encoding="utf-8",  # Python 3.9+ only
+    )
 
 
 # Configure chrome driver
@@ -59,6 +51,11 @@ USER_AGENTS = [
 
 
 def init_chrome_driver(headless=True):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
     chrome_options = Options()
 
     # 1. Random User-Agent
@@ -99,167 +96,251 @@ def init_chrome_driver(headless=True):
 
     return driver
 
-def scrape():
+# --- Concurrency defaults ---
+DEFAULT_WORKERS = 4     # warm browser sessions in the pool
+DEFAULT_RATE = 0.5      # page requests per second per host (token bucket refill rate)
+
+# --- Extraction modes ---
+# "webdriver":   one find_element round-trip per field per card (original path)
+# "page_source": fetch driver.page_source once and parse every card in one pass
+# "script":      one execute_script call that returns every card as JSON
+EXTRACTION_MODES = ("webdriver", "page_source", "script")
+
+
+# Extract one card through per-field WebDriver calls
+def extract_listing_webdriver(listing):
+    raw = {}
+    for name, selector in [
+        ("price", "span.bp-Homecard__Price--value"),
+        ("address", "div.bp-Homecard__Address"),
+        ("beds", "span.bp-Homecard__Stats--beds"),
+        ("baths", "span.bp-Homecard__Stats--baths"),
+        ("sqft", "span.bp-Homecard__LockedStat--value"),
+    ]:
+        try:
+            raw[name] = listing.find_element("css selector", selector).text.strip()
+        except:
+            pass
+
+    for name, selector, attribute in [
+        ("link", "a.bp-Homecard", "href"),
+        ("image_url", "img.bp-Homecard__Photo--image", "src"),
+        ("ld_json", "script[type='application/ld+json']", "innerHTML"),
+    ]:
+        try:
+            raw[name] = listing.find_element("css selector", selector).get_attribute(attribute)
+        except:
+            pass
+
+    return build_record(raw)
+
+
+# Extract all listings on the current page
+# Returns (records, found_container, page numbers linked from the pager)
+def extract_page(driver, page_number, extraction="page_source"):
+    if extraction == "page_source":
+        return parse_page(driver.page_source)
+
+    # Locate the main listings container
+    try:
+        container = driver.find_element("css selector", "div.HomeCardsContainer")
+    except:
+        return [], False, set()
+
+    if extraction == "script":
+        records = parse_script_result(driver.execute_script(CARDS_SCRIPT))
+    else:
+        listings = container.find_elements("css selector", "div.HomeCardContainer")
+        records = [record for record in map(extract_listing_webdriver, listings) if record]
+
     try:
-        logging.info("🔄 Starting Redfin Scraper...")
-        
-        # Target URL: Redfin search URL for Hollywood Hills, Los Angeles
-        base_url = "https://www.redfin.com/neighborhood/547223/CA/Los-Angeles/Hollywood-Hills"
+        linked_pages = parse_page_labels(driver.execute_script(PAGES_SCRIPT))
+    except:
+        linked_pages = set()
 
-        # Initialize chrome driver
-        driver = init_chrome_driver()
+    return records, True, linked_pages
 
-        # Initialize data storage
-        scraped_data = []
-        today = datetime.today().strftime("%Y-%m-%d")
 
-        # Start scraping
-        page_number = 1
+# Navigate and wait for the listing cards instead of sleeping a fixed time
+def load_page(driver, url, timeout=15):
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get(url)
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div.HomeCardsContainer"))
+        )
+    except TimeoutException:
+        pass
+
+
+# Walk /page-N one page at a time with a single driver (original path).
+# With a journal, each page is checkpointed and a resumed run starts at the first
+# page it has not completed.
+def scrape_sequentially(base_url, extraction="page_source", backend="selenium", journal=None):
+    page_number = journal.next_page() if journal else 1
+    if page_number is None:
+        print("✅ Every page was already captured.")
+        return journal.records
+
+    driver = session_factory(backend, init_chrome_driver, pool_size=1, page_loader=load_page)()
+    scraped_data = []
+    try:
         while True:
             print(f"Scraping page {page_number}...")
 
-            url = base_url if page_number == 1 else f"{base_url}/page-{page_number}"
-            driver.get(url)
-            time.sleep(random.uniform(5, 8))
-
-            # Locate the main listings container
-            try:
-                container = driver.find_element("css selector", "div.HomeCardsContainer")
-                listings = container.find_elements("css selector", "div.HomeCardContainer")
-            except:
+            with metrics.timer("page_load"):
+                driver.get(page_url(base_url, page_number))
+            if backend == "selenium":
+                with metrics.timer("sleep"):
+                    time.sleep(random.uniform(5, 8))  # let the page render
+
+            # Extract every listing card on the page
+            with metrics.timer("extract"):
+                listings, found_container, linked_pages = extract_page(driver, page_number, extraction)
+            metrics.count("pages")
+            if not found_container:
                 print("Failed to locate the property list container. Exiting...")
                 break
 
             print(f"Found {len(listings)} listings on page {page_number}")
-
-            for listing in listings:
-                # Extract price
-                try:
-                    price = listing.find_element("css selector", "span.bp-Homecard__Price--value").text.strip()
-                except:
-                    price = "N/A"
-
-                # Extract address
-                try:
-                    address = listing.find_element("css selector", "div.bp-Homecard__Address").text.strip()
-                except:
-                    print("Skipping a listing due to missing address data")
-                    continue  # Skip listings with missing elements
-
-                # Extract beds, baths, and sqft
-                try:
-                    beds = listing.find_element("css selector", "span.bp-Homecard__Stats--beds").text.strip()
-                except:
-                    beds = "N/A"
-
-                try:
-                    baths = listing.find_element("css selector", "span.bp-Homecard__Stats--baths").text.strip()
-                except:
-                    baths = "N/A"
-
-                try:
-                    sqft = listing.find_element("css selector", "span.bp-Homecard__LockedStat--value").text.strip()
-                except:
-                    sqft = "N/A"
-
-                # Extract listing link and listing id
-                try:
-                    link = listing.find_element("css selector", "a.bp-Homecard").get_attribute("href")
-                    link = f"https://www.redfin.com{link}" if link.startswith("/") else link
-            
-                    # Extract ID after /home/
-                    match = re.search(r'/home/(\d+)', link)
-                    if match:
-                        listing_id = match.group(1)
-                    else:
-                        listing_id = "N/A"
-            
-                except:
-                    print("Skipping a listing due to missing link data")
-                    continue  # Skip listings with missing elements
-
-                # Extract image URL
-                try:
-                    image_element = listing.find_element("css selector", "img.bp-Homecard__Photo--image")
-                    image_url = image_element.get_attribute("src")
-                except:
-                    image_url = "N/A"
-                
-                try:
-                    # Extract Geo-Coordinates (Latitude & Longitude)
-                    json_script = listing.find_element(By.CSS_SELECTOR, "script[type='application/ld+json']").get_attribute("innerHTML")
-                    json_data = json.loads(json_script)
-
-                    # Sometimes it's a dict, sometimes a list of dicts
-                    if isinstance(json_data, list):
-                        geo_data = next((item.get("geo") for item in json_data if item.get("geo")), None)
-                    else:
-                        geo_data = json_data.get("geo")
-
-                    if geo_data:
-                        latitude = geo_data.get("latitude", "N/A")
-                        longitude = geo_data.get("longitude", "N/A")
-                    else:
-                        latitude = "N/A"
-                        longitude = "N/A"
-                except Exception as e:
-                    print(f"⚠️ Failed to extract geo-coordinates: {e}")
-                    latitude = "N/A"
-                    longitude = "N/A"
-
-                # Store the data
-                scraped_data.append({
-                    "Listing ID": listing_id,
-                    "Price": price,
-                    "Address": address,
-                    "Beds": beds,
-                    "Baths": baths,
-                    "SqFt": sqft,
-                    "Link": link,
-                    "Image URL": image_url, 
-                    "Latitude": latitude,
-                    "Longitude": longitude
-                })
+            if journal:
+                listings = journal.record(page_number, listings, linked_pages)
+            scraped_data.extend(listings)
 
             # Try going to the next page by checking if the next-page anchor exists
-            try:
-                next_page_anchor = driver.find_element(By.CSS_SELECTOR, "a[aria-label='page {}']".format(page_number + 1))
-                if next_page_anchor:
-                    page_number += 1
+            if journal:
+                next_page = journal.next_page()
+            else:
+                next_page = page_number + 1 if page_number + 1 in linked_pages else None
+            if next_page is not None:
+                page_number = next_page
+                with metrics.timer("sleep"):
                     time.sleep(random.uniform(3, 6))
-                else:
-                    break
-            except:
+            else:
                 print("✅ No more pages.")
                 break
+    finally:
+        # Close the browser
+        driver.quit()
 
-        # Convert to DataFrame and save as CSV
-        df = pd.DataFrame(scraped_data)
-        df["Date"] = today  # Add date for historical tracking
+    return journal.records if journal else scraped_data
+
+
+# Fetch pages in parallel from a pool of warm drivers, paced by a per-host token bucket
+def scrape_concurrently(base_url, extraction="page_source", workers=DEFAULT_WORKERS, rate=DEFAULT_RATE,
+                        backend="selenium", journal=None):
+    limiter = HostRateLimiter(rate, capacity=workers)
+    factory = session_factory(backend, init_chrome_driver, pool_size=workers, page_loader=load_page)
+    with SessionPool(factory, size=workers) as pool:
+        scraped_data, _ = scrape_pages(
+            base_url, pool, limiter,
+            extract=lambda driver, n: extract_page(driver, n, extraction),
+            fetch=load_page if backend == "selenium" else (lambda session, url: session.get(url)),
+            journal=journal,
+        )
+    return scraped_data
+
+
+# Scrape one region and save its daily file and master; returns (DataFrame, run stats).
+# Raises on failure (scrape() below is the exit-code wrapper for the CLI).
+# Completed pages are journaled, so a failed run for the same date resumes where
+# it stopped (resume=False starts over); materialize=True saves what the journal
+# of `date` holds without fetching anything. Timings go to the run metrics (metrics.py).
+@metrics.recorded_run("scrape")
+def run_scrape(region=None, extraction="page_source", workers=1, rate=DEFAULT_RATE, backend="selenium",
+               data_root=None, resume=True, materialize=False, date=None):
+    region = get_region(region)
+    today = date or datetime.today().strftime("%Y-%m-%d")
+    path_to_daily_file = raw_daily_path(region, today, data_root)
+    journal = ScrapeJournal(journal_path(path_to_daily_file))
+    metrics.label(region=region["id"], date=today, backend=backend, workers=workers, extraction=extraction)
+    metrics.count("pages_resumed", journal.resumed_pages)
+
+    if materialize:
+        if not journal.pages:
+            raise FileNotFoundError(f"No scrape journal for {region['name']} on {today}: {journal.path}")
+        logging.info(f"📄 Materializing {len(journal.pages)} journaled pages for {region['name']} ({today})")
+        return save_scrape(journal.records, region, today, data_root)
+
+    if not resume and journal.pages:
+        journal.finish()
+        journal = ScrapeJournal(journal.path)
+
+    logging.info(f"🔄 Starting Redfin Scraper for {region['name']} ({backend} backend)...")
+
+    # Target URL: Redfin search URL for the region
+    base_url = region["url"]
+
+    # The HTTP backend only has the page HTML to work with
+    if backend == "http" and extraction != "page_source":
+        logging.warning(f"⚠️ --extraction {extraction} needs a browser; using page_source with the http backend")
+        extraction = "page_source"
+
+    # Per-region concurrency limit from the registry
+    workers = min(workers, region.get("max_workers", workers))
+
+    # Start scraping
+    with journal:
+        if workers > 1:
+            scraped_data = scrape_concurrently(base_url, extraction, workers, rate, backend, journal)
+        else:
+            scraped_data = scrape_sequentially(base_url, extraction, backend, journal)
+
+    df, stats = save_scrape(scraped_data, region, today, data_root)
+    journal.finish()
+    return df, {**stats, "resumed_pages": journal.resumed_pages}
+
+
+# Save scraped records as the region's daily file and append them to its master
+def save_scrape(scraped_data, region, today, data_root=None):
+    import pandas as pd                # for DataFrame manipulation
+    from database import database_enabled, database_path, upsert_listings
+    from storage import RAW_SCHEMA, append_to_master, typed_path, write_typed
+
+    # Convert to DataFrame and save as CSV
+    df = pd.DataFrame(scraped_data)
+    df["Date"] = today  # Add date for historical tracking
+
+    # --- Data paths ---
+    path_to_daily_file = raw_daily_path(region, today, data_root)
+
+    # Ensure target directory exists
+    os.makedirs(os.path.dirname(path_to_daily_file), exist_ok=True)
+
+    # Save daily file (CSV plus its typed Parquet twin)
+    with metrics.timer("save.daily"):
+        df.to_csv(path_to_daily_file, index=False)
+        write_typed(df, typed_path(path_to_daily_file), RAW_SCHEMA)
+    logging.info(f"Saved daily data: {path_to_daily_file}")
 
-        # --- Data paths ---
-        daily_file_name = f"redfin_hollywood_hills_{today}.csv"
-        path_to_daily_file = os.path.join(project_root, "data", "raw", daily_file_name)
+    # Append to master dataset
+    path_to_master_file = raw_master_path(region, data_root)
 
-        # Ensure target directory exists
-        os.makedirs(os.path.dirname(path_to_daily_file), exist_ok=True)
+    with metrics.timer("save.master"):
+        added = append_to_master(df, path_to_master_file, schema=RAW_SCHEMA)
+    logging.info(f"Updated master dataset: {path_to_master_file} (+{added} rows)")
 
-        # Save daily file
-        df.to_csv(path_to_daily_file, index=False)
-        logging.info(f"Saved daily data: {path_to_daily_file}")
+    # Optional SQL store (see database.py)
+    if database_enabled(data_root):
+        with metrics.timer("save.database"):
+            written = upsert_listings(df, region["id"], "raw_listings", data_root)
+        logging.info(f"Upserted {written} rows into {database_path(data_root)}")
 
-        # Append to master dataset
-        path_to_master_file = os.path.join(project_root, "data", "raw", "redfin_hollywood_hills_master.csv")
+    metrics.count("listings", len(df))
+    metrics.count("added", added)
 
-        if os.path.exists(path_to_master_file):
-            master_df = pd.read_csv(path_to_master_file)
-            df = pd.concat([master_df, df]).drop_duplicates(subset=["Address", "Date"])
+    return df, {"region": region["id"], "date": today, "listings": len(df), "added": added}
 
-        df.to_csv(path_to_master_file, index=False)
-        logging.info(f"Updated master dataset: {path_to_master_file}")
 
-        # Close the browser
-        driver.quit()
+def scrape(extraction="page_source", workers=1, rate=DEFAULT_RATE, backend="selenium", region=None,
+           registry=None, data_root=None, resume=True, materialize=False, date=None):
+    try:
+        run_scrape(get_region(region, registry), extraction, workers, rate, backend, data_root,
+                   resume=resume, materialize=materialize, date=date)
         exit(0)  # Exit successfully
 
     except Exception as e:
@@ -267,4 +348,31 @@ def scrape():
         exit(1)  # Exit with failure
 
 if __name__ == "__main__":
-    scrape()
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extraction", choices=EXTRACTION_MODES, default="page_source",
+                        help="How listing cards are read from each page")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Browser sessions fetching pages in parallel (1 = sequential)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="Max page requests per second per host when --workers > 1")
+    parser.add_argument("--backend", choices=BACKENDS, default="selenium",
+                        help="Fetch pages with Chrome, or with plain HTTP (Chrome only for pages that need JS)")
+    parser.add_argument("--region", default=DEFAULT_REGION, help="Region id from config/regions.json")
+    parser.add_argument("--registry", default=None, help="Alternative region registry file")
+    parser.add_argument("--data-root", default=None, help="Alternative data directory (default: data/)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Discard today's scrape journal and start again from page 1")
+    parser.add_argument("--materialize", action="store_true",
+                        help="Save the pages journaled so far (e.g. by a failed run) without fetching")
+    parser.add_argument("--date", default=None, help="Journal date for --materialize (default: today)")
+    parser.add_argument("--profile", choices=metrics.PROFILERS, default=None,
+                        help="Profile the run (cProfile, or a sampling profiler) into logs/profiles/")
+    args = parser.parse_args()
+
+    setup_logging()
+    metrics.enable_profiling(args.profile)
+    scrape(extraction=args.extraction, workers=args.workers, rate=args.rate, backend=args.backend,
+           region=args.region, registry=args.registry, data_root=args.data_root,
+           resume=not args.no_resume, materialize=args.materialize, date=args.date)
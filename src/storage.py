@@ -0,0 +1,457 @@
+# Import libraries
+import glob
+import io
+import logging
+import os
+import re
+from functools import cache
+
+# pandas and pyarrow are imported by the functions that use them, so importing
+# this module (for its path helpers) stays cheap. RAW_SCHEMA and CLEANED_SCHEMA
+# are built on first access (see __getattr__ below).
+
+# --- Partitioned master datasets ---
+# A master dataset "<name>_master.csv" is stored as a directory "<name>_master/"
+# holding one append-only CSV partition per Date ("Date=YYYY-MM-DD.csv").
+# A daily run only touches its own partition, and the (Address, Date) dedupe only
+# needs that partition's Address column, so writes stay O(day) instead of O(history).
+# Readers stream the partitions back as one CSV, so they get exactly the frame
+# pd.read_csv would return for the old single master file.
+
+PARTITION_PATTERN = re.compile(r"Date=(.+)\.csv$")
+
+# A migrated single-file master is kept as "<name>_master.csv.migrated" (no reader picks it up)
+MIGRATED_SUFFIX = ".migrated"
+
+
+# "data/raw/redfin_hollywood_hills_master.csv" -> "data/raw/redfin_hollywood_hills_master"
+def partition_dir(master_file):
+    return os.path.splitext(master_file)[0]
+
+
+def partition_path(master_file, date):
+    return os.path.join(partition_dir(master_file), f"Date={date}.csv")
+
+
+# Partition files in Date order
+def list_partitions(master_file):
+    files = glob.glob(os.path.join(partition_dir(master_file), "Date=*.csv"))
+    return sorted(files, key=lambda f: PARTITION_PATTERN.search(f).group(1))
+
+
+def master_exists(master_file):
+    return bool(list_partitions(master_file)) or os.path.exists(master_file)
+
+
+# Partition key for each row: its calendar day ("2025-08-21" and
+# "2025-08-21 00:00:00" both occur in existing files)
+def _partition_keys(df):
+    import pandas as pd
+
+    dates = df["Date"]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce", format="ISO8601")
+    return dates.dt.strftime("%Y-%m-%d").fillna("NaT")
+
+
+# Append rows to the master dataset, skipping (Address, Date) pairs already stored
+# (existing rows win, as with the old concat + drop_duplicates). Rows for an
+# existing partition are written in its column order; a different set of columns
+# raises ValueError. With a schema, the master's typed twin is updated as well.
+def append_to_master(df, master_file, schema=None):
+    import pandas as pd
+
+    if not list_partitions(master_file) and os.path.exists(master_file):
+        migrate_master(master_file)
+
+    os.makedirs(partition_dir(master_file), exist_ok=True)
+
+    added = 0
+    for date, day_df in df.groupby(_partition_keys(df), sort=True):
+        day_df = day_df.drop_duplicates(subset=["Address", "Date"])
+        path = partition_path(master_file, date)
+
+        if os.path.exists(path):
+            # The partition is the index for its date: only its header and Address column are read
+            columns = list(pd.read_csv(path, nrows=0).columns)
+            if set(columns) != set(day_df.columns):
+                raise ValueError(f"Rows for {path} have columns {sorted(map(str, day_df.columns))}, "
+                                 f"the partition has {sorted(columns)}")
+            stored = pd.read_csv(path, usecols=["Address"])["Address"]
+            day_df = day_df[~day_df["Address"].isin(stored)].reindex(columns=columns)
+            if day_df.empty:
+                continue
+            header = False
+        else:
+            header = True
+
+        day_df.to_csv(path, mode="a", header=header, index=False)
+        added += len(day_df)
+
+    # Keep the typed (Parquet) twin of the master current
+    if schema is not None:
+        sync_typed_master(master_file, schema)
+
+    return added
+
+
+# Split an existing single-file master into Date partitions as-is (one-time, O(history)),
+# then move the single file aside so nothing reads a stale copy
+def migrate_master(master_file):
+    import pandas as pd
+
+    master_df = pd.read_csv(master_file, dtype=str, keep_default_na=False)
+    os.makedirs(partition_dir(master_file), exist_ok=True)
+
+    for date, day_df in master_df.groupby(_partition_keys(master_df), sort=True):
+        day_df.to_csv(partition_path(master_file, date), index=False)
+
+    os.replace(master_file, master_file + MIGRATED_SUFFIX)
+    logging.info(f"📦 Migrated {master_file} into {len(list_partitions(master_file))} Date partitions "
+                 f"under {partition_dir(master_file)}; the single CSV was moved to {master_file + MIGRATED_SUFFIX}")
+
+
+# Read-only file object chaining the partitions as one CSV (header written once)
+class _PartitionStream(io.RawIOBase):
+    def __init__(self, files):
+        self.files = iter(files)
+        self.header = None
+        self.current = None
+        self.buffer = b""
+        self.ends_with_newline = True
+
+    def readable(self):
+        return True
+
+    def _next_file(self):
+        for path in self.files:
+            f = open(path, "rb")
+            header = f.readline()
+            if self.header is None:
+                self.header = header
+                self.buffer = header
+            elif header != self.header:
+                f.close()
+                raise ValueError(f"Partition {path} has different columns")
+            self.current = f
+            return True
+        return False
+
+    def readinto(self, b):
+        while not self.buffer:
+            if self.current is None:
+                if not self._next_file():
+                    return 0
+                continue
+            chunk = self.current.read(len(b))
+            if chunk:
+                self.buffer = chunk
+            else:
+                self.current.close()
+                self.current = None
+                # Partitions written by other tools may lack a trailing newline
+                if not self.ends_with_newline:
+                    self.buffer = b"\n"
+        n = min(len(b), len(self.buffer))
+        b[:n] = self.buffer[:n]
+        self.buffer = self.buffer[n:]
+        self.ends_with_newline = b[n - 1] == ord("\n")
+        return n
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+        super().close()
+
+
+# Every file a master read may depend on (legacy file, CSV partitions, typed months),
+# e.g. for cache invalidation
+def master_sources(master_file):
+    typed_months = glob.glob(os.path.join(os.path.splitext(master_file)[0] + ".parquet", "Month=*.parquet"))
+    return [master_file, *list_partitions(master_file), *typed_months]
+
+
+# Load the whole master dataset (partitions if present, else the legacy single file)
+def load_master(master_file, **read_csv_kwargs):
+    import pandas as pd
+
+    files = list_partitions(master_file)
+    if not files:
+        return pd.read_csv(master_file, **read_csv_kwargs)
+
+    try:
+        with io.BufferedReader(_PartitionStream(files)) as stream:
+            return pd.read_csv(stream, **read_csv_kwargs)
+    except ValueError as e:
+        # Column layout changed between partitions: align by name instead
+        logging.warning(f"⚠️ {e}; concatenating partitions by column name")
+        return pd.concat([pd.read_csv(f, **read_csv_kwargs) for f in files], ignore_index=True)
+
+
+# Stream the master dataset as DataFrames of at most `chunksize` rows, in Date
+# partition order (memory is bounded by the chunk, not by the history)
+def iter_master_chunks(master_file, chunksize, **read_csv_kwargs):
+    import pandas as pd
+
+    files = list_partitions(master_file)
+    if not files:
+        yield from pd.read_csv(master_file, chunksize=chunksize, **read_csv_kwargs)
+        return
+
+    # Headers are checked up front: a mismatch found mid-stream could not be retried
+    # without yielding rows twice
+    headers = set()
+    for f in files:
+        with open(f, "rb") as partition:
+            headers.add(partition.readline().rstrip(b"\r\n"))
+
+    if len(headers) > 1:
+        # Column layout changed between partitions: stream them one by one
+        logging.warning("⚠️ Partitions have different columns; streaming them separately")
+        for f in files:
+            yield from pd.read_csv(f, chunksize=chunksize, **read_csv_kwargs)
+        return
+
+    with io.BufferedReader(_PartitionStream(files)) as stream:
+        yield from pd.read_csv(stream, chunksize=chunksize, **read_csv_kwargs)
+
+
+# --- Typed columnar twins (Parquet / Arrow IPC) ---
+# Every CSV the pipeline writes can have a typed twin next to it ("<name>.parquet";
+# a master gets a "<name>_master.parquet/" directory). Readers prefer a twin that
+# is at least as new as its CSV, so cleaning and the dashboard skip re-parsing
+# strings, and can project columns and push a Date range down to the files.
+
+# Scraper output: display strings as scraped, coordinates and Date typed
+@cache
+def raw_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("Listing ID", pa.string()),
+        ("Price", pa.string()),
+        ("Address", pa.string()),
+        ("Beds", pa.string()),
+        ("Baths", pa.string()),
+        ("SqFt", pa.string()),
+        ("Link", pa.string()),
+        ("Image URL", pa.string()),
+        ("Latitude", pa.float64()),
+        ("Longitude", pa.float64()),
+        ("Date", pa.date32()),
+    ])
+
+
+# Cleanser output
+@cache
+def cleaned_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("Listing ID", pa.int64()),
+        ("Price", pa.float64()),
+        ("Address", pa.dictionary(pa.int32(), pa.string())),
+        ("Beds", pa.float32()),   # as parsed: cleanser accepts "1.5 beds"
+        ("Baths", pa.float32()),  # half baths: "2.5 baths"
+        ("SqFt", pa.float64()),
+        ("Link", pa.string()),
+        ("Image URL", pa.string()),
+        ("Latitude", pa.float64()),
+        ("Longitude", pa.float64()),
+        ("Date", pa.date32()),
+    ])
+
+
+# storage.RAW_SCHEMA / storage.CLEANED_SCHEMA (and `from storage import ...`) build the schemas on first use
+def __getattr__(name):
+    if name == "RAW_SCHEMA":
+        return raw_schema()
+    if name == "CLEANED_SCHEMA":
+        return cleaned_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def typed_path(csv_path, fmt="parquet"):
+    return os.path.splitext(csv_path)[0] + (".arrow" if fmt == "ipc" else ".parquet")
+
+
+def _format_of(path):
+    return "ipc" if path.endswith((".arrow", ".feather")) else "parquet"
+
+
+# Cast a frame to the schema (strings like "N/A" become nulls in numeric columns)
+def to_arrow(df, schema):
+    import pandas as pd
+    import pyarrow as pa
+
+    columns = {}
+    for field in schema:
+        col = df[field.name] if field.name in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if pa.types.is_floating(field.type):
+            col = pd.to_numeric(col, errors="coerce").astype("float64")
+        elif pa.types.is_integer(field.type):
+            # Nullable ints; a fractional value raises instead of being truncated
+            col = pd.to_numeric(col, errors="coerce").astype(field.type.to_pandas_dtype().__name__.capitalize())
+        elif pa.types.is_date(field.type):
+            col = pd.to_datetime(col, errors="coerce", format="ISO8601")
+        elif pa.types.is_dictionary(field.type):
+            col = col.astype("string").astype("category")
+        else:
+            col = col.astype("string")
+        columns[field.name] = col
+    return pa.Table.from_pandas(pd.DataFrame(columns), schema=schema, preserve_index=False)
+
+
+def write_typed(df, path, schema):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = to_arrow(df, schema)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    if _format_of(path) == "ipc":
+        with pa.ipc.new_file(tmp_path, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _date_filter(start_date=None, end_date=None):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    expression = None
+    for op, value in (("ge", start_date), ("le", end_date)):
+        if value is None:
+            continue
+        scalar = pa.scalar(pd.Timestamp(value).date(), pa.date32())
+        term = ds.field("Date") >= scalar if op == "ge" else ds.field("Date") <= scalar
+        expression = term if expression is None else expression & term
+    return expression
+
+
+# Read a typed file or a typed master directory, with column projection and a Date
+# range pushed down to the files (files / row groups outside the range are skipped
+# using their Date statistics)
+def read_typed(path, columns=None, start_date=None, end_date=None):
+    import pyarrow.dataset as ds
+
+    if os.path.isdir(path):
+        source = sorted(glob.glob(os.path.join(path, "Month=*.parquet")))
+        dataset = ds.dataset(source, format="parquet")
+    else:
+        dataset = ds.dataset(path, format=_format_of(path))
+    table = dataset.to_table(columns=columns, filter=_date_filter(start_date, end_date))
+    # Plain numpy/object columns (no pandas metadata round-trip to nullable/string
+    # dtypes), and Arrow buffers released as they are converted: faster, lower peak RSS
+    table = table.replace_schema_metadata(None)
+    return table.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+
+
+# True when path's typed twin exists and is at least as new as the CSV
+def has_fresh_twin(csv_path):
+    twin = typed_path(csv_path)
+    return os.path.exists(twin) and (
+        not os.path.exists(csv_path) or os.path.getmtime(twin) >= os.path.getmtime(csv_path)
+    )
+
+
+# Read a daily file, from its typed twin when that is current
+def load_frame(csv_path, **read_typed_kwargs):
+    import pandas as pd
+
+    if has_fresh_twin(csv_path):
+        return read_typed(typed_path(csv_path), **read_typed_kwargs)
+    return pd.read_csv(csv_path)
+
+
+# --- Typed master: one Parquet file per month ---
+# Daily files are tiny, and per-file overhead dominates reads of thousands of them,
+# so the typed master groups the CSV partitions by month ("Month=YYYY-MM.parquet").
+# A daily run rewrites only the current month's file.
+
+def _month_of(partition_file):
+    return PARTITION_PATTERN.search(partition_file).group(1)[:7]
+
+
+def typed_month_path(master_file, month):
+    return os.path.join(typed_path(master_file), f"Month={month}.parquet")
+
+
+# {month file: [CSV partitions]} with a flag for whether the month file is stale
+def _typed_months(master_file):
+    months = {}
+    for path in list_partitions(master_file):
+        months.setdefault(typed_month_path(master_file, _month_of(path)), []).append(path)
+    for twin, partitions in months.items():
+        newest = max(os.path.getmtime(p) for p in partitions)
+        stale = not os.path.exists(twin) or os.path.getmtime(twin) < newest
+        yield twin, partitions, stale
+
+
+# Bring the typed master in line with the CSV partitions (rewrites only changed months,
+# and months written with another schema)
+# A month file is written one partition (row group) at a time, so memory stays O(day)
+def sync_typed_master(master_file, schema):
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    for twin, partitions, stale in _typed_months(master_file):
+        if stale or not pq.read_schema(twin).equals(schema, check_metadata=False):
+            tmp_path = twin + ".tmp"
+            os.makedirs(os.path.dirname(twin), exist_ok=True)
+            with pq.ParquetWriter(tmp_path, schema) as writer:
+                for path in partitions:
+                    writer.write_table(to_arrow(pd.read_csv(path), schema))
+            os.replace(tmp_path, twin)
+
+
+# True when every CSV partition is covered by a current typed month file
+def typed_master_ready(master_file):
+    months = list(_typed_months(master_file))
+    return bool(months) and not any(stale for _, _, stale in months)
+
+
+# Typed master read, or None when the typed twin is missing or stale
+def load_master_typed(master_file, columns=None, start_date=None, end_date=None):
+    if not typed_master_ready(master_file):
+        return None
+    return read_typed(typed_path(master_file), columns=columns, start_date=start_date, end_date=end_date)
+
+
+# One-shot converter: typed twins for every CSV under data/raw and data/cleaned
+def convert_csvs(data_root):
+    import pandas as pd
+
+    for folder, schema in (("raw", raw_schema()), ("cleaned", cleaned_schema())):
+        for csv_path in sorted(glob.glob(os.path.join(data_root, folder, "*.csv"))):
+            if "_master" in os.path.basename(csv_path):
+                if not list_partitions(csv_path):
+                    migrate_master(csv_path)
+                sync_typed_master(csv_path, schema)
+                logging.info(f"🧱 Typed master: {typed_path(csv_path)}")
+            elif not has_fresh_twin(csv_path):
+                write_typed(pd.read_csv(csv_path), typed_path(csv_path), schema)
+                logging.info(f"🧱 Converted {csv_path}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--convert", action="store_true",
+                        help="Also write typed Parquet twins for every CSV under data/")
+    args = parser.parse_args()
+
+    # Migrate every legacy master file in one go
+    for master_file in glob.glob(os.path.join(project_root, "data", "*", "*_master*.csv")):
+        if not list_partitions(master_file):
+            migrate_master(master_file)
+
+    if args.convert:
+        convert_csvs(os.path.join(project_root, "data"))